@@ -13,6 +13,13 @@ PHASE_PASSIVE: str = "passive"
 PHASE_ACTIVE: str = "active"
 
 DEBUG_LEVEL: int | str | None = None
+
+# Validation levels of port types. With full validation, ports check the type of every value.
+# With trusted validation, ports only check the first value they receive in every simulation cycle.
+VALIDATION_FULL: str = "full"
+VALIDATION_TRUSTED: str = "trusted"
+VALIDATION_LEVEL: str = VALIDATION_FULL  # Validation level of new ports
+
 LOGGERS: dict[str, logging.Logger] = dict()
 
 
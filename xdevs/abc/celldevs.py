@@ -6,6 +6,8 @@ from xdevs.celldevs import C, S
 
 
 class DelayedOutput(Generic[C, S], ABC):
+    __slots__ = ('cell_id', 'port')
+
     def __init__(self, cell_id: C, serve: bool = False):
         """
         Cell-DEVS delayed output port. This is an abstract base class.
@@ -89,6 +89,28 @@ class Transducer(ABC):
             filtered_comp_ports = Transducer._apply_filters(port_filters, comp_ports)
             self.target_ports |= filtered_comp_ports
 
+    def add_target_components_by_path(self, model: Coupled, pattern: str):
+        """
+        Adds the atomic models whose paths match a pattern (see xdevs.paths.PathIndex.glob).
+        Matching coupled models add all their atomic models. Only the matching branches of the model are visited.
+        :param model: topmost model of the hierarchy.
+        :param pattern: path pattern (e.g., "root.Coupled_*.Atomic_*").
+        """
+        for _, element in model.path_index().glob(pattern):
+            if isinstance(element, Component):
+                self.target_components.update(self._iterate_components(element))
+
+    def add_target_ports_by_path(self, model: Coupled, pattern: str):
+        """
+        Adds the ports whose paths match a pattern (see xdevs.paths.PathIndex.glob).
+        Only the matching branches of the model are visited.
+        :param model: topmost model of the hierarchy.
+        :param pattern: path pattern (e.g., "root.**.o_out").
+        """
+        for _, element in model.path_index().glob(pattern):
+            if isinstance(element, Port):
+                self.target_ports.add(element)
+
     def add_imminent_model(self, component: Atomic):
         if not self.exhaustive and self.active:
             self.imminent_components.append(component)
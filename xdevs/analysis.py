@@ -0,0 +1,138 @@
+from __future__ import annotations
+from collections import defaultdict
+from typing import Iterable
+from xdevs.models import Atomic, Component, Coupled, Port
+
+
+def full_name(comp: Component) -> str:
+    """:return: dot-separated names of a component and all its ancestors (e.g., "root.coupled.atomic")."""
+    names: list[str] = list()
+    while comp is not None:
+        names.append(comp.name)
+        comp = comp.parent
+    return '.'.join(reversed(names))
+
+
+class DeadCodeReport:
+    def __init__(self):
+        """Components and ports found by the dead code elimination pass (see eliminate_dead_code)."""
+        self.dead_ports: list[Port] = list()  # Output ports of atomic models whose values are discarded
+        self.pruned: list[tuple[str, Component]] = list()  # Removed components, with their full names
+
+    def __len__(self) -> int:
+        return len(self.dead_ports) + len(self.pruned)
+
+    def __str__(self) -> str:
+        lines = [f'{len(self.dead_ports)} dead ports']
+        lines.extend(f'  {full_name(port.parent)}.{port.name}' for port in self.dead_ports)
+        lines.append(f'{len(self.pruned)} pruned components')
+        lines.extend(f'  {name}' for name, _ in self.pruned)
+        return '\n'.join(lines)
+
+
+def eliminate_dead_code(model: Coupled, observed_ports: Iterable[Port] = (),
+                        observed_components: Iterable[Component] = (), prune: bool = False) -> DeadCodeReport:
+    """
+    Finds the output ports of the atomic models of a hierarchy whose messages reach nothing and marks them as dead:
+    dead ports discard all the values they receive, so writes in the output functions become cheap no-ops.
+    Messages are consumed by input ports of atomic models, output ports of the topmost model, remote hosts,
+    and observed ports (e.g., ports targeted by transducers).
+    Optionally, components that can never influence an observed port or component are removed from the hierarchy.
+    Atomic models without output ports are always kept, as they are usually sinks that collect results.
+    Pruning is only safe if the results of the simulation are read from observed ports and components
+    (e.g., a model whose outputs are not coupled to anything is pruned entirely).
+    Adding couplings to the hierarchy revives all the dead ports, so the pass must run again after adding them.
+    :param model: topmost model of the hierarchy.
+    :param observed_ports: ports whose messages are observed (e.g., by transducers).
+    :param observed_components: components whose states are observed (e.g., by transducers).
+    :param prune: if True, components that can never influence an observed port or component are removed.
+    Defaults to False.
+    :return: report with the dead ports and the removed components.
+    """
+    observed_ports = set(observed_ports)
+    observed_components = set(observed_components)
+    report = DeadCodeReport()
+    if prune:
+        for comp in _dead_components(model, observed_ports, observed_components):
+            report.pruned.append((full_name(comp), comp))
+            comp.parent.remove_component(comp)
+
+    routes = model.compile_routes()
+    observed_coupled = {port for port in observed_ports if isinstance(port.parent, Coupled)}
+    for atomic in _atomics(model):
+        for port in atomic.out_ports:
+            if port in observed_ports or port in routes or _reaches(model, port, observed_coupled):
+                port._dead = False
+            else:
+                port._dead = True
+                report.dead_ports.append(port)
+    # Adding couplings to the hierarchy revives all the dead ports (see Coupled._structure_changed)
+    model._dead_ports = list(report.dead_ports) if report.dead_ports else None
+    return report
+
+
+def _atomics(model: Coupled) -> list[Atomic]:
+    """:return: atomic models of a hierarchy."""
+    atomics: list[Atomic] = list()
+    stack: list[Component] = [model]
+    while stack:
+        comp = stack.pop()
+        if isinstance(comp, Coupled):
+            stack.extend(reversed(comp.components))
+        elif isinstance(comp, Atomic):
+            atomics.append(comp)
+    return atomics
+
+
+def _reaches(model: Coupled, port: Port, targets: set[Port]) -> bool:
+    """:return: True if the messages of a port go through any of the target ports of inner coupled models."""
+    if not targets:
+        return False
+    visited: dict[Port, list[Port]] = dict()
+    model._resolve_routes(port, visited)
+    return not targets.isdisjoint(visited)
+
+
+def _dead_components(model: Coupled, observed_ports: set[Port], observed_components: set[Component]) -> list[Component]:
+    """:return: topmost components of the subtrees that can never influence an observed port or component."""
+    routes = model.compile_routes()
+    observed_coupled = {port for port in observed_ports if isinstance(port.parent, Coupled)}
+    # Atomic models that feed each atomic model, and atomic models that are observed or send messages outside
+    feeders: dict[Atomic, set[Atomic]] = defaultdict(set)
+    live: set[Component] = set()
+    for atomic in _atomics(model):
+        if not atomic.out_ports or atomic in observed_components \
+                or any(port in observed_ports for port in atomic.in_ports):
+            live.add(atomic)
+        for port in atomic.out_ports:
+            if port in observed_ports or _reaches(model, port, observed_coupled):
+                live.add(atomic)
+            for coup in routes.get(port, ()):
+                if coup.host is None and isinstance(coup.port_to.parent, Atomic):
+                    feeders[coup.port_to.parent].add(atomic)
+                else:
+                    live.add(atomic)  # Output port of the topmost model or remote host
+
+    stack: list[Component] = list(live)
+    while stack:
+        for feeder in feeders.get(stack.pop(), ()):
+            if feeder not in live:
+                live.add(feeder)
+                stack.append(feeder)
+
+    # Coupled models are live if they contain live atomic models or are observed
+    for comp in list(live) + [port.parent for port in observed_coupled] + list(observed_components):
+        while comp is not None and (comp not in live or isinstance(comp, Atomic)):
+            live.add(comp)
+            comp = comp.parent
+
+    dead: list[Component] = list()
+    stack: list[Coupled] = [model]
+    while stack:
+        coupled = stack.pop()
+        for comp in coupled.components:
+            if comp not in live:
+                dead.append(comp)
+            elif isinstance(comp, Coupled):
+                stack.append(comp)
+    return dead
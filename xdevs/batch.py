@@ -0,0 +1,270 @@
+from __future__ import annotations
+import itertools
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, Iterator, Sequence
+from xdevs import INFINITY, PHASE_ACTIVE, PHASE_PASSIVE
+from xdevs.models import Atomic, Port
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class BatchPort(Port):
+    __slots__ = ('dtype',)
+
+    def __init__(self, dtype: Any, name: str = None, serve: bool = False, lookahead: float = 0):
+        """
+        Port that stores events as contiguous blocks in NumPy arrays. It requires NumPy.
+        Every call to add or extend appends a new block. Couplings pass the blocks of the transmitter port to the
+        receiver port without copying them, so blocks must be treated as read-only once they are added to a port.
+        Batch ports can be coupled to batch ports with the same data type. Ports without type receive blocks as events.
+        :param dtype: NumPy data type of the events (it can be a structured data type).
+        :param name: name of the new port instance. Defaults to the name of the port's class.
+        :param serve: set to True if the port is going to be served to remote hosts. Defaults to False.
+        :param lookahead: lookahead of the port (see Port). Defaults to 0.
+        :raises ImportError: if NumPy is not installed.
+        """
+        if numpy is None:
+            raise ImportError('BatchPort requires NumPy')
+        super().__init__(numpy.ndarray, name, serve, lookahead)
+        self.dtype: numpy.dtype = numpy.dtype(dtype)
+
+    def __len__(self) -> int:
+        return sum(len(block) for block in self._resolve())
+
+    def __str__(self) -> str:
+        return f'{self.name}<{self.dtype}>'
+
+    @property
+    def values(self) -> Iterator:
+        """:return: Iterator that can iterate over all the events contained in the port, one by one."""
+        return itertools.chain.from_iterable(self._resolve())
+
+    @property
+    def blocks(self) -> Sequence[numpy.ndarray]:
+        """:return: all the blocks of events contained in the port. Blocks are not copied."""
+        return self._resolve()
+
+    @property
+    def array(self) -> numpy.ndarray:
+        """
+        :return: array with all the events contained in the port. If the port only contains one block,
+        the block is returned without copying it. Otherwise, blocks are concatenated in a new array.
+        """
+        blocks = self._resolve()
+        if len(blocks) == 1:
+            return blocks[0]
+        if not blocks:
+            return numpy.empty(0, self.dtype)
+        return numpy.concatenate(blocks)
+
+    def add(self, val: Any):
+        """
+        Adds a new event to the port as a block of size 1.
+        :param val: event to be added.
+        :raises TypeError: if the event cannot be safely cast to the data type of the port.
+        """
+        self.extend((val,))
+
+    def extend(self, vals: Iterable):
+        """
+        Adds a block of events to the port. NumPy arrays with the data type of the port are added without copying them.
+        Other arrays are converted if their data type can be safely cast to the data type of the port.
+        Other sequences are converted to the data type of the port if all their values can be represented
+        (e.g., Python integers must be within the range of an integer data type). Events of structured data types
+        are tuples with one value per field. Checking a block is cheap, so all blocks are checked regardless of
+        the validation level of the port.
+        :param vals: events to be added.
+        :raises TypeError: if the events cannot be safely cast to the data type of the port.
+        """
+        if self._dead:
+            return
+        if isinstance(vals, numpy.ndarray):
+            block = vals
+            if block.dtype != self.dtype and not numpy.can_cast(block.dtype, self.dtype, casting='safe'):
+                raise TypeError(f'Value type is {block.dtype} ({self.dtype} expected)')
+        else:
+            if not isinstance(vals, (list, tuple, range)):
+                vals = list(vals)
+            if not vals:
+                return
+            if self.dtype.names is None:
+                try:
+                    block = numpy.asarray(vals)
+                except (OverflowError, ValueError):
+                    raise TypeError(f'Values cannot be converted to {self.dtype}') from None
+                if block.dtype != self.dtype and not numpy.can_cast(block.dtype, self.dtype, casting='safe') \
+                        and not _fits(block, self.dtype):
+                    raise TypeError(f'Values of type {block.dtype} cannot be represented as {self.dtype}')
+            else:  # Tuples are only converted to records if the data type is given
+                try:
+                    block = numpy.asarray(list(vals), dtype=self.dtype)  # Outer tuples would be records
+                except (TypeError, ValueError, OverflowError):
+                    raise TypeError(f'Values {vals} do not match the fields of {self.dtype}') from None
+        if not block.size:
+            return
+        if block.dtype != self.dtype:
+            block = block.astype(self.dtype)
+        if block.ndim != 1:
+            block = block.reshape(-1)
+        if not self._values and not self._bag and self._dirty is not None:
+            self._dirty.append(self)
+        self._values.append(block)
+        self._view = None
+
+
+def _fits(block: numpy.ndarray, dtype: numpy.dtype) -> bool:
+    """:return: True if all the values of a block of numbers can be represented by a numeric data type."""
+    if dtype.kind in 'iu' and block.dtype.kind in 'biu':
+        info = numpy.iinfo(dtype)
+    elif dtype.kind == 'f' and block.dtype.kind in 'biuf':
+        info = numpy.finfo(dtype)
+        block = block[numpy.isfinite(block)]  # Infinite and NaN values are kept as they are
+    else:
+        return False
+    return not block.size or bool(info.min <= block.min() and block.max() <= info.max)
+
+
+class AtomicArray(Atomic, ABC):
+    def __init__(self, name: str, size: int):
+        """
+        Atomic model that simulates an array of identical members with vectorized transition and output functions.
+        The phase and the time of the last and next events of every member live in NumPy arrays,
+        and user state can be stored in arrays indexed by member. Simulators schedule the whole array as a single
+        atomic model whose next event is the earliest next event of its members.
+        Transitions receive the indices of the affected members, so there is one Python call per batch of members.
+        Times are relative to the local clock of the array, which starts at 0 when the model is initialized.
+        :param name: name of the atomic model.
+        :param size: number of members.
+        :raises ImportError: if NumPy is not installed.
+        """
+        if numpy is None:
+            raise ImportError('AtomicArray requires NumPy')
+        if size < 1:
+            raise ValueError('size must be greater than 0')
+        super().__init__(name)
+        self.size: int = size
+        self.clock: float = 0  # Local clock of the array
+        self.phases: numpy.ndarray = numpy.full(size, PHASE_PASSIVE, dtype=object)
+        self.time_last: numpy.ndarray = numpy.zeros(size)
+        self.time_next: numpy.ndarray = numpy.full(size, INFINITY)
+
+    @abstractmethod
+    def initialize_members(self):
+        """Initializes the members of the array (e.g., with hold_in_members)."""
+        pass
+
+    @abstractmethod
+    def deltint_members(self, imminent: numpy.ndarray):
+        """
+        Describes the internal transitions of the members.
+        :param imminent: indices of the members with an internal event.
+        """
+        pass
+
+    @abstractmethod
+    def deltext_members(self):
+        """
+        Describes the external transitions of the members. It reads the input ports of the array and
+        updates the members affected by the inputs. Use elapsed to get the elapsed time of the members.
+        """
+        pass
+
+    @abstractmethod
+    def lambdaf_members(self, imminent: numpy.ndarray):
+        """
+        Describes the output function of the members.
+        :param imminent: indices of the members with an internal event.
+        """
+        pass
+
+    def deltcon_members(self, imminent: numpy.ndarray):
+        """
+        Confluent transitions of the members. By default, internal transitions are triggered first.
+        :param imminent: indices of the members with an internal event.
+        """
+        self.deltint_members(imminent)
+        self.deltext_members()
+
+    def imminent(self) -> numpy.ndarray:
+        """:return: indices of the members with the earliest next event."""
+        return numpy.flatnonzero(self.time_next == self.time_next.min())
+
+    def elapsed(self, members: Any = slice(None)) -> numpy.ndarray:
+        """
+        :param members: indices (or mask) of the members. Defaults to all the members.
+        :return: elapsed time since the last transition of the members.
+        """
+        return self.clock - self.time_last[members]
+
+    def sigmas(self, members: Any = slice(None)) -> numpy.ndarray:
+        """
+        :param members: indices (or mask) of the members. Defaults to all the members.
+        :return: remaining time to the next internal event of the members.
+        """
+        return self.time_next[members] - self.clock
+
+    def hold_in_members(self, members: Any, phase: str, sigma: Any):
+        """
+        Changes the phase and the next timeout of some members.
+        :param members: indices (or mask) of the members.
+        :param phase: new phase.
+        :param sigma: time remaining to the next timeout (scalar or one value per member).
+        """
+        self.phases[members] = phase
+        self.time_last[members] = self.clock
+        self.time_next[members] = self.clock + sigma
+
+    def activate_members(self, members: Any, phase: str = PHASE_ACTIVE):
+        """
+        Sets the next timeout of some members to 0.
+        :param members: indices (or mask) of the members.
+        :param phase: new phase. Defaults to "PHASE_ACTIVE".
+        """
+        self.hold_in_members(members, phase, 0)
+
+    def passivate_members(self, members: Any, phase: str = PHASE_PASSIVE):
+        """
+        Sets the next timeout of some members to infinity.
+        :param members: indices (or mask) of the members.
+        :param phase: new phase. Defaults to "PHASE_PASSIVE".
+        """
+        self.hold_in_members(members, phase, INFINITY)
+
+    def continue_members(self, members: Any):
+        """
+        Marks a transition of some members that keep their next timeout.
+        :param members: indices (or mask) of the members.
+        """
+        self.time_last[members] = self.clock
+
+    def initialize(self):
+        self.clock = 0
+        self.time_last.fill(0)
+        self.initialize_members()
+        self._update_sigma()
+
+    def deltint(self):
+        self.clock = self.time_next.min()  # Avoids accumulating rounding errors from sigma
+        self.deltint_members(self.imminent())
+        self._update_sigma()
+
+    def deltext(self, e: float):
+        self.clock += e
+        self.deltext_members()
+        self._update_sigma()
+
+    def deltcon(self):
+        self.clock = self.time_next.min()
+        self.deltcon_members(self.imminent())
+        self._update_sigma()
+
+    def lambdaf(self):
+        self.lambdaf_members(self.imminent())
+
+    def _update_sigma(self):
+        """Sets the phase and the next timeout of the array from its earliest member."""
+        self.sigma = self.time_next.min() - self.clock
+        self.phase = PHASE_PASSIVE if self.sigma == INFINITY else PHASE_ACTIVE
@@ -120,6 +120,8 @@ class CellConfig(Generic[C, S, V]):
 
 
 class Cell(Atomic, ABC, Generic[C, S, V]):
+    __slots__ = ('_clock', '_config', 'ics', 'cell_id', 'cell_state', 'neighborhood', 'in_celldevs', 'out_celldevs')
+
     def __init__(self, cell_id: C, config: CellConfig[C, S, V]):
         """
         Abstract Base Class for a Cell-DEVS cell.
@@ -147,6 +149,7 @@ class Cell(Atomic, ABC, Generic[C, S, V]):
     def local_computation(self, cell_state: S) -> S:
         """
         Computes new cell state depending on its previous state.
+        Deterministic rules can cache their results with the xdevs.memo.memoize decorator.
         :param cell_state: current cell state.
         :return: new cell state.
         """
@@ -6,7 +6,7 @@ from typing import Dict, Generic, Optional, Tuple, Type
 from xdevs.celldevs import C, S, V
 from xdevs.celldevs.cell import Cell, CellConfig
 from xdevs.celldevs.grid import GridCell, GridCellConfig, GridScenario
-from xdevs.models import Coupled
+from xdevs.models import Coupled, Port
 
 
 class CoupledCellDEVS(Coupled, ABC, Generic[C, S, V]):
@@ -31,6 +31,7 @@ class CoupledCellDEVS(Coupled, ABC, Generic[C, S, V]):
                 self._configs[config_id] = config
 
     def load_cells(self):
+        cells: list[Cell[C, S, V]] = list()
         for cell_config in self._configs.values():
             if not cell_config.default:
                 for cell_id in cell_config.cell_map:
@@ -38,18 +39,21 @@ class CoupledCellDEVS(Coupled, ABC, Generic[C, S, V]):
                         raise ValueError('cell with the same ID already exists')
                     cell: Cell[C, S, V] = self.create_cell(cell_config.cell_type, cell_id, cell_config)
                     self._cells[cell_id] = (cell, cell_config)
-                    self.add_component(cell)
+                    cells.append(cell)
+        self.add_components(cells)
 
     def load_couplings(self):
+        couplings: list[tuple[Port, Port]] = list()
         for cell_to, cell_config in self._cells.values():
             for port_from, port_to in cell_config.eic:
-                self.add_coupling(self.get_in_port(port_from), cell_to.get_in_port(port_to))
+                couplings.append((self.get_in_port(port_from), cell_to.get_in_port(port_to)))
             for neighbor in cell_to.neighborhood:
                 cell_from = self._cells[neighbor][0]
                 for port_from, port_to in cell_config.ic:
-                    self.add_coupling(cell_from.get_out_port(port_from), cell_to.get_in_port(port_to))
+                    couplings.append((cell_from.get_out_port(port_from), cell_to.get_in_port(port_to)))
             for port_from, port_to in cell_config.eoc:
-                self.add_coupling(cell_to.get_out_port(port_from), self.get_out_port(port_to))
+                couplings.append((cell_to.get_out_port(port_from), self.get_out_port(port_to)))
+        self.add_couplings(couplings)
 
     def _load_default_config(self, raw_config: Dict) -> CellConfig[C, S, V]:
         return CellConfig('default', self.c_type, self.s_type, self.v_type, **raw_config)
@@ -75,11 +79,13 @@ class CoupledGridCellDEVS(CoupledCellDEVS[Tuple[int, ...], S, V], ABC, Generic[S
     def load_cells(self):
         super().load_cells()
         default_config = self._configs['default']
+        cells: list[GridCell[S, V]] = list()
         for cell_id in self.scenario.iter_cells():
             if cell_id not in self._cells:
                 cell: GridCell[S, V] = self.create_cell(default_config.cell_type, cell_id, default_config)
                 self._cells[cell_id] = (cell, default_config)
-                self.add_component(cell)
+                cells.append(cell)
+        self.add_components(cells)
 
     def _load_default_config(self, raw_config: Dict) -> GridCellConfig[S, V]:
         return GridCellConfig(self.scenario, 'default', self.s_type, self.v_type, **raw_config)
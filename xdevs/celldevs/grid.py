@@ -219,6 +219,7 @@ class GridCellConfig(CellConfig[C, S, V], Generic[S, V]):
 
 
 class GridCell(Cell[C, S, V], ABC, Generic[S, V]):
+    __slots__ = ('scenario',)
 
     _config: GridCellConfig[S, V]
 
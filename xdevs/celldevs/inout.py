@@ -28,10 +28,12 @@ class CellMessage(Transducible, Generic[C, S]):
         }
 
 class InPort(Generic[C, S]):
+    __slots__ = ('port', 'history')
+
     def __init__(self, serve: bool = False):
         """
         Cell-DEVS in port.
-        :param serve: set to True if the port is going to be accessible via RPC server. Defaults to False.
+        :param serve: set to True if the port is going to be served to remote hosts. Defaults to False.
         """
         self.port: Port[CellMessage[C, S]] = Port(CellMessage, 'in_celldevs', serve)
         self.history: Dict[C, S] = dict()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+import io
+import mmap
+import os
+import struct
+import sys
+from array import array
+from xdevs.models import Atomic
+from xdevs.parallel import _StatePickler, _StateUnpickler, _references
+from xdevs.sim import Coordinator, Simulator
+
+# Checkpoint files start with a header, followed by four little-endian sections:
+#   1. time_last and time_next of every coordinator (float64 pairs).
+#   2. time_last and time_next of every simulator (float64 pairs).
+#   3. offsets of the state of every atomic model in the fourth section (n_simulators + 1 uint64).
+#   4. pickled states of the atomic models. References to the model structure are pickled as persistent IDs.
+# All the sections are 8-byte aligned, so they can be read directly from a memory-mapped file.
+_MAGIC = b'XDEVSCKP'
+_VERSION = 1
+_HEADER = struct.Struct('<8sIIQQd')  # magic, version, reserved, n_coordinators, n_simulators, clock time
+
+
+def _processors(coordinator: Coordinator) -> tuple[list[Coordinator], list[Simulator]]:
+    """
+    :param coordinator: root coordinator.
+    :return: all the coordinators of the simulation tree (parents before children), and the simulators of
+    all the atomic models in a deterministic order.
+    """
+    coordinators: list[Coordinator] = list()
+    simulators: dict[Atomic, Simulator] = dict()
+    stack: list[Coordinator] = [coordinator]
+    while stack:
+        coord = stack.pop()
+        coordinators.append(coord)
+        for proc in coord.processors:
+            if isinstance(proc, Coordinator):
+                stack.append(proc)
+            else:
+                simulators[proc.model] = proc
+    atomics = [ref for ref in _references(coordinator.model) if isinstance(ref, Atomic)]
+    return coordinators, [simulators[atomic] for atomic in atomics]
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _read_array(typecode: str, view: memoryview, start: int, size: int) -> array:
+    values = array(typecode)
+    with view[start:start + size * values.itemsize] as data:
+        values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def save_checkpoint(coordinator: Coordinator, path: str | os.PathLike):
+    """
+    Writes the state of a simulation to a checkpoint file. The file is replaced atomically.
+    :param coordinator: root coordinator of the simulation.
+    :param path: path of the checkpoint file.
+    """
+    coordinators, simulators = _processors(coordinator)
+    refs = _references(coordinator.model)
+    ref_ids = {id(ref): i for i, ref in enumerate(refs)}
+
+    coord_times = array('d', (t for coord in coordinators for t in (coord.time_last, coord.time_next)))
+    sim_times = array('d', (t for sim in simulators for t in (sim.time_last, sim.time_next)))
+    offsets = array('Q', [0])
+    states = io.BytesIO()
+    pickler = _StatePickler(states, ref_ids)
+    for sim in simulators:
+        pickler.dump(sim.model.save_state())
+        pickler.clear_memo()  # states are loaded independently
+        offsets.append(states.tell())
+
+    tmp_path = f'{os.fspath(path)}.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, 0, len(coordinators), len(simulators), coordinator.clock.time))
+        file.write(_little_endian(coord_times))
+        file.write(_little_endian(sim_times))
+        file.write(_little_endian(offsets))
+        file.write(states.getbuffer())
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(coordinator: Coordinator, path: str | os.PathLike):
+    """
+    Restores the state of a simulation from a checkpoint file. The file is memory-mapped,
+    so only the state of one atomic model is copied to memory at a time.
+    :param coordinator: initialized root coordinator of a model with the same structure as the checkpointed one.
+    :param path: path of the checkpoint file.
+    :raises ValueError: if the file is not a valid checkpoint or it does not match the simulated model.
+    """
+    coordinators, simulators = _processors(coordinator)
+    refs = _references(coordinator.model)
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        view = memoryview(buffer)
+        try:
+            if len(view) < _HEADER.size:
+                raise ValueError(f'{path} is not a valid checkpoint')
+            magic, version, _, n_coords, n_sims, time = _HEADER.unpack_from(view)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f'{path} is not a valid checkpoint')
+            if n_coords != len(coordinators) or n_sims != len(simulators):
+                raise ValueError(f'checkpoint {path} does not match the structure of model {coordinator.model.name}')
+
+            start = _HEADER.size
+            coord_times = _read_array('d', view, start, 2 * n_coords)
+            start += 16 * n_coords
+            sim_times = _read_array('d', view, start, 2 * n_sims)
+            start += 16 * n_sims
+            offsets = _read_array('Q', view, start, n_sims + 1)
+            start += 8 * (n_sims + 1)
+            for i, sim in enumerate(simulators):
+                with view[start + offsets[i]:start + offsets[i + 1]] as state:
+                    sim.model.restore_state(_StateUnpickler(io.BytesIO(state), refs).load())
+                sim.time_last = sim_times[2 * i]
+                sim.time_next = sim_times[2 * i + 1]
+        finally:
+            view.release()
+
+    # Children are rescheduled before their parents
+    for i in reversed(range(len(coordinators))):
+        coord = coordinators[i]
+        coord._scheduler.update(coord.processors)
+        coord.time_last = coord_times[2 * i]
+        coord.time_next = coord_times[2 * i + 1]
+    coordinator.clock.time = time
+
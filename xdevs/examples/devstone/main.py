@@ -2,7 +2,8 @@ import argparse
 import sys
 import time
 
-from xdevs.sim import Coordinator
+from xdevs.parallel import ParallelCoordinator
+from xdevs.sim import Coordinator, FlatCoordinator
 
 from xdevs.examples.devstone.devstone import LI, HO, HI, HOmod
 from xdevs.examples.devstone.generator import Generator
@@ -35,6 +36,9 @@ def parse_args():
     parser.add_argument('-i', '--int-cycles', type=int, default=0, help='Dhrystone cycles executed in internal transitions')
     parser.add_argument('-e', '--ext-cycles', type=int, default=0, help='Dhrystone cycles executed in external transitions')
     parser.add_argument('-f', '--flatten', action="store_true", help='Activate flattening on model')
+    parser.add_argument('-s', '--scheduler', default='linear', help='Coordinator scheduler (linear, heap)')
+    parser.add_argument('--flat', action="store_true", help='Use the flat simulation engine')
+    parser.add_argument('-p', '--processes', type=int, default=0, help='Number of processes of the parallel engine')
 
     args = parser.parse_args()
 
@@ -62,7 +66,12 @@ if __name__ == '__main__':
     env = DEVStoneEnvironment("DEVStoneEnvironment", devstone_model)
     model_created_time = time.time()
 
-    coord = Coordinator(env, flatten=args.flatten)
+    if args.processes:
+        coord = ParallelCoordinator(env, scheduler=args.scheduler, n_workers=args.processes)
+    elif args.flat:
+        coord = FlatCoordinator(env, scheduler=args.scheduler)
+    else:
+        coord = Coordinator(env, flatten=args.flatten, scheduler=args.scheduler)
     coord.initialize()
     engine_setup_time = time.time()
 
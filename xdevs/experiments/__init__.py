@@ -0,0 +1,4 @@
+from .base import JsonModelFactory, ModelFactory, build_model, replication_seed, seed_generators, simulate_model
+from .replications import ReplicationResults, ReplicationRunner, t_quantile
+from .sweep import ParameterSweep, grid, latin_hypercube
+from .writers import CSVResultWriter, ParquetResultWriter, ResultWriter, open_writer
@@ -0,0 +1,133 @@
+from __future__ import annotations
+import copy
+import hashlib
+import json
+import random
+from typing import Any, Callable, Optional, Union
+from xdevs import INFINITY
+from xdevs.factory import Components
+from xdevs.models import Coupled
+from xdevs.sim import Coordinator
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Model factories are callables that return a model, or paths to JSON files (see Components.from_json)
+ModelFactory = Union[Callable[..., Coupled], str]
+
+
+def replication_seed(seed: int, index: int) -> int:
+    """
+    Derives the seed of a replication from the seed of an experiment. Seeds are hashed, so the random streams
+    of different replications are independent even if the seeds of the experiments are consecutive numbers.
+    :param seed: seed of the experiment.
+    :param index: index of the replication.
+    :return: 64-bit seed of the replication.
+    """
+    digest = hashlib.sha256(f'xdevs:{seed}:{index}'.encode()).digest()
+    return int.from_bytes(digest[:8], 'little')
+
+
+def seed_generators(seed: int):
+    """
+    Seeds the global random number generators of the process: the random module and, if installed, NumPy.
+    :param seed: seed of the replication.
+    """
+    random.seed(seed)
+    if numpy is not None:
+        numpy.random.seed(seed % 2 ** 32)
+
+
+class JsonModelFactory:
+    def __init__(self, file_path: str):
+        """
+        Model factory that builds models from a JSON file (see Components.from_json).
+        The file is read only once, so the factory can be sent to other processes without the file.
+        Keyword arguments of the factory override the args and kwargs of components with a component_id.
+        Their names are the dot-separated path of the component in the JSON file followed by
+        the name of the keyword argument or the index of the positional argument (e.g., "efp.ef.gen_t" or "efp.ef.0").
+        :param file_path: path to the JSON file.
+        """
+        with open(file_path) as f:
+            self.data: dict = json.load(f)
+
+    def __call__(self, **kwargs) -> Coupled:
+        data = copy.deepcopy(self.data) if kwargs else self.data
+        for key, value in kwargs.items():
+            *path, arg = key.split('.')
+            config = data
+            for i, name in enumerate(path):
+                config = config[name] if i == 0 else config.get('components', {}).get(name)
+                if config is None:
+                    raise ValueError(f'component {".".join(path[:i + 1])} not found')
+            if not path or 'component_id' not in config:
+                raise ValueError(f'{key} is not an argument of a component with a component_id')
+            if arg.isdigit():
+                config['args'][int(arg)] = value
+            else:
+                config.setdefault('kwargs', dict())[arg] = value
+        return Components.from_dict(data)
+
+
+def build_model(factory: ModelFactory, *args, **kwargs) -> Coupled:
+    """
+    :param factory: model factory. If it is a string, it is the path to a JSON file (see JsonModelFactory).
+    :param args: positional arguments of the factory (only for callable factories).
+    :param kwargs: keyword arguments of the factory.
+    :return: new model.
+    """
+    if isinstance(factory, str):
+        if args:
+            raise ValueError('JSON model factories do not accept positional arguments')
+        return JsonModelFactory(factory)(**kwargs)
+    return factory(*args, **kwargs)
+
+
+def simulate_model(model: Coupled, time: float = INFINITY,
+                   coordinator: Callable[[Coupled], Coordinator] = Coordinator) -> Coordinator:
+    """
+    Simulates a model from its initialization to its exit.
+    :param model: model to be simulated.
+    :param time: simulation time. Defaults to infinity.
+    :param coordinator: callable that creates the coordinator of the model. Defaults to Coordinator.
+    :return: coordinator of the simulation.
+    """
+    coord = coordinator(model)
+    coord.initialize()
+    coord.simulate_time(time)
+    coord.exit()
+    return coord
+
+
+class _SimulationJob:
+    def __init__(self, factory: ModelFactory, time: float, coordinator: Callable[[Coupled], Coordinator],
+                 output: Callable[[Coupled], Any]):
+        """
+        Simulation that worker processes run with different seeds and factory arguments.
+        It is sent to every worker only once, when the worker starts (see _init_worker).
+        """
+        self.factory: ModelFactory = factory
+        self.time: float = time
+        self.coordinator: Callable[[Coupled], Coordinator] = coordinator
+        self.output: Callable[[Coupled], Any] = output
+
+    def run(self, seed: int, params: Optional[dict[str, Any]] = None) -> Any:
+        seed_generators(seed)
+        model = build_model(self.factory, **(params or dict()))
+        simulate_model(model, self.time, self.coordinator)
+        return self.output(model)
+
+
+_job: Optional[_SimulationJob] = None  # Job of the worker process. It is sent only once, when the worker starts
+
+
+def _init_worker(job: _SimulationJob):
+    global _job
+    _job = job
+
+
+def _run_job(seed: int, params: Optional[dict[str, Any]] = None) -> Any:
+    """:return: output of the job of the worker process with a seed and factory arguments."""
+    return _job.run(seed, params)
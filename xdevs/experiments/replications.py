@@ -0,0 +1,197 @@
+from __future__ import annotations
+import math
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from statistics import NormalDist
+from typing import Any, Callable, Optional
+from xdevs import INFINITY
+from xdevs.models import Coupled
+from xdevs.sim import Coordinator
+from .base import _SimulationJob, _init_worker, _run_job, ModelFactory, replication_seed
+
+
+def t_quantile(p: float, df: int) -> float:
+    """
+    Quantile function of the Student's t distribution. Exact for 1 and 2 degrees of freedom.
+    Otherwise, it uses the Cornish-Fisher expansion around the normal distribution (Abramowitz and Stegun, 26.7.5).
+    :param p: probability. It must be in the interval (0, 1).
+    :param df: degrees of freedom. It must be greater than 0.
+    :return: value t such that P(T <= t) = p.
+    """
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+    z = NormalDist().inv_cdf(p)
+    g1 = (z ** 3 + z) / 4
+    g2 = (5 * z ** 5 + 16 * z ** 3 + 3 * z) / 96
+    g3 = (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / 384
+    g4 = (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / 92160
+    return z + g1 / df + g2 / df ** 2 + g3 / df ** 3 + g4 / df ** 4
+
+
+def _run_chunk(seeds: list[int]) -> list[Any]:
+    return [_run_job(seed) for seed in seeds]
+
+
+class ReplicationResults:
+    def __init__(self, confidence: float = 0.95):
+        """
+        Outputs of the replications of an experiment, in the order of their indices.
+        Observations are the scalar values used for computing confidence intervals.
+        :param confidence: confidence level of the intervals. Defaults to 0.95.
+        """
+        self.confidence: float = confidence
+        self.seeds: list[int] = list()
+        self.outputs: list[Any] = list()
+        self.observations: list[float] = list()
+        self._mean: float = 0
+        self._m2: float = 0  # Sum of squared deviations from the mean (Welford's algorithm)
+
+    def __len__(self) -> int:
+        return len(self.outputs)
+
+    def add(self, seed: int, output: Any, observation: float | None):
+        """
+        Adds the results of a replication.
+        :param seed: seed of the replication.
+        :param output: output of the replication.
+        :param observation: observation of the replication. If None, the replication has no observation.
+        """
+        self.seeds.append(seed)
+        self.outputs.append(output)
+        if observation is not None:
+            self.observations.append(observation)
+            delta = observation - self._mean
+            self._mean += delta / len(self.observations)
+            self._m2 += delta * (observation - self._mean)
+
+    @property
+    def mean(self) -> float:
+        """:return: sample mean of the observations."""
+        return self._mean if self.observations else math.nan
+
+    @property
+    def variance(self) -> float:
+        """:return: sample variance of the observations."""
+        n = len(self.observations)
+        return self._m2 / (n - 1) if n > 1 else math.nan
+
+    @property
+    def half_width(self) -> float:
+        """:return: half-width of the confidence interval of the mean. Infinity if there are less than 2 observations."""
+        n = len(self.observations)
+        if n < 2:
+            return INFINITY
+        return t_quantile((1 + self.confidence) / 2, n - 1) * math.sqrt(self.variance / n)
+
+    @property
+    def interval(self) -> tuple[float, float]:
+        """:return: confidence interval of the mean."""
+        return self.mean - self.half_width, self.mean + self.half_width
+
+
+class ReplicationRunner:
+    def __init__(self, factory: ModelFactory, output: Callable[[Coupled], Any], time: float = INFINITY,
+                 coordinator: Callable[[Coupled], Coordinator] = Coordinator, seed: int = 0,
+                 n_workers: int | None = None, start_method: str | None = None, chunk_size: int = 1):
+        """
+        Runs independent replications of a model on a pool of worker processes.
+        Before building the model of a replication, workers seed the global random number generators
+        (see seed_generators) with a seed derived from the seed of the runner and the index of the replication.
+        Thus, results do not depend on the number of workers or the order in which replications finish.
+        The factory, the output function, and the coordinator are sent to every worker only once,
+        and workers only send back the outputs of the replications.
+        :param factory: model factory. It can be a picklable callable without arguments that returns the model,
+        or the path to a JSON file (see Components.from_json).
+        :param output: picklable callable that extracts the output of a replication from its model after the simulation.
+        The output is sent back to the runner, so it must be picklable.
+        :param time: simulation time of every replication. Defaults to infinity.
+        :param coordinator: picklable callable that creates the coordinator of a model. Defaults to Coordinator.
+        :param seed: seed of the experiment. Defaults to 0.
+        :param n_workers: number of worker processes. Defaults to the number of CPUs.
+        :param start_method: start method of the worker processes (see multiprocessing). Defaults to the platform's.
+        :param chunk_size: number of replications sent to a worker at once. Defaults to 1.
+        :raises ValueError: if the number of workers or the chunk size are less than 1.
+        """
+        if n_workers is not None and n_workers < 1:
+            raise ValueError('number of workers must be greater than 0')
+        if chunk_size < 1:
+            raise ValueError('chunk size must be greater than 0')
+        self.factory: ModelFactory = factory
+        self.output: Callable[[Coupled], Any] = output
+        self.time: float = time
+        self.coordinator: Callable[[Coupled], Coordinator] = coordinator
+        self.seed: int = seed
+        self.n_workers: int = n_workers or os.cpu_count() or 1
+        self.start_method: str | None = start_method
+        self.chunk_size: int = chunk_size
+
+    def run(self, max_replications: int, reducer: Optional[Callable[[Any], float]] = None,
+            half_width: float | None = None, confidence: float = 0.95, min_replications: int = 2) -> ReplicationResults:
+        """
+        Runs replications until the confidence interval of the mean of their observations is narrow enough
+        or the maximum number of replications is reached. Replications are added to the results in order,
+        so the stopping point only depends on the seed of the runner.
+        :param max_replications: maximum number of replications.
+        :param reducer: callable that computes the observation of a replication from its output.
+        If None (default), numeric outputs are the observations.
+        :param half_width: target half-width of the confidence interval. If None (default),
+        all the replications are executed.
+        :param confidence: confidence level of the interval. Defaults to 0.95.
+        :param min_replications: minimum number of replications before stopping. Defaults to 2.
+        :return: results of the replications.
+        :raises ValueError: if any parameter is out of range or a replication has no observation
+        but a target half-width was set.
+        """
+        if max_replications < 1:
+            raise ValueError('maximum number of replications must be greater than 0')
+        if not 0 < confidence < 1:
+            raise ValueError('confidence must be in the interval (0, 1)')
+        if min_replications < 2:
+            raise ValueError('minimum number of replications must be at least 2')
+
+        results = ReplicationResults(confidence)
+        seeds = [replication_seed(self.seed, i) for i in range(max_replications)]
+        chunks = [seeds[i:i + self.chunk_size] for i in range(0, len(seeds), self.chunk_size)]
+        n_workers = min(self.n_workers, len(chunks))
+        job = _SimulationJob(self.factory, self.time, self.coordinator, self.output)
+        ctx = multiprocessing.get_context(self.start_method)
+        with ProcessPoolExecutor(n_workers, mp_context=ctx, initializer=_init_worker, initargs=(job,)) as pool:
+            pending: dict[Future, int] = dict()
+            finished: dict[int, list[Any]] = dict()  # Outputs of finished chunks not yet added to the results
+            next_chunk = 0  # Next chunk to be submitted
+            next_result = 0  # Next chunk to be added to the results
+            done = False
+            while not done:
+                # Only a few chunks are queued, so the remaining ones can be skipped when the runner stops
+                while next_chunk < len(chunks) and len(pending) < 2 * n_workers:
+                    pending[pool.submit(_run_chunk, chunks[next_chunk])] = next_chunk
+                    next_chunk += 1
+                completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    finished[pending.pop(future)] = future.result()
+                while next_result in finished and not done:
+                    for seed, output in zip(chunks[next_result], finished.pop(next_result)):
+                        observation = self._observe(output, reducer)
+                        if observation is None and half_width is not None:
+                            raise ValueError('replications need numeric outputs or a reducer to stop early')
+                        results.add(seed, output, observation)
+                        if half_width is not None and len(results) >= min_replications \
+                                and results.half_width <= half_width:
+                            done = True
+                            break
+                    next_result += 1
+                done = done or next_result == len(chunks)
+            for future in pending:
+                future.cancel()
+        return results
+
+    @staticmethod
+    def _observe(output: Any, reducer: Optional[Callable[[Any], float]]) -> float | None:
+        if reducer is not None:
+            return reducer(output)
+        if isinstance(output, (int, float)) and not isinstance(output, bool):
+            return output
+        return None
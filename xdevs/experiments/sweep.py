@@ -0,0 +1,149 @@
+from __future__ import annotations
+import itertools
+import multiprocessing
+import os
+import random
+import time as _time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Iterable
+from xdevs import INFINITY
+from xdevs.models import Coupled
+from xdevs.sim import Coordinator
+from .base import _SimulationJob, _init_worker, _run_job, JsonModelFactory, ModelFactory, replication_seed
+from .writers import ResultWriter, open_writer
+
+
+def grid(**values: Iterable) -> list[dict[str, Any]]:
+    """
+    Full factorial design.
+    :param values: values of every parameter.
+    :return: all the combinations of parameter values.
+    """
+    names = list(values)
+    return [dict(zip(names, combination)) for combination in itertools.product(*values.values())]
+
+
+def latin_hypercube(n: int, seed: int = 0, **bounds: tuple[float, float]) -> list[dict[str, Any]]:
+    """
+    Latin hypercube design. The range of every parameter is divided into n strata of equal size,
+    and every stratum is sampled exactly once.
+    :param n: number of samples.
+    :param seed: seed of the design. Defaults to 0.
+    :param bounds: lower and upper bounds of every parameter. If both bounds are integers,
+    the parameter is sampled as an integer within the closed interval. Otherwise, it is a float.
+    :return: sampled parameter values.
+    """
+    if n < 1:
+        raise ValueError('number of samples must be greater than 0')
+    rng = random.Random(seed)
+    samples: list[dict[str, Any]] = [dict() for _ in range(n)]
+    for name, (low, high) in bounds.items():
+        strata = list(range(n))
+        rng.shuffle(strata)
+        integer = isinstance(low, int) and isinstance(high, int)
+        for sample, stratum in zip(samples, strata):
+            u = (stratum + rng.random()) / n
+            sample[name] = min(low + int(u * (high - low + 1)), high) if integer else low + u * (high - low)
+    return samples
+
+
+# Columns of the results that are not parameters or outputs of the runs
+_RUN_COLUMNS = ('run', 'wall_time')
+
+
+def _run(seed: int, params: dict[str, Any]) -> tuple[Any, float]:
+    start = _time.perf_counter()
+    output = _run_job(seed, params)
+    return output, _time.perf_counter() - start
+
+
+class ParameterSweep:
+    def __init__(self, factory: ModelFactory, output: Callable[[Coupled], Any], time: float = INFINITY,
+                 coordinator: Callable[[Coupled], Coordinator] = Coordinator, seed: int = 0,
+                 n_workers: int | None = None, start_method: str | None = None):
+        """
+        Runs a model factory with different parameters on a pool of worker processes.
+        Runs are sent to a shared queue, and idle workers take the next pending run from it.
+        Thus, workers are never idle while there are pending runs, no matter how long every run takes.
+        Every run seeds the global random number generators with a seed derived from its index (see seed_generators).
+        :param factory: model factory. It can be a picklable callable that returns the model from keyword arguments,
+        or the path to a JSON file (see JsonModelFactory).
+        :param output: picklable callable that extracts the output of a run from its model after the simulation.
+        If it returns a dictionary, its items are columns of the results. Otherwise, the output is column "output".
+        :param time: simulation time of every run. Defaults to infinity.
+        :param coordinator: picklable callable that creates the coordinator of a model. Defaults to Coordinator.
+        :param seed: seed of the sweep. Defaults to 0.
+        :param n_workers: number of worker processes. Defaults to the number of CPUs.
+        :param start_method: start method of the worker processes (see multiprocessing). Defaults to the platform's.
+        :raises ValueError: if the number of workers is less than 1.
+        """
+        if n_workers is not None and n_workers < 1:
+            raise ValueError('number of workers must be greater than 0')
+        if isinstance(factory, str):
+            factory = JsonModelFactory(factory)  # the file is read only once
+        self.factory: ModelFactory = factory
+        self.output: Callable[[Coupled], Any] = output
+        self.time: float = time
+        self.coordinator: Callable[[Coupled], Coordinator] = coordinator
+        self.seed: int = seed
+        self.n_workers: int = n_workers or os.cpu_count() or 1
+        self.start_method: str | None = start_method
+
+    def run(self, configs: Iterable[dict[str, Any]],
+            writer: ResultWriter | str | os.PathLike | None = None) -> list[dict[str, Any]]:
+        """
+        Runs the model factory with every configuration. Results are written as soon as every run finishes.
+        Rows contain the index of the run ("run"), its parameters, its output columns,
+        and its wall time in seconds ("wall_time").
+        :param configs: keyword arguments of the factory for every run (see grid and latin_hypercube).
+        :param writer: writer of the results, or path of the output file (see open_writer).
+        If None (default), results are not written.
+        :return: rows of all the runs, sorted by index.
+        :raises ValueError: if a parameter is named "run" or "wall_time", or an output column has the name
+        of another column of its row.
+        """
+        configs = list(configs)
+        rows: list[dict[str, Any]] = list()
+        if not configs:
+            return rows
+        for params in configs:
+            reserved = [name for name in _RUN_COLUMNS if name in params]
+            if reserved:
+                raise ValueError(f'parameter names {reserved} are reserved for columns of the results')
+        own_writer = isinstance(writer, (str, os.PathLike))
+        if own_writer:
+            writer = open_writer(writer)
+        try:
+            job = _SimulationJob(self.factory, self.time, self.coordinator, self.output)
+            ctx = multiprocessing.get_context(self.start_method)
+            n_workers = min(self.n_workers, len(configs))
+            with ProcessPoolExecutor(n_workers, mp_context=ctx, initializer=_init_worker, initargs=(job,)) as pool:
+                futures = {pool.submit(_run, replication_seed(self.seed, i), params): i
+                           for i, params in enumerate(configs)}
+                for future in as_completed(futures):
+                    i = futures[future]
+                    try:
+                        output, wall_time = future.result()
+                        row = self._row(i, configs[i], output, wall_time)
+                    except BaseException:
+                        pool.shutdown(wait=False, cancel_futures=True)  # pending runs are discarded
+                        raise
+                    rows.append(row)
+                    if writer is not None:
+                        writer.write(row)
+        finally:
+            if own_writer:
+                writer.close()
+        rows.sort(key=lambda r: r['run'])
+        return rows
+
+    @staticmethod
+    def _row(i: int, params: dict[str, Any], output: Any, wall_time: float) -> dict[str, Any]:
+        row = {'run': i, **params}
+        columns = output if isinstance(output, dict) else {'output': output}
+        collisions = [name for name in columns if name in row or name in _RUN_COLUMNS]
+        if collisions:
+            raise ValueError(f'output columns {collisions} of run {i} collide with other columns of its row')
+        row.update(columns)
+        row['wall_time'] = wall_time
+        return row
@@ -0,0 +1,145 @@
+from __future__ import annotations
+import csv
+import os
+from abc import ABC, abstractmethod
+from typing import Any
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class ResultWriter(ABC):
+    def __init__(self, path: str | os.PathLike):
+        """
+        Writer that stores the results of an experiment as they arrive, one row per run.
+        All the rows must have the same columns, and the columns of the file are those of the first row.
+        :param path: path of the output file.
+        """
+        self.path: str = os.fspath(path)
+        self.columns: list[str] | None = None
+
+    def __enter__(self) -> ResultWriter:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, row: dict[str, Any]):
+        """
+        Writes the row of a run.
+        :param row: values of the columns of the row.
+        :raises ValueError: if the columns of the row do not match the columns of the file.
+        """
+        if self.columns is None:
+            self.columns = list(row)
+            self._open()
+        elif len(row) != len(self.columns) or any(column not in row for column in self.columns):
+            raise ValueError(f'columns of row {row} do not match the columns of {self.path}')
+        self._write(row)
+
+    @abstractmethod
+    def _open(self):
+        """Opens the output file. It is called when the first row arrives, once the columns are known."""
+        pass
+
+    @abstractmethod
+    def _write(self, row: dict[str, Any]):
+        """Writes a row with the same columns as the file."""
+        pass
+
+    @abstractmethod
+    def close(self):
+        """Flushes the pending rows and closes the output file."""
+        pass
+
+
+class CSVResultWriter(ResultWriter):
+    def __init__(self, path: str | os.PathLike, delimiter: str = ','):
+        """
+        Writes results to a CSV file. Every row is flushed as soon as it arrives.
+        :param path: path of the output file.
+        :param delimiter: delimiter of the CSV file. Defaults to ",".
+        """
+        super().__init__(path)
+        self.delimiter: str = delimiter
+        self._file = None
+        self._writer = None
+
+    def _open(self):
+        self._file = open(self.path, 'w', newline='')
+        self._writer = csv.DictWriter(self._file, self.columns, delimiter=self.delimiter)
+        self._writer.writeheader()
+
+    def _write(self, row: dict[str, Any]):
+        self._writer.writerow(row)
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ParquetResultWriter(ResultWriter):
+    def __init__(self, path: str | os.PathLike, row_group_size: int = 64):
+        """
+        Writes results to a columnar Parquet file. It requires pyarrow.
+        Rows are buffered and written as a new row group every time the buffer is full,
+        so finished runs reach the file while the experiment is still running.
+        The column types are inferred from the first row group.
+        :param path: path of the output file.
+        :param row_group_size: number of rows of every row group. Defaults to 64.
+        :raises ImportError: if pyarrow is not installed.
+        """
+        if pyarrow is None:
+            raise ImportError('ParquetResultWriter requires pyarrow. Install it with "pip install xdevs[parquet]"')
+        if row_group_size < 1:
+            raise ValueError('row group size must be greater than 0')
+        super().__init__(path)
+        self.row_group_size: int = row_group_size
+        self._buffer: dict[str, list[Any]] = dict()
+        self._n_buffered: int = 0
+        self._writer = None
+
+    def _open(self):
+        self._buffer = {column: list() for column in self.columns}
+
+    def _write(self, row: dict[str, Any]):
+        for column, values in self._buffer.items():
+            values.append(row[column])
+        self._n_buffered += 1
+        if self._n_buffered >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if self._n_buffered:
+            schema = None if self._writer is None else self._writer.schema
+            table = pyarrow.table(self._buffer, schema=schema)
+            if self._writer is None:
+                self._writer = pyarrow.parquet.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+            for values in self._buffer.values():
+                values.clear()
+            self._n_buffered = 0
+
+    def close(self):
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def open_writer(path: str | os.PathLike, **kwargs) -> ResultWriter:
+    """
+    Creates a result writer according to the extension of the output file.
+    :param path: path of the output file. Files with the .parquet extension use ParquetResultWriter.
+    Otherwise, results are written to a CSV file.
+    :param kwargs: additional arguments of the writer.
+    :return: result writer.
+    """
+    if os.fspath(path).endswith('.parquet'):
+        return ParquetResultWriter(path, **kwargs)
+    return CSVResultWriter(path, **kwargs)
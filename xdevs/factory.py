@@ -1,4 +1,5 @@
 from __future__ import annotations
+import copy
 import json
 import sys
 from importlib.metadata import entry_points, EntryPoint
@@ -149,10 +150,10 @@ class Components:
             children: dict[str, Component] = dict()
             # Create children components
             for component_name, component_config in config['components'].items():
-                child = Components._nested_component(component_name, component_config)
-                children[component_name] = child
-                component.add_component(child)
+                children[component_name] = Components._nested_component(component_name, component_config)
+            component.add_components(children.values())
             # Create connections
+            couplings: list[tuple[Port, Port]] = list()
             for coupling in config.get('couplings', []):
                 child_from = coupling.get('componentFrom')
                 child_to = coupling.get('componentTo')
@@ -187,7 +188,8 @@ class Components:
                     raise Exception(
                         f'Invalid coupling in: {coupling}. Reason: componentFrom and componentTo are None')
 
-                component.add_coupling(port_from, port_to)
+                couplings.append((port_from, port_to))
+            component.add_couplings(couplings)
         else:
             raise Exception('No component found')
         return component
@@ -240,9 +242,18 @@ class Components:
         """
         with open(file_path) as f:
             data = json.load(f)
+        return Components.from_dict(data)
 
+    @staticmethod
+    def from_dict(data: dict):
+        """
+        A function to parse a dictionary into a DEVS model. The dictionary follows the structure of the JSON files
+        (see Components.from_json).
+        :param data: dictionary with the configuration of the model. It is not modified.
+        :return: a DEVS model according to the dictionary
+        """
         name = list(data.keys())[0]  # Gets the actual component name
-        config = data[name]  # Gets the actual component config
+        config = copy.deepcopy(data[name])  # Gets the actual component config
 
         return Components._nested_component(name, config)
 
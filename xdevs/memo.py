@@ -0,0 +1,191 @@
+from __future__ import annotations
+import functools
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+from xdevs.models import Atomic
+
+_MISSING = object()
+
+
+class TransitionCache:
+    def __init__(self, maxsize: int = 1024):
+        """
+        Bounded least-recently-used cache for the results of transition and output functions.
+        A cache can be shared by several models if their keys capture everything that determines the results.
+        :param maxsize: maximum number of cached results. Defaults to 1024.
+        :raises ValueError: if maxsize is less than 1.
+        """
+        if maxsize < 1:
+            raise ValueError('maximum size must be greater than 0')
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._results: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    @property
+    def hit_rate(self) -> float:
+        """:return: ratio of lookups that found a cached result."""
+        n_lookups = self.hits + self.misses
+        return self.hits / n_lookups if n_lookups else 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        :param key: key of the result.
+        :param default: value returned if the result is not cached. Defaults to None.
+        :return: cached result. It becomes the most recently used result.
+        """
+        result = self._results.get(key, _MISSING)
+        if result is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._results.move_to_end(key)
+        return result
+
+    def put(self, key: Hashable, result: Any):
+        """
+        Caches a result. If the cache is full, the least recently used result is discarded.
+        :param key: key of the result.
+        :param result: result to be cached.
+        """
+        self._results[key] = result
+        self._results.move_to_end(key)
+        if len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+    def clear(self):
+        """Removes all the cached results and resets the counters."""
+        self._results.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def memoize(key: Callable[..., Hashable], cache: TransitionCache | None = None, maxsize: int = 1024):
+    """
+    Decorator for methods that are pure functions of a hashable key (e.g., Cell.local_computation of deterministic
+    rules). The cache is shared by all the instances of the class, so the key must capture everything that
+    determines the result (e.g., the cell state and the relevant state of the neighbors). Cached results are returned
+    without copying them, so they must not be modified. The cache is available as the cache attribute of the method.
+    :param key: callable that receives the same positional and keyword arguments as the method (including self)
+    and returns the key.
+    :param cache: cache of the method. If None (default), the decorator creates a new one.
+    :param maxsize: maximum size of the new cache. Defaults to 1024.
+    """
+    def decorator(func: Callable) -> Callable:
+        results = cache if cache is not None else TransitionCache(maxsize)
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            k = key(self, *args, **kwargs)
+            result = results.get(k, _MISSING)
+            if result is _MISSING:
+                result = func(self, *args, **kwargs)
+                results.put(k, result)
+            return result
+
+        wrapper.cache = results
+        return wrapper
+    return decorator
+
+
+class MemoizedAtomic(Atomic, ABC):
+    def __init__(self, name: str = None, cache: TransitionCache | None = None, cache_size: int = 1024):
+        """
+        Atomic model whose transition and output functions are pure functions of its state and inputs.
+        The state of the model is identified by a hashable key (see state_key and load_state_key).
+        The results of deltint, deltext, deltcon, and lambdaf of subclasses are cached by state key,
+        phase, sigma, elapsed time, and input values. Repeated visits to the same state skip the computation.
+        If input values are not hashable, transitions are executed without the cache.
+        Cached output values are sent again without copying them, so they must not be modified by receivers.
+        :param name: name of the atomic model.
+        :param cache: cache of the model. It can be shared by models with the same behavior.
+        If None (default), the model creates a new cache.
+        :param cache_size: maximum size of the new cache. Defaults to 1024.
+        """
+        super().__init__(name)
+        self.cache: TransitionCache = cache if cache is not None else TransitionCache(cache_size)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, memoized in (('deltint', _memoized_deltint), ('deltext', _memoized_deltext),
+                               ('deltcon', _memoized_deltcon), ('lambdaf', _memoized_lambdaf)):
+            func = getattr(cls, name)
+            if not getattr(func, '__isabstractmethod__', False) and not getattr(func, '_memoized', False):
+                wrapper = functools.wraps(func)(memoized(func))
+                wrapper._memoized = True
+                setattr(cls, name, wrapper)
+
+    @abstractmethod
+    def state_key(self) -> Hashable:
+        """:return: hashable key that identifies the state of the model, excluding phase and sigma."""
+        pass
+
+    @abstractmethod
+    def load_state_key(self, key: Hashable):
+        """
+        Sets the state identified by a key returned by state_key.
+        :param key: state key.
+        """
+        pass
+
+    def save_state(self) -> Any:
+        state = super().save_state()
+        state.pop('cache', None)
+        return state
+
+    def _structure_memo(self) -> dict[int, Any]:
+        memo = super()._structure_memo()
+        memo[id(self.cache)] = self.cache  # caches are not copied
+        return memo
+
+    def _inputs_key(self) -> tuple:
+        return tuple(tuple(port.values) for port in self.in_ports)
+
+    def _run_transition(self, key: Hashable, transition: Callable, *args):
+        try:
+            result = self.cache.get(key, _MISSING)
+        except TypeError:  # unhashable inputs
+            transition(self, *args)
+            return
+        if result is _MISSING:
+            transition(self, *args)
+            self.cache.put(key, (self.state_key(), self.phase, self.sigma))
+        else:
+            state, self.phase, self.sigma = result
+            self.load_state_key(state)
+
+
+def _memoized_deltint(func: Callable) -> Callable:
+    def deltint(self: MemoizedAtomic):
+        self._run_transition(('deltint', self.state_key(), self.phase, self.sigma), func)
+    return deltint
+
+
+def _memoized_deltext(func: Callable) -> Callable:
+    def deltext(self: MemoizedAtomic, e: float):
+        self._run_transition(('deltext', self.state_key(), self.phase, self.sigma, e, self._inputs_key()), func, e)
+    return deltext
+
+
+def _memoized_deltcon(func: Callable) -> Callable:
+    def deltcon(self: MemoizedAtomic):
+        self._run_transition(('deltcon', self.state_key(), self.phase, self.sigma, self._inputs_key()), func)
+    return deltcon
+
+
+def _memoized_lambdaf(func: Callable) -> Callable:
+    def lambdaf(self: MemoizedAtomic):
+        key = ('lambdaf', self.state_key(), self.phase, self.sigma)
+        outputs = self.cache.get(key, _MISSING)
+        if outputs is _MISSING:
+            func(self)
+            self.cache.put(key, tuple(tuple(port.values) for port in self.out_ports))
+        else:
+            for port, values in zip(self.out_ports, outputs):
+                if values:
+                    port.extend(values)
+    return lambdaf
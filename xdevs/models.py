@@ -1,32 +1,44 @@
 from __future__ import annotations
-import inspect
-import pickle
+import copy
+import functools
+import itertools
 from abc import ABC, abstractmethod
-from collections import deque, defaultdict
-from typing import Generator, Generic, Iterator
-from xdevs import PHASE_ACTIVE, PHASE_PASSIVE, INFINITY, T
+from typing import Any, Collection, Generator, Generic, Iterable, Iterator
+import xdevs
+from xdevs import PHASE_ACTIVE, PHASE_PASSIVE, INFINITY, T, VALIDATION_FULL, VALIDATION_TRUSTED
 
 
 class Port(Generic[T]):
-    def __init__(self, p_type: type[T] | None = None, name: str = None, serve: bool = False):
+    __slots__ = ('name', 'p_type', 'serve', 'lookahead', 'parent', '_values', '_bag', '_view', '_dirty', '_trusted',
+                 '_dead')
+
+    def __init__(self, p_type: type[T] | None = None, name: str = None, serve: bool = False, lookahead: float = 0):
         """
         xDEVS implementation of DEVS Port.
         :param p_type: data type of events to be sent/received via the new port instance.
         :param name: name of the new port instance. Defaults to the name of the port's class.
-        :param serve: set to True if the port is going to be accessible via RPC server. Defaults to False.
+        :param serve: set to True if the port is going to be served to remote hosts. Defaults to False.
+        :param lookahead: for input ports of atomic models, minimum time between receiving an event through the port
+        and the next output of the model (see Atomic.lookahead). Defaults to 0.
         """
         self.name: str = name if name else self.__class__.__name__  # Name of the port
         self.p_type: type[T] | None = p_type  # Port type. If None, it can contain any type of event.
-        self.serve: bool = serve                 # True if port is going to be accessible via RPC server
+        self.serve: bool = serve                 # True if port is going to be served to remote hosts
+        self.lookahead: float = lookahead        # Minimum delay between input events and the next output
         self.parent: Component | None = None     # xDEVS Component that owns the port
-        self._values: deque[T] = deque()         # Bag containing events directly written to the port
+        self._values: list[T] = list()           # Bag containing events directly written to the port
         self._bag: list[Port[T]] = list()        # Bag containing coupled ports containing events
+        self._view: Collection[T] | None = None  # Cached view of all the values contained in the port
+        self._dirty: list[Port] | None = None    # List of ports with values of the simulator that owns the port
+        self._trusted: bool = False              # If True, only the first value of every cycle is checked
+        self._dead: bool = False                 # If True, values are discarded (see xdevs.analysis)
+        self.set_validation(xdevs.VALIDATION_LEVEL)
 
     def __bool__(self) -> bool:
         return not self.empty()
 
     def __len__(self) -> int:
-        return sum((len(port) for port in self._bag), len(self._values))
+        return len(self._resolve())
 
     def __str__(self) -> str:
         p_type = self.p_type.__name__ if self.p_type is not None else 'None'
@@ -38,18 +50,57 @@ class Port(Generic[T]):
     def empty(self) -> bool:
         return not bool(self._values or self._bag)
 
+    def set_validation(self, level: str):
+        """
+        Sets the validation level of the port type.
+        :param level: validation level. With VALIDATION_FULL, the port checks the type of every value.
+        With VALIDATION_TRUSTED, the port only checks the first value it receives in every simulation cycle.
+        :raises ValueError: if the validation level is unknown.
+        """
+        if level not in (VALIDATION_FULL, VALIDATION_TRUSTED):
+            raise ValueError(f'unknown validation level "{level}"')
+        self._trusted = level == VALIDATION_TRUSTED
+
     def clear(self):
         self._values.clear()
         self._bag.clear()
+        self._view = None
 
     @property
-    def values(self) -> Generator[T, None, None]:
-        """:return: Generator function that can iterate over all the values contained in the port."""
-        for val in self._values:
-            yield val
-        for port in self._bag:
-            for val in port.values:
-                yield val
+    def values(self) -> Iterator[T]:
+        """:return: Iterator that can iterate over all the values contained in the port."""
+        return iter(self._resolve())
+
+    def _resolve(self) -> Collection[T]:
+        """
+        Resolves all the values contained in the port without recursion.
+        If the port only receives values from a chain of single-source ports,
+        it returns the value bag of the last port of the chain without copying it.
+        Otherwise, values are gathered in a new list. The result is cached until the port changes.
+        :return: collection with all the values contained in the port.
+        """
+        view = self._view
+        if view is None:
+            port = self
+            while not port._values and len(port._bag) == 1:
+                port = port._bag[0]
+            if not port._bag:
+                view = port._values
+            elif port._view is not None:
+                view = port._view
+            else:
+                view = list()
+                stack: list[Port[T]] = [port]
+                while stack:
+                    p = stack.pop()
+                    if p._view is not None:
+                        view.extend(p._view)
+                    else:
+                        view.extend(p._values)
+                        stack.extend(reversed(p._bag))
+                port._view = view  # Concurrent readers may compute the same view. Any of them is valid
+            self._view = view
+        return view
 
     def get(self) -> T:
         """
@@ -62,20 +113,44 @@ class Port(Generic[T]):
         """
         Adds a new value to the local value bag of the port.
         :param val: event to be added.
-        :raises TypeError: If event is not instance of port type.
-        """
-        if self.p_type is not None and not isinstance(val, self.p_type):
+        :raises TypeError: If event is not instance of port type (see set_validation).
+        """
+        if not self._values and not self._bag:  # First value of the cycle: always checked
+            if self._dead:
+                return  # Nobody consumes the values of dead ports
+            if self.p_type is not None and not isinstance(val, self.p_type):
+                raise TypeError(f'Value type is {type(val).__name__} ({self.p_type.__name__} expected)')
+            if self._dirty is not None:
+                self._dirty.append(self)
+        elif not self._trusted and self.p_type is not None and not isinstance(val, self.p_type):
             raise TypeError(f'Value type is {type(val).__name__} ({self.p_type.__name__} expected)')
         self._values.append(val)
+        self._view = None
 
     def extend(self, vals: Iterator[T]):
         """
-        Adds a set of new values to the local value bag of the port.
+        Adds a set of new values to the local value bag of the port in bulk.
+        If any value is not valid, none of them are added.
         :param vals: list containing all the values to be added.
-        :raises TypeError: If one of the values is not instance of port type.
-        """
-        for val in vals:
-            self.add(val)
+        :raises TypeError: If one of the values is not instance of port type (see set_validation).
+        """
+        if self._dead:
+            return
+        values = self._values
+        start = len(values)
+        was_empty = not start and not self._bag
+        values.extend(vals)
+        if len(values) == start:
+            return
+        if self.p_type is not None:
+            # Trusted ports only check the first value of the cycle
+            for val in (values[start:] if not self._trusted else values[:1] if was_empty else ()):
+                if not isinstance(val, self.p_type):
+                    del values[start:]
+                    raise TypeError(f'Value type is {type(val).__name__} ({self.p_type.__name__} expected)')
+        if was_empty and self._dirty is not None:
+            self._dirty.append(self)
+        self._view = None
 
     def add_to_bag(self, port: Port[T]):
         """
@@ -83,10 +158,37 @@ class Port(Generic[T]):
         :param port: port to be added to the bag.
         """
         if port:
+            if self._dirty is not None and not self._values and not self._bag:
+                self._dirty.append(self)
             self._bag.append(port)
+            self._view = None
+
+
+# Attributes of components that define the structure of the model instead of its state
+_STRUCTURE_ATTRIBUTES = frozenset(('name', 'parent', 'input', 'output', 'in_ports', 'out_ports'))
+
+
+@functools.lru_cache(maxsize=None)
+def _slot_names(cls: type) -> tuple[str, ...]:
+    """:return: names of all the slot attributes of a class, including the slots of its base classes."""
+    names: list[str] = list()
+    for base in cls.__mro__:
+        slots = base.__dict__.get('__slots__', ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name in ('__dict__', '__weakref__'):
+                continue
+            if name.startswith('__') and not name.endswith('__'):
+                name = f'_{base.__name__.lstrip("_")}{name}'  # private slots are name-mangled
+            names.append(name)
+    return tuple(names)
 
 
 class Component(ABC):
+    # Core classes use slots to reduce their memory footprint. Subclasses that do not define __slots__
+    # store their additional attributes in an instance dictionary, as usual. Subclasses can also define __slots__
+    # with their additional attributes to avoid the instance dictionary (e.g., for models with millions of instances).
+    __slots__ = ('name', 'parent', 'input', 'output', 'in_ports', 'out_ports')
+
     def __init__(self, name: str = None):
         """
         Abstract Base Class for an xDEVS model.
@@ -168,21 +270,29 @@ class Component(ABC):
 
 
 class Coupling(Generic[T]):
+    __slots__ = ('port_from', 'port_to', 'host')
+
     def __init__(self, port_from: Port[T], port_to: Port[T], host=None):
         """
         xDEVS implementation of DEVS couplings.
         :param port_from: DEVS transmitter port.
         :param port_to: DEVS receiver port.
-        :param host: TODO documentation for this
-        :raises ValueError: port types are incompatible.
+        :param host: remote host that receives the messages of the coupling (see xdevs.remote.RemoteHost).
+        Defaults to None (i.e., local coupling).
+        :raises ValueError: port types are incompatible (i.e., none of them is a subclass of the other).
         """
         # Check that couplings are valid
-        if port_from.p_type is not None and port_to.p_type is not None and port_to in inspect.getmro(port_from.p_type):
-            raise ValueError("Ports don't share the same port type")
+        from_type, to_type = port_from.p_type, port_to.p_type
+        if isinstance(from_type, type) and isinstance(to_type, type) \
+                and not issubclass(from_type, to_type) and not issubclass(to_type, from_type):
+            raise ValueError(f"Ports don't share the same port type ({port_from} -> {port_to})")
+        from_dtype, to_dtype = getattr(port_from, 'dtype', None), getattr(port_to, 'dtype', None)
+        if from_dtype is not None and to_dtype is not None and from_dtype != to_dtype:
+            raise ValueError(f"Batch ports don't share the same data type ({port_from} -> {port_to})")
 
         self.port_from: Port = port_from
         self.port_to: Port = port_to
-        self.host = host  # TODO identify host's variable type
+        self.host = host  # Remote host of the receiver port (None for local couplings)
 
     def __str__(self) -> str:
         return f"({self.port_from} -> {self.port_to})"
@@ -192,15 +302,16 @@ class Coupling(Generic[T]):
 
     def propagate(self):
         """Copies messages from the transmitter port to the receiver port"""
-        if self.host:
+        if self.host is not None:
             if self.port_from:
-                values = list(map(lambda x: pickle.dumps(x, protocol=0).decode(), self.port_from.values))
-                self.host.inject(self.port_to, values)
+                self.host.send(self.port_to, self.port_from.values)  # sent at the end of the simulation cycle
         else:
             self.port_to.add_to_bag(self.port_from)
 
 
 class Atomic(Component, ABC):
+    __slots__ = ('phase', 'sigma')
+
     def __init__(self, name: str = None):
         """
         xDEVS implementation of DEVS Atomic Model.
@@ -273,8 +384,50 @@ class Atomic(Component, ABC):
         """
         self.sigma -= e
 
+    def lookahead(self) -> float:
+        """
+        Conservative distributed coordinators use the lookahead of atomic models to know how far other partitions
+        can advance safely. After an external or confluent transition at time t, the model must not have
+        an internal event (and thus, an output) before t + lookahead. The lookahead must not change during simulations.
+        :return: lookahead of the atomic model. By default, the minimum lookahead of its input ports.
+        """
+        return min((port.lookahead for port in self.in_ports), default=INFINITY)
+
+    def save_state(self) -> Any:
+        """
+        Takes a snapshot of the state of the atomic model. By default, it deep copies all the attributes of the model
+        (including slots) that do not belong to its structure (i.e., name, parent, and ports). Ports and the parent
+        model referenced by the state are not copied. Override this method and restore_state for models with large or
+        non-copyable states.
+        :return: snapshot of the state of the model.
+        """
+        state = {name: getattr(self, name) for name in _slot_names(type(self)) if hasattr(self, name)}
+        state.update(getattr(self, '__dict__', ()))
+        state = {key: val for key, val in state.items() if key not in _STRUCTURE_ATTRIBUTES and not isinstance(val, Port)}
+        return copy.deepcopy(state, self._structure_memo())
+
+    def restore_state(self, state: Any):
+        """
+        Restores a snapshot of the state of the atomic model taken with save_state.
+        The snapshot is not modified, so it can be restored several times.
+        :param state: snapshot of the state of the model.
+        """
+        for key, val in copy.deepcopy(state, self._structure_memo()).items():
+            setattr(self, key, val)
+
+    def _structure_memo(self) -> dict[int, Any]:
+        """:return: deepcopy memo that prevents the structure of the model from being copied."""
+        memo: dict[int, Any] = {id(port): port for port in itertools.chain(self.in_ports, self.out_ports)}
+        memo[id(self)] = self
+        memo[id(self.parent)] = self.parent
+        return memo
+
 
 class Coupled(Component, ABC):
+    # Coupled models are often used directly and extended with ports as attributes, so they keep a dictionary
+    __slots__ = ('components', 'ic', 'eic', 'eoc', '_component_set', '_routes', '_index', '_listener',
+                 '_dead_ports', '__dict__')
+
     def __init__(self, name: str = None):
         """
         xDEVS implementation of DEVS Coupled Model.
@@ -285,7 +438,11 @@ class Coupled(Component, ABC):
         self.ic: dict[Port, dict[Port, Coupling]] = dict()
         self.eic: dict[Port, dict[Port, Coupling]] = dict()
         self.eoc: dict[Port, dict[Port, Coupling]] = dict()
-        # TODO serialized versions of ic, eic and eoc for performance
+        self._component_set: set[Component] = set()  # Index of components for constant-time membership checks
+        self._routes: dict[Port, list[Coupling]] | None = None  # Cached routing table (see compile_routes)
+        self._index = None  # Cached path index (see path_index)
+        self._listener = None  # Root coordinator notified of structural changes while the model is simulated
+        self._dead_ports: list[Port] | None = None  # Ports marked as dead by xdevs.analysis.eliminate_dead_code
 
     def initialize(self):
         pass
@@ -298,21 +455,52 @@ class Coupled(Component, ABC):
         Adds coupling between two submodules of the coupled model.
         :param p_from: DEVS transmitter port.
         :param p_to: DEVS receiver port.
-        :param host: TODO documentation
+        :param host: remote host that receives the messages of the coupling (see xdevs.remote.RemoteHost).
+        Defaults to None (i.e., local coupling).
         :raises ValueError: if coupling is not well defined.
         """
-        if p_from.parent == self and p_to.parent in self.components:
-            coupling_set = self.eic
-        elif p_from.parent in self.components and p_to.parent == self:
-            coupling_set = self.eoc
-        elif p_from.parent in self.components and p_to.parent in self.components:
-            coupling_set = self.ic
-        else:
-            raise ValueError("Components that compose the coupling are not submodules of coupled model")
-
+        self._check_structure_change('add_coupling')
+        coupling_set = self._coupling_set(p_from, p_to)
         if p_from not in coupling_set:
             coupling_set[p_from] = dict()
-        coupling_set[p_from][p_to] = Coupling(p_from, p_to, host)
+        coupling = Coupling(p_from, p_to, host)
+        coupling_set[p_from][p_to] = coupling
+        p_from._dead = False  # The port has a consumer now
+        self._structure_changed('add_coupling', coupling)
+
+    def add_couplings(self, couplings: Iterable[tuple[Port, Port]], host=None):
+        """
+        Adds a batch of couplings between submodules of the coupled model.
+        All the couplings are validated before adding any of them.
+        :param couplings: pairs (DEVS transmitter port, DEVS receiver port).
+        :param host: remote host that receives the messages of the couplings (see xdevs.remote.RemoteHost).
+        Defaults to None (i.e., local couplings).
+        :raises ValueError: if any coupling is not well defined.
+        """
+        self._check_structure_change('add_coupling')
+        new_couplings = [(self._coupling_set(p_from, p_to), Coupling(p_from, p_to, host)) for p_from, p_to in couplings]
+        for coupling_set, coupling in new_couplings:
+            port_from = coupling.port_from
+            port_couplings = coupling_set.get(port_from)
+            if port_couplings is None:
+                port_couplings = coupling_set[port_from] = dict()
+            port_couplings[coupling.port_to] = coupling
+            port_from._dead = False
+        self._structure_changed('add_coupling', *(coupling for _, coupling in new_couplings))
+
+    def _coupling_set(self, p_from: Port, p_to: Port) -> dict[Port, dict[Port, Coupling]]:
+        """
+        :return: set of couplings (EIC, EOC, or IC) that a coupling between two ports belongs to.
+        :raises ValueError: if the ports do not belong to the coupled model or its submodules.
+        """
+        components = self._component_set
+        if p_from.parent is self and p_to.parent in components:
+            return self.eic
+        elif p_from.parent in components and p_to.parent is self:
+            return self.eoc
+        elif p_from.parent in components and p_to.parent in components:
+            return self.ic
+        raise ValueError("Components that compose the coupling are not submodules of coupled model")
 
     def remove_coupling(self, coupling: Coupling):
         """
@@ -320,113 +508,254 @@ class Coupled(Component, ABC):
         :param coupling: Couplings to be removed.
         :raises ValueError: if coupling is not found.
         """
+        self._check_structure_change('remove_coupling')
         port_from = coupling.port_from
         port_to = coupling.port_to
         for coupling_set in (self.eic, self.eoc, self.ic):
             if coupling_set.get(port_from, dict()).pop(port_to, None) == coupling:
                 if not coupling_set[port_from]:
                     coupling_set.pop(port_from)
+                self._structure_changed('remove_coupling', coupling)
                 return
         raise ValueError("Coupling was not found in model definition")
 
     def add_component(self, component: Component):
         """
         Adds component to coupled model.
+        If the model is being simulated, the component is initialized at the end of the current simulation cycle.
         :param component: component to be added to the Coupled model.
         """
+        self._check_structure_change('add_component')
         component.parent = self
         self.components.append(component)
+        self._component_set.add(component)
+        self._structure_changed('add_component', component)
+
+    def add_components(self, components: Iterable[Component]):
+        """
+        Adds a batch of components to coupled model.
+        :param components: components to be added to the Coupled model.
+        """
+        self._check_structure_change('add_component')
+        components = list(components)
+        for component in components:
+            component.parent = self
+        self.components.extend(components)
+        self._component_set.update(components)
+        self._structure_changed('add_component', *components)
+
+    def replicate(self, template: Component, n: int, name_fn=None) -> list[Component]:
+        """
+        Adds copies of a built atomic or coupled model to coupled model (see xdevs.prototypes.replicate).
+        Copies are much cheaper than building every component with its constructor.
+        :param template: model to be replicated. It is not added to the coupled model.
+        :param n: number of copies.
+        :param name_fn: function that returns the name of the i-th copy. By default, copies are named "<template>_<i>".
+        :return: list with the new components.
+        """
+        from xdevs.prototypes import replicate
+        components = replicate(template, n, name_fn)
+        self.add_components(components)
+        return components
+
+    def remove_component(self, component: Component):
+        """
+        Removes component and all its couplings from coupled model.
+        If the model is being simulated, the component exits at the end of the current simulation cycle.
+        :param component: component to be removed from the Coupled model.
+        :raises ValueError: if component is not a submodule of the coupled model.
+        """
+        self._check_structure_change('remove_component')
+        if component not in self._component_set:
+            raise ValueError(f"Component {component.name} is not a submodule of coupled model")
+        self.components.remove(component)
+        self._component_set.discard(component)
+        ports = set(itertools.chain(component.in_ports, component.out_ports))
+        for coupling_set in (self.eic, self.ic, self.eoc):
+            for port_from in list(coupling_set):
+                if port_from in ports:
+                    del coupling_set[port_from]
+                    continue
+                couplings = coupling_set[port_from]
+                for port_to in ports.intersection(couplings):
+                    del couplings[port_to]
+                if not couplings:
+                    del coupling_set[port_from]
+        component.parent = None
+        self._structure_changed('remove_component', component)
+
+    def compile_routes(self) -> dict[Port, list[Coupling]]:
+        """
+        Compiles the couplings of the model hierarchy into a routing table.
+        For every output port of an atomic model in the hierarchy and every input port of this model,
+        the table contains direct couplings to the final destinations of its messages: input ports of atomic models,
+        output ports of this model, and ports of remote hosts. Intermediate coupled models are skipped, so messages
+        are delivered in a single hop. If a destination is reachable via several paths, it appears once per path.
+        The table is cached, and it is invalidated when the structure of the hierarchy changes.
+        :return: dictionary {source port: list of couplings to final destinations}. Ports with no destinations are omitted.
+        """
+        if self._routes is None:
+            routes: dict[Port, list[Coupling]] = dict()
+            sources: list[Port] = list(self.in_ports)
+            stack: list[Component] = list(reversed(self.components))
+            while stack:
+                comp = stack.pop()
+                if isinstance(comp, Coupled):
+                    stack.extend(reversed(comp.components))
+                else:
+                    sources.extend(comp.out_ports)
+            for source in sources:
+                couplings = self._resolve_routes(source)
+                if couplings:
+                    routes[source] = couplings
+            self._routes = routes
+        return self._routes
+
+    def path_index(self):
+        """
+        Returns the index of the components and ports of the model hierarchy by their dot-separated paths
+        (see xdevs.paths.PathIndex). The index is built the first time it is requested, and it is updated
+        when components are added to or removed from the hierarchy.
+        :return: path index of the model.
+        """
+        if self._index is None:
+            from xdevs.paths import PathIndex
+            self._index = PathIndex(self)
+        return self._index
+
+    def _resolve_routes(self, source: Port, visited: dict[Port, list[Port]] | None = None) -> list[Coupling]:
+        """
+        Follows the couplings of the hierarchy from a source port until reaching final destinations.
+        :param source: source port.
+        :param visited: if not None, intermediate ports are mapped to the source ports that reach them.
+        :return: list of couplings from the source port to its final destinations.
+        """
+        couplings: list[Coupling] = list()
+        stack: list[Port] = [source]
+        while stack:
+            port = stack.pop()
+            comp = port.parent
+            if isinstance(comp, Coupled) and comp.input.get(port.name) is port:
+                next_couplings = comp.eic.get(port, dict()).values()  # Input port of coupled model: go down
+            elif comp is not self:  # Output port of inner component: go up
+                next_couplings = itertools.chain(comp.parent.ic.get(port, dict()).values(),
+                                                 comp.parent.eoc.get(port, dict()).values())
+            else:
+                continue
+            for coup in next_couplings:
+                port_to = coup.port_to
+                if coup.host is not None or isinstance(port_to.parent, Atomic) or port_to.parent is self:
+                    couplings.append(Coupling(source, port_to, coup.host))
+                else:
+                    stack.append(port_to)
+                    if visited is not None:
+                        port_sources = visited.setdefault(port_to, list())
+                        if not port_sources or port_sources[-1] is not source:
+                            port_sources.append(source)
+        return couplings
+
+    def _invalidate_routes(self):
+        """Removes the cached routing tables and path indexes of this model and all its ancestors."""
+        comp = self
+        while comp is not None:
+            comp._routes = None
+            comp._index = None
+            comp = comp.parent
+
+    def _check_structure_change(self, kind: str):
+        """
+        If the topmost model is being simulated, checks that its root coordinator supports a structural change
+        before the change is made, so rejected changes leave the model untouched.
+        :param kind: kind of change ("add_component", "remove_component", "add_coupling", "remove_coupling",
+        or "flatten").
+        """
+        comp = self
+        while comp.parent is not None:
+            comp = comp.parent
+        if comp._listener is not None:
+            comp._listener._check_structure_change(self, kind)
+
+    def _structure_changed(self, kind: str, *objs: Component | Coupling):
+        """
+        Invalidates the cached routing tables of the hierarchy, updates its path indexes, and,
+        if the topmost model is being simulated, notifies the structural changes to its root coordinator.
+        :param kind: kind of change ("add_component", "remove_component", "add_coupling", or "remove_coupling").
+        :param objs: added or removed components or couplings.
+        """
+        comp = self
+        while True:
+            comp._routes = None
+            if comp._index is not None and kind in ('add_component', 'remove_component'):
+                comp._index._structure_changed(self, kind, objs)
+            if comp._dead_ports is not None and kind == 'add_coupling':
+                comp._revive_dead_ports()  # New couplings may give consumers to dead ports (even via coupled ports)
+            if comp.parent is None:
+                break
+            comp = comp.parent
+        if kind == 'add_component':
+            for obj in objs:
+                if isinstance(obj, Coupled) and obj._dead_ports is not None:
+                    obj._revive_dead_ports()
+        if comp._listener is not None:
+            for obj in objs:
+                comp._listener._structure_changed(self, kind, obj)
+
+    def _revive_dead_ports(self):
+        """Revives all the ports marked as dead in the hierarchy. Dead code elimination must run again."""
+        for port in self._dead_ports:
+            port._dead = False
+        self._dead_ports = None
 
     def flatten(self) -> tuple[list[Atomic], list[Coupling]]:
         """
-        Flattens coupled model (i.e., parent coupled model inherits the connection of the model).
-        :return: Components and couplings to be transferred to parent
-        """
-        new_comps_up: list[Atomic] = list()  # list with children components to be inherited by parent
-        new_coups_up: list[Coupling] = list()  # list with couplings to be inherited by parent
-
-        old_comps: list[Coupled] = list()  # list with children coupled models to be deleted
-
-        for comp in self.components:
-            if isinstance(comp, Coupled):  # Propagate flattening to children coupled models
-                new_comps_down, new_coups_down = comp.flatten()
-                old_comps.append(comp)
-                for new_comp in new_comps_down:
-                    self.add_component(new_comp)
-                for coup in new_coups_down:
-                    self.add_coupling(coup.port_from, coup.port_to, coup.host)
-            elif isinstance(comp, Atomic):
-                new_comps_up.append(comp)
-
-        for comp in old_comps:
-            self._remove_couplings_of_child(comp)
-            self.components.remove(comp)
-
-        if self.parent is not None:  # If module is not root, trigger the flatten process
-            left_bridge_eic = self._create_left_bridge(self.parent.eic)
-            new_coups_up.extend(self._complete_left_bridge(left_bridge_eic))
-
-            left_bridge_ic = self._create_left_bridge(self.parent.ic)
-            right_bridge_ic = self._create_right_bridge(self.parent.ic)
-            new_coups_up.extend(self._complete_left_bridge(left_bridge_ic))
-            new_coups_up.extend(self._complete_right_bridge(right_bridge_ic))
-
-            right_bridge_eoc = self._create_right_bridge(self.parent.eoc)
-            new_coups_up.extend(self._complete_right_bridge(right_bridge_eoc))
-
-            new_coups_up.extend((c for cl in self.ic.values() for c in cl.values()))
-
-        return new_comps_up, new_coups_up
-
-    def _remove_couplings_of_child(self, child: Coupled):
-        for in_port in child.in_ports:
-            self._remove_couplings(in_port, self.eic)
-            self._remove_couplings(in_port, self.ic)
-        for out_port in child.out_ports:
-            self._remove_couplings(out_port, self.ic)
-            self._remove_couplings(out_port, self.eoc)
-
-    @staticmethod
-    def _remove_couplings(port: Port, couplings: dict[Port, dict[Port, Coupling]]):
-        # Remove port from couplings list
-        couplings.pop(port, None)
-        # For remaining ports, remove couplings which source is the port to be removed
-        for coups in couplings.values():
-            coups.pop(port, None)
-        return
-
-    def _create_left_bridge(self, pc) -> dict[Port, list[Port]]:
-        bridge = defaultdict(list)
-        for in_port in self.in_ports:
-            for port_from in pc:
-                if in_port in pc[port_from]:
-                    bridge[in_port].append(port_from)
-
-        return bridge
-
-    def _create_right_bridge(self, pc) -> dict[Port, list[Port]]:
-        bridge = defaultdict(list)
-        for out_port in self.out_ports:
-            for port_from in pc:
-                if port_from == out_port:
-                    for port_to in pc[port_from]:
-                        bridge[out_port].append(port_to)
-        return bridge
-
-    def _complete_left_bridge(self, bridge: dict[Port, list[Port]]) -> list[Coupling]:
-        couplings = list()
-        for coup_list in self.eic.values():
-            for coup in coup_list.values():
-                ports = bridge[coup.port_from]
-                for port in ports:
-                    couplings.append(Coupling(port, coup.port_to))
-        return couplings
-
-    def _complete_right_bridge(self, bridge: dict[Port, list[Port]]) -> list[Coupling]:
-        couplings = list()
-        for coup_list in self.eoc.values():
-            for coup in coup_list.values():
-                ports = bridge[coup.port_to]
-                for port in ports:
-                    couplings.append(Coupling(coup.port_from, port))
-        return couplings
+        Flattens coupled model (i.e., all the atomic models of the hierarchy become children of the model).
+        Couplings are rewired so messages reach the same destinations as before,
+        and inner coupled models are removed from the hierarchy (see flatten_port_map).
+        Models cannot be flattened while they are simulated.
+        :return: Components and couplings to be transferred to parent. The flattened model keeps all
+        its atomic models and couplings, so both lists are empty.
+        :raises NotImplementedError: if the model is being simulated.
+        """
+        self.flatten_port_map()
+        return list(), list()
+
+    def flatten_port_map(self) -> dict[Port, list[Port]]:
+        """
+        Flattens coupled model (see flatten) and maps the ports of the removed coupled models.
+        :return: dictionary {port of a removed coupled model: source ports whose messages reached the removed port}.
+        Source ports are output ports of atomic models and input ports of the flattened model.
+        :raises NotImplementedError: if the model is being simulated.
+        """
+        self._check_structure_change('flatten')
+        port_map: dict[Port, list[Port]] = dict()
+        atomics: list[Component] = list()
+        sources: list[Port] = list(self.in_ports)
+        stack: list[Coupled] = [self]
+        while stack:
+            coupled = stack.pop()
+            for comp in coupled.components:
+                if not isinstance(comp, Coupled):
+                    atomics.append(comp)
+                    sources.extend(comp.out_ports)
+            stack.extend(reversed([comp for comp in coupled.components if isinstance(comp, Coupled)]))
+
+        eic: dict[Port, dict[Port, Coupling]] = dict()
+        ic: dict[Port, dict[Port, Coupling]] = dict()
+        eoc: dict[Port, dict[Port, Coupling]] = dict()
+        for source in sources:
+            for coup in self._resolve_routes(source, port_map):
+                if source.parent is self:
+                    coupling_set = eic
+                elif coup.port_to.parent is self:
+                    coupling_set = eoc
+                else:
+                    coupling_set = ic
+                coupling_set.setdefault(source, dict())[coup.port_to] = coup
+
+        for comp in atomics:
+            comp.parent = self
+        self.components = atomics
+        self._component_set = set(atomics)
+        self.eic, self.ic, self.eoc = eic, ic, eoc
+        self._invalidate_routes()
+        return port_map
@@ -0,0 +1,271 @@
+from __future__ import annotations
+import io
+import multiprocessing
+import os
+import pickle
+import traceback
+from multiprocessing.connection import Connection
+from typing import Any, Iterator, Optional
+from xdevs.models import Atomic, Component, Coupled, Port
+from xdevs.sim import FlatCoordinator, SimulationClock, Simulator
+
+
+def _references(model: Coupled) -> list[Component | Port]:
+    """
+    Lists all the components and ports of a model hierarchy in a deterministic order.
+    Copies of the same model in different processes use this order to refer to the same elements.
+    Atomic models appear in the same order as the simulators of the FlatCoordinator.
+    """
+    refs: list[Component | Port] = list()
+    stack: list[Component] = [model]
+    while stack:
+        comp = stack.pop()
+        refs.append(comp)
+        refs.extend(comp.in_ports)
+        refs.extend(comp.out_ports)
+        if isinstance(comp, Coupled):
+            stack.extend(reversed(comp.components))
+    return refs
+
+
+class _StatePickler(pickle.Pickler):
+    """Pickler that serializes components and ports as references to the copy of the model of the receiver."""
+
+    def __init__(self, file, ref_ids: dict[int, int]):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.ref_ids: dict[int, int] = ref_ids
+
+    def persistent_id(self, obj: Any) -> int | None:
+        return self.ref_ids.get(id(obj))
+
+
+class _StateUnpickler(pickle.Unpickler):
+    """Unpickler that resolves references to components and ports of the local copy of the model."""
+
+    def __init__(self, file, refs: list[Component | Port]):
+        super().__init__(file)
+        self.refs: list[Component | Port] = refs
+
+    def persistent_load(self, pid: int) -> Component | Port:
+        return self.refs[pid]
+
+
+def _dump_state(model: Atomic, ref_ids: dict[int, int]) -> bytes:
+    buffer = io.BytesIO()
+    _StatePickler(buffer, ref_ids).dump(model.save_state())
+    return buffer.getvalue()
+
+
+def _load_state(model: Atomic, state: bytes, refs: list[Component | Port]):
+    model.restore_state(_StateUnpickler(io.BytesIO(state), refs).load())
+
+
+def _run_worker(conn: Connection, model: Coupled, owned: list[int], observed: set[int]):
+    """
+    Main loop of worker processes. Each worker simulates a subset of the atomic models of its copy of the model.
+    Commands are tuples (command, simulation time, job). Workers reply with tuples (error, results).
+    :param conn: connection with the parallel coordinator.
+    :param model: copy of the model under simulation.
+    :param owned: indices of the atomic models pinned to the worker.
+    :param observed: indices of the atomic models whose state must be sent after every transition.
+    """
+    refs = _references(model)
+    ref_ids = {id(ref): i for i, ref in enumerate(refs)}
+    atomics = [ref for ref in refs if isinstance(ref, Atomic)]
+    for ref in refs:
+        if isinstance(ref, Port):
+            ref._dirty = None  # ports of the worker are cleared explicitly
+    clock = SimulationClock()
+    simulators = {i: Simulator(atomics[i], clock) for i in owned}
+    try:
+        while True:
+            command, time, job = conn.recv()
+            clock.time = time
+            results = list()
+            if command == 'lambdaf':
+                for i in job:
+                    atomic = simulators[i].model
+                    simulators[i].lambdaf()
+                    results.append((i, [(p, list(port.values)) for p, port in enumerate(atomic.out_ports) if port]))
+                    for port in atomic.out_ports:
+                        port.clear()
+            elif command == 'deltfcn':
+                for i, inputs in job:
+                    sim = simulators[i]
+                    for p, values in inputs:
+                        sim.model.in_ports[p].extend(values)
+                    sim.has_input = bool(inputs)
+                    sim.deltfcn()
+                    for port in sim.model.in_ports:
+                        port.clear()
+                    state = _dump_state(sim.model, ref_ids) if i in observed else None
+                    results.append((i, sim.time_last, sim.time_next, state))
+            elif command == 'initialize':
+                for i in job:
+                    sim = simulators[i]
+                    sim.initialize()
+                    state = _dump_state(sim.model, ref_ids) if i in observed else None
+                    results.append((i, sim.time_last, sim.time_next, state))
+            elif command == 'exit':
+                for i in job:
+                    simulators[i].exit()
+                    results.append((i, _dump_state(simulators[i].model, ref_ids)))
+                conn.send((None, results))
+                break
+            else:
+                raise ValueError(f'unknown command "{command}"')
+            conn.send((None, results))
+    except Exception:
+        conn.send((traceback.format_exc(), None))
+    finally:
+        conn.close()
+
+
+class ParallelCoordinator(FlatCoordinator):
+    def __init__(self, model: Coupled, clock: Optional[SimulationClock] = None, scheduler: str = 'heap',
+                 n_workers: int | None = None, start_method: str | None = None):
+        """
+        Coordinator that executes the transitions of each simulation cycle on a pool of worker processes.
+        Atomic models are pinned to workers, and each worker simulates its own copy of them.
+        In every cycle, workers receive the messages of their influenced atomic models and return the output messages
+        and next event times of their imminent atomic models. Messages are routed by the coordinator,
+        so they must be picklable. States of atomic models observed by transducers are synchronized after every
+        transition. The rest of the atomic models of the coordinator are only synchronized when the simulation exits.
+        Atomic models must be picklable if the start method of the workers is not "fork".
+        The structure of the model cannot change during the simulation: adding or removing components or couplings
+        raises NotImplementedError, and the model is left untouched.
+        :param model: coupled model to be simulated.
+        :param clock: simulation clock. If None, the coordinator creates a new one. Defaults to None.
+        :param scheduler: scheduler used for finding imminent simulators. It can be "linear" or "heap" (default).
+        :param n_workers: number of worker processes. Defaults to the number of CPUs.
+        :param start_method: start method of the worker processes (see multiprocessing). Defaults to the platform's.
+        :raises ValueError: if scheduler is unknown or number of workers is less than 1.
+        """
+        super().__init__(model, clock, scheduler=scheduler)
+        if n_workers is not None and n_workers < 1:
+            raise ValueError('number of workers must be greater than 0')
+        self.n_workers: int = n_workers or os.cpu_count() or 1
+        self.start_method: str | None = start_method
+        self._workers: list[multiprocessing.Process] = list()
+        self._conns: list[Connection] = list()
+        self._refs: list[Component | Port] = list()
+
+    def _initialize_processors(self):
+        self._refs = _references(self.model)
+        n_workers = max(min(self.n_workers, len(self.simulators)), 1)
+        observed = {i for i, sim in enumerate(self.simulators) if sim.state_transducers is not None}
+        ctx = multiprocessing.get_context(self.start_method)
+        for w in range(n_workers):
+            parent_conn, child_conn = ctx.Pipe()
+            owned = list(range(w, len(self.simulators), n_workers))
+            worker = ctx.Process(target=_run_worker, args=(child_conn, self.model, owned, observed), daemon=True)
+            worker.start()
+            child_conn.close()
+            self._workers.append(worker)
+            self._conns.append(parent_conn)
+
+        jobs = self._jobs()
+        for i in range(len(self.simulators)):
+            jobs[i % n_workers].append(i)
+        self._update_simulators(self._exchange('initialize', jobs))
+        self._scheduler.update(self.simulators)
+
+    def _exit_processors(self):
+        if not self._workers:
+            return  # Workers were never started
+        jobs = self._jobs()
+        for i in range(len(self.simulators)):
+            jobs[i % len(self._workers)].append(i)
+        for i, state in self._exchange('exit', jobs):
+            _load_state(self.simulators[i].model, state, self._refs)
+        for worker in self._workers:
+            worker.join()
+        for conn in self._conns:
+            conn.close()
+        self._workers.clear()
+        self._conns.clear()
+
+    def _jobs(self) -> list[list]:
+        return [list() for _ in self._workers]
+
+    def _exchange(self, command: str, jobs: list[list]) -> Iterator:
+        """
+        Sends a command to all the workers with a non-empty job, and waits for their results.
+        :param command: command to be executed by the workers.
+        :param jobs: job of each worker.
+        :return: iterator over the results of all the workers.
+        :raises RuntimeError: if a worker failed to execute its job.
+        """
+        active = [w for w, job in enumerate(jobs) if job]
+        for w in active:
+            self._conns[w].send((command, self.clock.time, jobs[w]))
+        results = list()
+        errors = list()
+        for w in active:
+            error, result = self._conns[w].recv()
+            if error is not None:
+                errors.append(f'worker {w}: {error}')
+            else:
+                results.append(result)
+        if errors:
+            raise RuntimeError('\n'.join(errors))
+        for result in results:
+            yield from result
+
+    def _update_simulators(self, results: Iterator[tuple[int, float, float, bytes | None]]):
+        for i, time_last, time_next, state in results:
+            sim = self.simulators[i]
+            sim.time_last = time_last
+            sim.time_next = time_next
+            if state is not None:
+                _load_state(sim.model, state, self._refs)
+
+    def lambdaf(self):
+        jobs = self._jobs()
+        for sim in self._scheduler.imminent(self.clock.time):
+            i = self._indices[sim.model]
+            jobs[i % len(jobs)].append(i)
+        for i, outputs in self._exchange('lambdaf', jobs):
+            atomic = self.simulators[i].model
+            for p, values in outputs:
+                atomic.out_ports[p].extend(values)
+            self.propagate_output(atomic)
+
+    def deltfcn(self):
+        self.has_input = False
+        self.propagate_input()
+
+        imminent = self._scheduler.imminent(self.clock.time)
+        influenced = [proc for proc in self._influenced if proc.time_next != self.clock.time]
+        transitioned = imminent + influenced
+        jobs = self._jobs()
+        for sim in transitioned:
+            i = self._indices[sim.model]
+            inputs = list()
+            if sim.has_input:
+                sim.has_input = False
+                inputs = [(p, list(port.values)) for p, port in enumerate(sim.model.in_ports) if port]
+            jobs[i % len(jobs)].append((i, inputs))
+        self._update_simulators(self._exchange('deltfcn', jobs))
+
+        for sim in transitioned:
+            if sim.state_transducers is not None:
+                for trans in sim.state_transducers:
+                    trans.add_imminent_model(sim.model)
+            sim.trigger_event_transducers()
+        self._scheduler.update(transitioned)
+        self._influenced.clear()
+
+        self.trigger_event_transducers()
+
+        self.time_last = self.clock.time
+        self.time_next = self.time_last + self.ta()
+
+    def _check_structure_change(self, coupled, kind):
+        raise NotImplementedError(f'{type(self).__name__} does not support structural changes')
+
+    def checkpoint(self, path):
+        raise NotImplementedError(f'{type(self).__name__} does not support checkpoints')
+
+    def restore(self, path):
+        raise NotImplementedError(f'{type(self).__name__} does not support checkpoints')
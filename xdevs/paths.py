@@ -0,0 +1,167 @@
+from __future__ import annotations
+import itertools
+from fnmatch import fnmatchcase
+from typing import Iterable, Iterator, Union
+from xdevs.models import Component, Coupled, Port
+
+Element = Union[Component, Port]
+
+
+class PathIndex:
+    def __init__(self, model: Coupled):
+        """
+        Index of all the components and ports of a model hierarchy by their path.
+        Paths are the dot-separated names of an element and all its ancestors, starting with the name of the model
+        (e.g., "root.Coupled_3.Atomic_2_1.i_in"). Names of the children and ports of a component should be unique.
+        Otherwise, only the first element with a given path is indexed. Coupled models keep their index up to date
+        when components are added or removed (see Coupled.path_index), but not when ports are added or elements
+        are renamed.
+        :param model: topmost model of the hierarchy.
+        """
+        self.model: Coupled = model
+        self._paths: dict[str, Element] = dict()
+        self._add(model.name, model)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._paths
+
+    def get(self, path: str) -> Element | None:
+        """:return: component or port with the given path. If the path is not found, it returns None."""
+        return self._paths.get(path)
+
+    def port(self, path: str) -> Port | None:
+        """:return: port with the given path. If the path is not found or it is not a port, it returns None."""
+        element = self._paths.get(path)
+        return element if isinstance(element, Port) else None
+
+    def component(self, path: str) -> Component | None:
+        """:return: component with the given path. If it is not found or it is not a component, it returns None."""
+        element = self._paths.get(path)
+        return element if isinstance(element, Component) else None
+
+    def path(self, element: Element) -> str | None:
+        """:return: path of a component or port. If it does not belong to the hierarchy, it returns None."""
+        names: list[str] = list()
+        if isinstance(element, Port):
+            names.append(element.name)
+            element = element.parent
+        while element is not self.model:
+            if element is None:
+                return None
+            names.append(element.name)
+            element = element.parent
+        names.append(self.model.name)
+        return '.'.join(reversed(names))
+
+    def prefix(self, path: str) -> Iterator[tuple[str, Element]]:
+        """
+        Iterates over an element and all its descendants (i.e., subcomponents and ports).
+        :param path: path of the element.
+        :return: iterator over pairs (path, element). If the path is not found, the iterator is empty.
+        """
+        element = self._paths.get(path)
+        if element is not None:
+            yield from self._iterate(path, element)
+
+    def glob(self, pattern: str) -> Iterator[tuple[str, Element]]:
+        """
+        Iterates over the elements whose path matches a pattern. Every dot-separated segment of the pattern is matched
+        against one name with Unix shell-style wildcards (see fnmatch), and "**" matches any number of names.
+        Segments without wildcards are looked up directly, so only the matching branches of the hierarchy are visited.
+        :param pattern: path pattern (e.g., "root.Coupled_*.Atomic_2_?.i_in" or "root.**.o_out").
+        :return: iterator over pairs (path, element).
+        """
+        segments: list[str] = pattern.split('.')
+        found: set[str] = set()
+        stack: list[tuple[str, Element | None, int]] = [('', None, 0)]  # (path, element, matched segments)
+        while stack:
+            path, element, i = stack.pop()
+            if i == len(segments):
+                if element is not None and path not in found:
+                    found.add(path)
+                    yield path, element
+                continue
+            segment = segments[i]
+            if segment == '**':
+                stack.append((path, element, i + 1))  # "**" matches no names
+                stack.extend((child_path, child, i) for child_path, child in self._children(path, element))
+            elif not any(c in segment for c in '*?['):
+                child_path = f'{path}.{segment}' if path else segment
+                child = self._paths.get(child_path)
+                if child is not None and self._is_child(child, element):
+                    stack.append((child_path, child, i + 1))
+            else:
+                stack.extend((child_path, child, i + 1) for child_path, child in self._children(path, element)
+                             if fnmatchcase(child.name, segment))
+
+    def _children(self, path: str, element: Element | None) -> Iterator[tuple[str, Element]]:
+        """:return: iterator over the indexed children of an element (the model itself if element is None)."""
+        if element is None:
+            yield self.model.name, self.model
+            return
+        if isinstance(element, Port):
+            return
+        children: Iterable[Element] = itertools.chain(element.in_ports, element.out_ports)
+        if isinstance(element, Coupled):
+            children = itertools.chain(children, element.components)
+        for child in children:
+            child_path = f'{path}.{child.name}'
+            if self._paths.get(child_path) is child:
+                yield child_path, child
+
+    def _is_child(self, child: Element, element: Element | None) -> bool:
+        return child is self.model if element is None else child.parent is element
+
+    def _iterate(self, path: str, element: Element) -> Iterator[tuple[str, Element]]:
+        stack: list[tuple[str, Element]] = [(path, element)]
+        while stack:
+            path, element = stack.pop()
+            yield path, element
+            stack.extend(reversed(list(self._children(path, element))))
+
+    def _add(self, path: str, comp: Component):
+        """Indexes a component and all its descendants."""
+        paths = self._paths
+        stack: list[tuple[str, Component]] = [(path, comp)]
+        while stack:
+            path, comp = stack.pop()
+            paths.setdefault(path, comp)
+            for port in itertools.chain(comp.in_ports, comp.out_ports):
+                paths.setdefault(f'{path}.{port.name}', port)
+            if isinstance(comp, Coupled):
+                stack.extend((f'{path}.{child.name}', child) for child in reversed(comp.components))
+
+    def _remove(self, path: str, comp: Component):
+        """Removes a component and all its descendants from the index."""
+        paths = self._paths
+        stack: list[tuple[str, Component]] = [(path, comp)]
+        while stack:
+            path, comp = stack.pop()
+            if paths.get(path) is not comp:
+                continue  # Another element with the same path was indexed first
+            del paths[path]
+            for port in itertools.chain(comp.in_ports, comp.out_ports):
+                port_path = f'{path}.{port.name}'
+                if paths.get(port_path) is port:
+                    del paths[port_path]
+            if isinstance(comp, Coupled):
+                stack.extend((f'{path}.{child.name}', child) for child in comp.components)
+
+    def _structure_changed(self, coupled: Coupled, kind: str, objs: Iterable[Component]):
+        """
+        Updates the index after adding or removing components of a coupled model of the hierarchy.
+        :param coupled: coupled model that changed.
+        :param kind: kind of change ("add_component" or "remove_component").
+        :param objs: added or removed components.
+        """
+        path = self.path(coupled)
+        if path is None:
+            return
+        for comp in objs:
+            if kind == 'add_component':
+                self._add(f'{path}.{comp.name}', comp)
+            else:
+                self._remove(f'{path}.{comp.name}', comp)
@@ -0,0 +1,3 @@
+from .base import LogicalProcess, PartitionedCoordinator, partition_model
+from .conservative import ConservativeCoordinator, ConservativeProcess
+from .timewarp import TimeWarpCoordinator, TimeWarpProcess
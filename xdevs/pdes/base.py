@@ -0,0 +1,425 @@
+from __future__ import annotations
+import heapq
+import multiprocessing
+import os
+import queue
+import traceback
+from abc import ABC, abstractmethod
+from typing import Any, ClassVar, Optional
+from xdevs import INFINITY
+from xdevs.models import Atomic, Component, Coupled, Port
+from xdevs.parallel import _dump_state, _load_state, _references
+from xdevs.sim import FlatCoordinator, SimulationClock, Simulator
+
+# Superdense time stamps (simulation time, index of the simulation cycle at that simulation time).
+# An atomic model that transitions at stamp (t, k) and has a time advance of 0 is imminent at stamp (t, k + 1).
+Stamp = tuple[float, int]
+LOWEST_STAMP: Stamp = (-INFINITY, 0)
+INFINITY_STAMP: Stamp = (INFINITY, 0)
+
+
+def next_stamp(stamp: Stamp, time_next: float) -> Stamp:
+    """
+    :param stamp: stamp of the last transition of an atomic model.
+    :param time_next: time of the next internal event of the atomic model.
+    :return: stamp of the next internal event of the atomic model.
+    """
+    return (time_next, stamp[1] + 1) if time_next == stamp[0] else (time_next, 0)
+
+
+def partition_model(model: Coupled, n_partitions: int, mapping: Optional[dict[Component, int]] = None) -> list[int]:
+    """
+    Assigns the atomic models of a hierarchy to partitions.
+    By default, coupled models are split into their children until there are at least as many subtrees as partitions.
+    Then, subtrees are assigned to the partition with fewer atomic models, starting with the largest subtree.
+    :param model: model to be partitioned.
+    :param n_partitions: number of partitions.
+    :param mapping: dictionary {component: partition}. Atomic models are assigned to the partition
+    of their closest ancestor in the mapping (including themselves). If None, the default partitioning is used.
+    :return: list with the partition of every atomic model, in the same order as the simulators of FlatCoordinator.
+    :raises ValueError: if the number of partitions is less than 1 or an atomic model has no valid partition.
+    """
+    if n_partitions < 1:
+        raise ValueError('number of partitions must be greater than 0')
+    atomics: list[Atomic] = [ref for ref in _references(model) if isinstance(ref, Atomic)]
+    if mapping is None:
+        sizes: dict[Component, int] = dict()
+        for atomic in atomics:
+            comp = atomic
+            while comp is not None:
+                sizes[comp] = sizes.get(comp, 0) + 1
+                comp = comp.parent
+        units: list[Component] = [comp for comp in model.components if comp in sizes]
+        while len(units) < n_partitions:
+            coupled = [unit for unit in units if isinstance(unit, Coupled)]
+            if not coupled:
+                break
+            largest = max(coupled, key=sizes.__getitem__)
+            units.remove(largest)
+            units.extend(comp for comp in largest.components if comp in sizes)
+        loads: list[int] = [0] * n_partitions
+        mapping = dict()
+        for unit in sorted(units, key=sizes.__getitem__, reverse=True):
+            partition = loads.index(min(loads))
+            mapping[unit] = partition
+            loads[partition] += sizes[unit]
+
+    partitions: list[int] = list()
+    for atomic in atomics:
+        comp = atomic
+        while comp is not None and comp not in mapping:
+            comp = comp.parent
+        if comp is None or not 0 <= mapping[comp] < n_partitions:
+            raise ValueError(f'atomic model {atomic.name} is not assigned to a valid partition')
+        partitions.append(mapping[comp])
+    return partitions
+
+
+class LogicalProcess(ABC):
+    def __init__(self, lp_id: int, model: Coupled, partitions: list[int], inboxes: list, outbox):
+        """
+        Logical process that simulates one partition of a model. Every logical process owns a copy of the model.
+        Messages between partitions refer to ports by their index in the references of the model.
+        :param lp_id: index of the logical process (i.e., index of its partition).
+        :param model: copy of the model under simulation.
+        :param partitions: partition of every atomic model.
+        :param inboxes: queues of all the logical processes.
+        :param outbox: queue of the coordinator.
+        """
+        self.lp_id: int = lp_id
+        self.model: Coupled = model
+        self.partitions: list[int] = partitions
+        self.inboxes: list = inboxes
+        self.inbox = inboxes[lp_id]
+        self.outbox = outbox
+
+        self.refs: list[Component | Port] = _references(model)
+        self.ref_ids: dict[int, int] = {id(ref): i for i, ref in enumerate(self.refs)}
+        atomics: list[Atomic] = [ref for ref in self.refs if isinstance(ref, Atomic)]
+        self.indices: dict[Atomic, int] = {atomic: i for i, atomic in enumerate(atomics)}
+        for ref in self.refs:
+            if isinstance(ref, Port):
+                ref._dirty = None  # ports of logical processes are cleared explicitly
+
+        self.clock: SimulationClock = SimulationClock()
+        self.simulators: dict[int, Simulator] = {i: Simulator(atomics[i], self.clock)
+                                                 for i, partition in enumerate(partitions) if partition == lp_id}
+        self.stamps: dict[int, Stamp] = dict()  # Stamp of the next internal event of every atomic model
+        self.schedule: list[tuple[Stamp, int]] = list()  # Heap of stamps of next internal events (lazily updated)
+        self.end: Stamp = LOWEST_STAMP  # Cycles with a stamp greater or equal than this one are not executed
+        self.paused: bool = True        # Paused processes only handle received items
+        self.n_sent: int = 0            # Number of messages sent to other logical processes (for snapshots)
+        self.n_received: int = 0        # Number of messages received from other logical processes (for snapshots)
+        # Destinations of every output port of the partition: (partition of the receiver, destination port)
+        self.routes: dict[Port, list[tuple[int, Port]]] = dict()
+        for source, couplings in model.compile_routes().items():
+            if source.parent in self.indices and partitions[self.indices[source.parent]] == lp_id:
+                routes = [(partitions[self.indices[coup.port_to.parent]], coup.port_to)
+                          for coup in couplings if coup.port_to.parent in self.indices]
+                if routes:
+                    self.routes[source] = routes
+
+    def initialize(self, time: float):
+        self.clock.time = time
+        results = list()
+        for i, sim in self.simulators.items():
+            sim.initialize()
+            self.stamps[i] = (sim.time_next, 0)
+            results.append((i, sim.time_last, sim.time_next))
+        self._reschedule()
+        self.outbox.put(('initialize', self.lp_id, results))
+
+    def exit(self):
+        states = list()
+        for i, sim in self.simulators.items():
+            sim.exit()
+            states.append((i, _dump_state(sim.model, self.ref_ids)))
+        self.outbox.put(('exit', self.lp_id, states, self.statistics()))
+
+    def statistics(self) -> dict[str, int]:
+        """:return: statistics of the logical process, sent to the coordinator when the simulation exits."""
+        return dict()
+
+    def _reschedule(self):
+        self.schedule = [(stamp, i) for i, stamp in self.stamps.items() if stamp[0] < INFINITY]
+        heapq.heapify(self.schedule)
+
+    def next_internal(self) -> Stamp:
+        """:return: stamp of the next internal event of the partition."""
+        schedule = self.schedule
+        while schedule and self.stamps[schedule[0][1]] != schedule[0][0]:
+            heapq.heappop(schedule)  # outdated entry
+        return schedule[0][0] if schedule else INFINITY_STAMP
+
+    def pop_imminent(self, stamp: Stamp) -> list[int]:
+        """
+        Removes the imminent atomic models of a simulation cycle from the schedule.
+        :param stamp: stamp of the simulation cycle.
+        :return: indices of the imminent atomic models.
+        """
+        imminent: list[int] = list()
+        while self.next_internal() == stamp:
+            _, i = heapq.heappop(self.schedule)
+            if not imminent or imminent[-1] != i:
+                imminent.append(i)
+        return imminent
+
+    def output(self, imminent: list[int]) -> tuple[list[tuple[int, Port, list]], dict[int, list[tuple[int, int, list]]]]:
+        """
+        Executes the output functions of imminent atomic models and routes their messages.
+        :param imminent: indices of the imminent atomic models.
+        :return: local messages (index of source model, destination port, values), and remote messages
+        for every destination partition (index of source model, index of destination port, values).
+        """
+        local: list[tuple[int, Port, list]] = list()
+        remote: dict[int, list[tuple[int, int, list]]] = dict()
+        for i in imminent:
+            model = self.simulators[i].model
+            model.lambdaf()
+            for port in model.out_ports:
+                if port:
+                    values = list(port.values)
+                    for partition, port_to in self.routes.get(port, ()):
+                        if partition == self.lp_id:
+                            local.append((i, port_to, values))
+                        else:
+                            remote.setdefault(partition, list()).append((i, self.ref_ids[id(port_to)], values))
+                    port.clear()
+        return local, remote
+
+    def transition(self, stamp: Stamp, imminent: list[int], messages: list[tuple[int, Port, list]]) -> list[int]:
+        """
+        Delivers the messages of a simulation cycle and executes the transitions of the atomic models.
+        Atomic models are scheduled again according to their new stamps.
+        :param stamp: stamp of the simulation cycle.
+        :param imminent: indices of the imminent atomic models.
+        :param messages: messages (index of source model, destination port, values) of the cycle.
+        :return: indices of the atomic models that executed a transition.
+        """
+        transitioned = list(imminent)
+        # Messages are sorted by source, so input bags do not depend on the order in which messages arrived
+        for _, port, values in sorted(messages, key=lambda message: message[0]):
+            port.extend(values)
+            i = self.indices[port.parent]
+            sim = self.simulators[i]
+            if not sim.has_input:
+                sim.has_input = True
+                if self.stamps[i] != stamp:
+                    transitioned.append(i)
+        for i in transitioned:
+            sim = self.simulators[i]
+            sim._execute_transition()
+            sim._complete_transition()
+            self.stamps[i] = next_stamp(stamp, sim.time_next)
+            if sim.time_next < INFINITY:
+                heapq.heappush(self.schedule, (self.stamps[i], i))
+            for port in sim.model.in_ports:
+                port.clear()
+        return transitioned
+
+    @abstractmethod
+    def report(self) -> Any:
+        """:return: information sent to the coordinator in snapshots (e.g., the local virtual time)."""
+        pass
+
+    def resume(self, value: Any):
+        """
+        Resumes the logical process after a snapshot.
+        :param value: value computed by the coordinator from the reports of all the logical processes.
+        """
+        pass
+
+    @abstractmethod
+    def runnable(self) -> bool:
+        """:return: True if the logical process can execute a step without waiting for other logical processes."""
+        pass
+
+    @abstractmethod
+    def step(self):
+        """Executes the next step of the logical process."""
+        pass
+
+    def handle(self, item: tuple) -> bool:
+        """
+        Handles an item received from the inbox of the logical process.
+        :param item: received item. The first element of the tuple is the kind of item.
+        :return: False if the logical process must stop.
+        """
+        kind = item[0]
+        if kind == 'run':
+            self.end = item[1]
+            self.paused = False
+        elif kind == 'snapshot':
+            self.paused = True
+            self.outbox.put(('snapshot', self.lp_id, item[1], self.n_sent, self.n_received, self.report()))
+        elif kind == 'resume':
+            self.resume(item[1])
+            self.paused = False
+        elif kind == 'exit':
+            self.exit()
+            return False
+        else:
+            raise ValueError(f'unknown item "{kind}"')
+        return True
+
+    def run(self):
+        """Main loop of the logical process. Received items have priority over steps."""
+        while True:
+            try:
+                item = self.inbox.get(block=self.paused or not self.runnable())
+            except queue.Empty:
+                self.step()
+                continue
+            if not self.handle(item):
+                break
+
+
+def _run_logical_process(lp_class: type[LogicalProcess], lp_id: int, model: Coupled, partitions: list[int],
+                         inboxes: list, outbox, time: float, kwargs: dict[str, Any]):
+    try:
+        lp = lp_class(lp_id, model, partitions, inboxes, outbox, **kwargs)
+        lp.initialize(time)
+        lp.run()
+    except Exception:
+        outbox.put(('error', lp_id, traceback.format_exc()))
+
+
+class PartitionedCoordinator(FlatCoordinator):
+    lp_class: ClassVar[type[LogicalProcess]] = LogicalProcess
+
+    def __init__(self, model: Coupled, clock: Optional[SimulationClock] = None, n_partitions: int | None = None,
+                 partition_map: Optional[dict[Component, int]] = None, start_method: str | None = None):
+        """
+        Base class for coordinators that split a model into partitions, each simulated by a logical process.
+        Logical processes run on separate processes and own a copy of the model.
+        Messages between partitions must be picklable. The states of the atomic models of the coordinator
+        are synchronized when the simulation exits. Transducers, remote couplings, served ports, and injections are not supported.
+        The structure of the model cannot change during the simulation (changes raise NotImplementedError).
+        :param model: coupled model to be simulated.
+        :param clock: simulation clock. If None, the coordinator creates a new one. Defaults to None.
+        :param n_partitions: number of partitions. Defaults to the number of CPUs.
+        :param partition_map: dictionary {component: partition}. Atomic models are assigned to the partition
+        of their closest ancestor in the mapping. If None (default), the model is partitioned automatically.
+        :param start_method: start method of the logical processes (see multiprocessing). Defaults to the platform's.
+        :raises ValueError: if number of partitions is less than 1.
+        """
+        super().__init__(model, clock)
+        if n_partitions is not None and n_partitions < 1:
+            raise ValueError('number of partitions must be greater than 0')
+        self.n_partitions: int = n_partitions or os.cpu_count() or 1
+        self.partition_map: Optional[dict[Component, int]] = partition_map
+        self.start_method: str | None = start_method
+        self.statistics: dict[str, int] = dict()  # Statistics of the logical processes (e.g., number of rollbacks)
+        self._processes: list[multiprocessing.Process] = list()
+        self._inboxes: list = list()
+        self._outbox = None
+        self._snapshot_round: int = 0
+
+    def _lp_kwargs(self) -> dict[str, Any]:
+        """:return: additional keyword arguments for creating logical processes."""
+        return dict()
+
+    def _initialize_processors(self):
+        if self._transducers:
+            raise RuntimeError(f'{type(self).__name__} does not support transducers')
+        if self._remote_routes:
+            raise ValueError(f'{type(self).__name__} does not support couplings with remote hosts')
+        partitions = partition_model(self.model, self.n_partitions, self.partition_map)
+        ctx = multiprocessing.get_context(self.start_method)
+        self._inboxes = [ctx.Queue() for _ in range(self.n_partitions)]
+        self._outbox = ctx.Queue()
+        for lp_id in range(self.n_partitions):
+            process = ctx.Process(target=_run_logical_process, daemon=True,
+                                  args=(self.lp_class, lp_id, self.model, partitions, self._inboxes,
+                                        self._outbox, self.clock.time, self._lp_kwargs()))
+            process.start()
+            self._processes.append(process)
+
+        for _ in range(self.n_partitions):
+            for i, time_last, time_next in self._receive('initialize')[2]:
+                self.simulators[i].time_last = time_last
+                self.simulators[i].time_next = time_next
+        self._scheduler.update(self.simulators)
+
+    def _exit_processors(self):
+        for inbox in self._inboxes:
+            inbox.put(('exit',))
+        refs = _references(self.model)
+        self.statistics = dict()
+        for _ in range(self.n_partitions):
+            _, _, states, statistics = self._receive('exit')
+            for i, state in states:
+                _load_state(self.simulators[i].model, state, refs)
+            for key, val in statistics.items():
+                self.statistics[key] = self.statistics.get(key, 0) + val
+        for process in self._processes:
+            process.join()
+        self._processes.clear()
+        self._inboxes.clear()
+        self._outbox = None
+
+    def _broadcast(self, item: tuple):
+        for inbox in self._inboxes:
+            inbox.put(item)
+
+    def _snapshot(self) -> list:
+        """
+        Takes a consistent snapshot of the logical processes. Logical processes are paused and report
+        the number of messages that they sent and received. The snapshot is valid when two consecutive rounds of
+        reports are identical and all the sent messages were received (i.e., there are no messages in transit).
+        Logical processes remain paused until the coordinator resumes them.
+        :return: reports of the logical processes (see LogicalProcess.report).
+        """
+        previous = None
+        while True:
+            self._snapshot_round += 1
+            self._broadcast(('snapshot', self._snapshot_round))
+            reports = dict()
+            while len(reports) < self.n_partitions:
+                _, lp_id, snapshot_round, n_sent, n_received, report = self._receive('snapshot')
+                if snapshot_round == self._snapshot_round:
+                    reports[lp_id] = (n_sent, n_received, report)
+            if reports == previous and sum(r[0] for r in reports.values()) == sum(r[1] for r in reports.values()):
+                return [r[2] for r in reports.values()]
+            previous = reports
+
+    def _receive(self, kind: str) -> tuple:
+        """
+        Waits for an item sent by a logical process to the coordinator.
+        :param kind: expected kind of item.
+        :return: received item.
+        :raises RuntimeError: if a logical process failed.
+        """
+        item = self._outbox.get()
+        if item[0] == 'error':
+            raise RuntimeError(f'logical process {item[1]} failed: {item[2]}')
+        if item[0] != kind:
+            raise RuntimeError(f'unexpected item "{item[0]}" ("{kind}" expected)')
+        return item
+
+    def lambdaf(self):
+        raise NotImplementedError(f'{type(self).__name__} does not execute global simulation cycles')
+
+    def deltfcn(self):
+        raise NotImplementedError(f'{type(self).__name__} does not execute global simulation cycles')
+
+    def inject(self, port, values, e: float = 0) -> bool:
+        raise NotImplementedError(f'{type(self).__name__} does not support injections')
+
+    def inject_many(self, events, e: float = 0) -> bool:
+        raise NotImplementedError(f'{type(self).__name__} does not support injections')
+
+    def serve(self, host: str = "localhost", port: int = 8000, codec: Any = None):
+        raise NotImplementedError(f'{type(self).__name__} does not support remote hosts')
+
+    def simulate(self, num_iters: int = 10000):
+        raise NotImplementedError(f'{type(self).__name__} only supports simulate_time')
+
+    def _check_structure_change(self, coupled, kind):
+        raise NotImplementedError(f'{type(self).__name__} does not support structural changes')
+
+    def checkpoint(self, path):
+        raise NotImplementedError(f'{type(self).__name__} does not support checkpoints')
+
+    def restore(self, path):
+        raise NotImplementedError(f'{type(self).__name__} does not support checkpoints')
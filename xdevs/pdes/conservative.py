@@ -0,0 +1,197 @@
+from __future__ import annotations
+import heapq
+import time
+from typing import Optional
+from xdevs import INFINITY
+from xdevs.models import Component, Coupled, Port
+from xdevs.sim import SimulationClock
+from .base import INFINITY_STAMP, LOWEST_STAMP, LogicalProcess, PartitionedCoordinator, Stamp
+
+
+class ConservativeProcess(LogicalProcess):
+    def __init__(self, lp_id: int, model: Coupled, partitions: list[int], inboxes: list, outbox):
+        """
+        Logical process that simulates its partition conservatively (Chandy-Misra-Bryant).
+        Every input channel has a clock: no message with a lower stamp will be received through the channel.
+        Outputs of a cycle are computed when no message with a lower stamp can be received,
+        and transitions are executed when no message with a lower or equal stamp can be received.
+        After every step, the logical process sends null messages with a lower bound of the stamps of its next outputs.
+        This bound depends on the lookahead of the atomic models of the partition (see Atomic.lookahead).
+        """
+        super().__init__(lp_id, model, partitions, inboxes, outbox)
+        senders: set[int] = set()
+        for source, couplings in model.compile_routes().items():
+            if source.parent in self.indices and partitions[self.indices[source.parent]] != lp_id:
+                if any(partitions[self.indices[coup.port_to.parent]] == lp_id
+                       for coup in couplings if coup.port_to.parent in self.indices):
+                    senders.add(partitions[self.indices[source.parent]])
+        self.channels: dict[int, Stamp] = {sender: LOWEST_STAMP for sender in senders}  # Clock of input channels
+        self.receivers: list[int] = sorted({partition for routes in self.routes.values()
+                                            for partition, _ in routes if partition != lp_id})
+        # Minimum delay between input events and output events of the partition
+        self.lookahead: float = min((sim.model.lookahead() for sim in self.simulators.values()), default=INFINITY)
+        self.null_stamp: Stamp = LOWEST_STAMP  # Stamp of the last null message
+        self.n_cycles: int = 0                 # Number of executed cycles
+        self.n_nulls: int = 0                  # Number of sent null messages
+
+        self.inputs: dict[Stamp, list[tuple[int, Port, list]]] = dict()  # Received messages of every stamp
+        self.input_stamps: list[Stamp] = list()  # Heap of stamps of received messages
+        self.outputs: Stamp | None = None  # Stamp of the cycle whose outputs were sent, but not its transitions
+        self.imminent: list[int] = list()  # Imminent atomic models of the cycle whose outputs were sent
+        self.local: list[tuple[int, Port, list]] = list()  # Local messages of the cycle whose outputs were sent
+
+    def initialize(self, time: float):
+        super().initialize(time)
+        for sender in self.channels:
+            self.channels[sender] = (time, 0)  # there are no messages before the initial time
+        self.send_nulls()
+
+    def statistics(self) -> dict[str, int]:
+        return {'cycles': self.n_cycles, 'null_messages': self.n_nulls}
+
+    def next_input(self) -> Stamp:
+        """:return: stamp of the next received message."""
+        return self.input_stamps[0] if self.input_stamps else INFINITY_STAMP
+
+    def next_cycle(self) -> Stamp:
+        """:return: stamp of the next cycle of the partition."""
+        if self.outputs is not None:
+            return self.outputs
+        return min(self.next_internal(), self.next_input())
+
+    def input_time(self) -> Stamp:
+        """:return: lower bound of the stamps of the messages that the partition will receive."""
+        return min(self.channels.values(), default=INFINITY_STAMP)
+
+    def advance(self, stamp: Stamp) -> Stamp:
+        """
+        :param stamp: stamp of an input event.
+        :return: lower bound of the stamps of the output events caused by the input event.
+        """
+        if stamp[0] == INFINITY:
+            return INFINITY_STAMP
+        return (stamp[0] + self.lookahead, 0) if self.lookahead > 0 else (stamp[0], stamp[1] + 1)
+
+    def output_bound(self) -> Stamp:
+        """:return: lower bound of the stamps of the outputs caused by the known events of the partition."""
+        pending = self.next_input() if self.outputs is None else self.outputs
+        return min(self.next_internal(), self.advance(pending))
+
+    def output_time(self) -> Stamp:
+        """:return: lower bound of the stamps of the messages that the partition will send."""
+        input_time = self.input_time()
+        # With zero lookahead, advancing the input time only increases its index. Partitions waiting for each other
+        # would exchange null messages endlessly, so it is only advanced within the time of the next cycle.
+        # Otherwise, the coordinator breaks the deadlock (see ConservativeCoordinator)
+        if self.lookahead > 0 or input_time[0] == self.next_cycle()[0]:
+            input_time = self.advance(input_time)
+        return min(self.output_bound(), input_time)
+
+    def send_nulls(self):
+        """Sends null messages to the receivers of the partition if the output time increased."""
+        output_time = self.output_time()
+        if output_time > self.null_stamp:
+            self.null_stamp = output_time
+            for receiver in self.receivers:
+                self.inboxes[receiver].put(('null', self.lp_id, output_time))
+            self.n_nulls += len(self.receivers)
+
+    def runnable(self) -> bool:
+        stamp = self.next_cycle()
+        if stamp >= self.end:
+            return False
+        if self.outputs is None and self.next_internal() == stamp:
+            return self.input_time() >= stamp  # outputs only depend on previous cycles
+        return self.input_time() > stamp
+
+    def step(self):
+        """Computes the outputs of the next cycle or, if they were already sent, executes its transitions."""
+        stamp = self.next_cycle()
+        self.clock.time = stamp[0]
+        if self.outputs is None and self.next_internal() == stamp:
+            self.imminent = self.pop_imminent(stamp)
+            self.local, remote = self.output(self.imminent)
+            for receiver, contents in remote.items():
+                self.inboxes[receiver].put(('message', self.lp_id, stamp, contents))
+                self.n_sent += 1
+            self.outputs = stamp
+        else:
+            messages = self.local
+            while self.next_input() == stamp:
+                messages.extend(self.inputs.pop(heapq.heappop(self.input_stamps)))
+            self.transition(stamp, self.imminent, messages)
+            self.outputs = None
+            self.imminent = list()
+            self.local = list()
+            self.n_cycles += 1
+        self.send_nulls()
+
+    def handle(self, item: tuple) -> bool:
+        kind = item[0]
+        if kind == 'message':
+            _, sender, stamp, contents = item
+            self.n_received += 1
+            if stamp not in self.inputs:
+                self.inputs[stamp] = list()
+                heapq.heappush(self.input_stamps, stamp)
+            self.inputs[stamp].extend((src, self.refs[port_ref], values) for src, port_ref, values in contents)
+            self.channels[sender] = max(self.channels[sender], stamp)
+        elif kind == 'null':
+            _, sender, stamp = item
+            self.channels[sender] = max(self.channels[sender], stamp)
+        else:
+            return super().handle(item)
+        self.send_nulls()
+        return True
+
+    def report(self) -> tuple[Stamp, Stamp]:
+        return self.next_cycle(), self.output_bound()
+
+    def resume(self, input_time: Stamp):
+        for sender, stamp in self.channels.items():
+            self.channels[sender] = max(stamp, input_time)
+        self.send_nulls()
+
+
+class ConservativeCoordinator(PartitionedCoordinator):
+    lp_class = ConservativeProcess
+
+    def __init__(self, model: Coupled, clock: Optional[SimulationClock] = None, n_partitions: int | None = None,
+                 partition_map: Optional[dict[Component, int]] = None, start_method: str | None = None,
+                 detection_interval: float = 0.01):
+        """
+        Conservative distributed coordinator based on the Chandy-Misra-Bryant protocol.
+        Partitions of the model are simulated by logical processes that never execute a cycle before receiving
+        all its messages. Logical processes exchange null messages to advance, so partitions with a large lookahead
+        (see Atomic.lookahead and Port) synchronize with less overhead. Periodically, the coordinator takes a snapshot
+        of the logical processes to break deadlocks (e.g., cycles of partitions with zero lookahead)
+        and to detect the end of the simulation.
+        :param model: coupled model to be simulated.
+        :param clock: simulation clock. If None, the coordinator creates a new one. Defaults to None.
+        :param n_partitions: number of partitions. Defaults to the number of CPUs.
+        :param partition_map: dictionary {component: partition}. Atomic models are assigned to the partition
+        of their closest ancestor in the mapping. If None (default), the model is partitioned automatically.
+        :param start_method: start method of the logical processes (see multiprocessing). Defaults to the platform's.
+        :param detection_interval: time (in seconds) between consecutive snapshots. Defaults to 0.01.
+        :raises ValueError: if number of partitions is less than 1 or detection interval is negative.
+        """
+        super().__init__(model, clock, n_partitions, partition_map, start_method)
+        if detection_interval < 0:
+            raise ValueError('negative detection_interval is not valid')
+        self.detection_interval: float = detection_interval
+
+    def simulate_time(self, time_interv: float = INFINITY):
+        self.clock.time = self.time_next
+        end = (self.clock.time + time_interv, 0)
+        self._broadcast(('run', end))
+        while True:
+            time.sleep(self.detection_interval)
+            reports = self._snapshot()
+            next_cycle = min(report[0] for report in reports)
+            # There are no messages in transit, so no logical process can receive messages before this stamp
+            self._broadcast(('resume', min(report[1] for report in reports)))
+            if next_cycle >= end:
+                break
+        self.time_last = self.clock.time
+        self.time_next = next_cycle[0]
+        self.clock.time = self.time_next
@@ -0,0 +1,206 @@
+from __future__ import annotations
+import bisect
+import heapq
+import time
+from typing import Any, Optional
+from xdevs import INFINITY
+from xdevs.models import Component, Coupled, Port
+from xdevs.sim import SimulationClock
+from .base import INFINITY_STAMP, LOWEST_STAMP, LogicalProcess, PartitionedCoordinator, Stamp
+
+
+class TimeWarpProcess(LogicalProcess):
+    def __init__(self, lp_id: int, model: Coupled, partitions: list[int], inboxes: list, outbox):
+        """
+        Logical process that simulates its partition optimistically.
+        Before every transition, it saves the state of the atomic model. When it receives a message with a stamp
+        that is not greater than the stamp of the last executed cycle (i.e., a straggler), it rolls back to the stamp
+        of the message and sends anti-messages to cancel all the messages that it sent after that stamp.
+        """
+        super().__init__(lp_id, model, partitions, inboxes, outbox)
+        self.lvt: Stamp = LOWEST_STAMP  # Stamp of the last executed cycle
+        self.n_cycles: int = 0          # Number of executed cycles, including the rolled back ones
+        self.n_rollbacks: int = 0       # Number of rollbacks
+        self._msg_id: int = 0
+
+        self.messages: dict[tuple[int, int], tuple[Stamp, list[tuple[int, int, list]]]] = dict()  # Live messages
+        self.pending: list[tuple[Stamp, int, int]] = list()  # Heap of unprocessed messages (lazily updated)
+        self.processed: list[tuple[Stamp, int, int]] = list()  # Processed messages, sorted by stamp
+        self.sent: list[tuple[Stamp, int, int]] = list()  # Sent messages (stamp, receiver, id), sorted by stamp
+        # Saved states (stamp, atomic model, state, time_last, time_next, stamp of next event), sorted by stamp
+        self.history: list[tuple[Stamp, int, Any, float, float, Stamp]] = list()
+        self.executed: list[Stamp] = list()  # Stamps of the executed cycles
+
+    def statistics(self) -> dict[str, int]:
+        return {'cycles': self.n_cycles, 'rollbacks': self.n_rollbacks}
+
+    def next_message(self) -> Stamp:
+        """:return: stamp of the next unprocessed message."""
+        pending = self.pending
+        while pending and pending[0][1:] not in self.messages:
+            heapq.heappop(pending)  # cancelled message
+        return pending[0][0] if pending else INFINITY_STAMP
+
+    def local_time(self) -> Stamp:
+        """:return: stamp of the next cycle of the partition."""
+        return min(self.next_internal(), self.next_message())
+
+    def execute_cycle(self):
+        """Executes the next cycle of the partition."""
+        stamp = self.local_time()
+        self.clock.time = stamp[0]
+        imminent = self.pop_imminent(stamp)
+        messages: list[tuple[int, Port, list]] = list()
+        while self.next_message() == stamp:
+            entry = heapq.heappop(self.pending)
+            self.processed.append(entry)
+            for src, port_ref, values in self.messages[entry[1:]][1]:
+                messages.append((src, self.refs[port_ref], values))
+
+        for i in imminent:
+            self._save_state(stamp, i)
+        local, remote = self.output(imminent)
+        # Output messages only depend on states before the cycle. They are not cancelled when rolling back to the
+        # stamp of the cycle, so they are only sent the first time the cycle is executed
+        if not self.sent or self.sent[-1][0] != stamp:
+            for receiver, contents in remote.items():
+                self._msg_id += 1
+                self.inboxes[receiver].put(('message', self.lp_id, self._msg_id, stamp, contents))
+                self.sent.append((stamp, receiver, self._msg_id))
+                self.n_sent += 1
+        messages.extend(local)
+        saved = set(imminent)
+        for _, port, _ in messages:
+            i = self.indices[port.parent]
+            if i not in saved:
+                saved.add(i)
+                self._save_state(stamp, i)
+
+        self.transition(stamp, imminent, messages)
+        self.executed.append(stamp)
+        self.lvt = stamp
+        self.n_cycles += 1
+
+    def _save_state(self, stamp: Stamp, i: int):
+        sim = self.simulators[i]
+        self.history.append((stamp, i, sim.model.save_state(), sim.time_last, sim.time_next, self.stamps[i]))
+
+    def rollback(self, stamp: Stamp):
+        """
+        Restores the state of the partition before executing the transitions of the cycle with the given stamp.
+        Messages sent after that cycle are cancelled with anti-messages.
+        :param stamp: stamp of the first cycle to be undone.
+        """
+        history = self.history
+        while history and history[-1][0] >= stamp:
+            _, i, state, time_last, time_next, next_stamp = history.pop()
+            sim = self.simulators[i]
+            sim.model.restore_state(state)
+            sim.time_last = time_last
+            sim.time_next = time_next
+            self.stamps[i] = next_stamp
+        while self.processed and self.processed[-1][0] >= stamp:
+            heapq.heappush(self.pending, self.processed.pop())
+        while self.sent and self.sent[-1][0] > stamp:
+            sent_stamp, receiver, msg_id = self.sent.pop()
+            self.inboxes[receiver].put(('anti', self.lp_id, msg_id, sent_stamp))
+            self.n_sent += 1
+        while self.executed and self.executed[-1] >= stamp:
+            self.executed.pop()
+        self.lvt = self.executed[-1] if self.executed else LOWEST_STAMP
+        self._reschedule()
+        self.n_rollbacks += 1
+
+    def fossil_collect(self, gvt: Stamp):
+        """
+        Discards saved states and messages that are older than the global virtual time.
+        :param gvt: global virtual time. No logical process can roll back to a stamp lower than this one.
+        """
+        del self.history[:bisect.bisect_left(self.history, (gvt,))]
+        del self.sent[:bisect.bisect_left(self.sent, (gvt,))]
+        del self.executed[:bisect.bisect_left(self.executed, gvt)]
+        n = bisect.bisect_left(self.processed, (gvt,))
+        for entry in self.processed[:n]:
+            self.messages.pop(entry[1:], None)
+        del self.processed[:n]
+
+    def handle(self, item: tuple) -> bool:
+        kind = item[0]
+        if kind == 'message':
+            _, sender, msg_id, stamp, contents = item
+            self.n_received += 1
+            if stamp <= self.lvt:
+                self.rollback(stamp)
+            self.messages[(sender, msg_id)] = (stamp, contents)
+            heapq.heappush(self.pending, (stamp, sender, msg_id))
+        elif kind == 'anti':
+            _, sender, msg_id, stamp = item
+            self.n_received += 1
+            if stamp <= self.lvt:
+                self.rollback(stamp)
+            self.messages.pop((sender, msg_id), None)  # entry in the heap of pending messages is lazily removed
+        else:
+            return super().handle(item)
+        return True
+
+    def report(self) -> Stamp:
+        return self.local_time()
+
+    def resume(self, gvt: Stamp):
+        self.fossil_collect(gvt)
+
+    def runnable(self) -> bool:
+        return self.local_time() < self.end
+
+    def step(self):
+        self.execute_cycle()
+
+
+class TimeWarpCoordinator(PartitionedCoordinator):
+    lp_class = TimeWarpProcess
+
+    def __init__(self, model: Coupled, clock: Optional[SimulationClock] = None, n_partitions: int | None = None,
+                 partition_map: Optional[dict[Component, int]] = None, start_method: str | None = None,
+                 gvt_interval: float = 0.01):
+        """
+        Optimistic distributed coordinator based on the Time Warp protocol.
+        Partitions of the model are simulated speculatively by logical processes that save the state of atomic models
+        (see Atomic.save_state and Atomic.restore_state) and roll back when they receive straggler messages.
+        Periodically, the coordinator computes the global virtual time (GVT), so logical processes can discard
+        the saved states and messages that they no longer need. Simulations finish when the GVT reaches the end time.
+        :param model: coupled model to be simulated.
+        :param clock: simulation clock. If None, the coordinator creates a new one. Defaults to None.
+        :param n_partitions: number of partitions. Defaults to the number of CPUs.
+        :param partition_map: dictionary {component: partition}. Atomic models are assigned to the partition
+        of their closest ancestor in the mapping. If None (default), the model is partitioned automatically.
+        :param start_method: start method of the logical processes (see multiprocessing). Defaults to the platform's.
+        :param gvt_interval: time (in seconds) between consecutive GVT computations. Defaults to 0.01.
+        :raises ValueError: if number of partitions is less than 1 or GVT interval is negative.
+        """
+        super().__init__(model, clock, n_partitions, partition_map, start_method)
+        if gvt_interval < 0:
+            raise ValueError('negative gvt_interval is not valid')
+        self.gvt_interval: float = gvt_interval
+        self.gvt: Stamp = LOWEST_STAMP
+
+    def compute_gvt(self) -> Stamp:
+        """
+        Computes the global virtual time from a consistent snapshot of the local times of the logical processes.
+        Logical processes remain paused until the coordinator resumes them.
+        :return: global virtual time.
+        """
+        return min(self._snapshot())
+
+    def simulate_time(self, time_interv: float = INFINITY):
+        self.clock.time = self.time_next
+        end = (self.clock.time + time_interv, 0)
+        self._broadcast(('run', end))
+        while True:
+            time.sleep(self.gvt_interval)
+            self.gvt = self.compute_gvt()
+            self._broadcast(('resume', self.gvt))
+            if self.gvt >= end:
+                break
+        self.time_last = self.clock.time
+        self.time_next = self.gvt[0]
+        self.clock.time = self.time_next
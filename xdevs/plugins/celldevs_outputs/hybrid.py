@@ -5,6 +5,8 @@ from xdevs.abc.celldevs import C, S, DelayedOutput, INFINITY
 
 
 class HybridDelayedOutput(DelayedOutput[C, S], Generic[C, S]):
+    __slots__ = ('last_state', 'next_states')
+
     def __init__(self, cell_id: C, serve: bool = False):
         super().__init__(cell_id, serve)
         self.last_state: S | None = None
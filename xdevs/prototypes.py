@@ -0,0 +1,210 @@
+from __future__ import annotations
+import copy
+import functools
+import gc
+import types
+from typing import Any, Callable
+from xdevs.models import _STRUCTURE_ATTRIBUTES, _slot_names, Component, Coupled, Coupling, Port
+
+# Attributes of coupled models that define their structure or cache data derived from it
+_COUPLED_ATTRIBUTES = _STRUCTURE_ATTRIBUTES | frozenset(_slot_names(Coupled))
+# Slots of ports. Copies start with empty buffers and caches, and subclasses may add more slots
+_PORT_SLOTS = frozenset(_slot_names(Port))
+# Types whose instances are shared by all the copies (deepcopy does not copy them either)
+_IMMUTABLE_TYPES = frozenset((type(None), int, float, bool, complex, str, bytes, range, type, types.FunctionType,
+                              types.BuiltinFunctionType, type(Ellipsis), type(NotImplemented)))
+
+
+class Prototype:
+    def __init__(self, template: Component):
+        """
+        Copier of a built atomic or coupled model (see replicate). The template is traversed once to compute
+        a recipe for every component, port, and coupling. Then, every copy only allocates objects and fills their
+        attributes: constructors are not called, and couplings are not validated nor notified.
+        The template must not change while the prototype is in use.
+        :param template: model to be copied.
+        """
+        self.template: Component = template
+        components: list[tuple[Component, int]] = list()  # (component, position of its parent), parents first
+        stack: list[tuple[Component, int]] = [(template, -1)]
+        while stack:
+            comp, parent = stack.pop()
+            if isinstance(comp, Coupled):
+                stack.extend((child, len(components)) for child in reversed(comp.components))
+            components.append((comp, parent))
+        # Ancestors of the template are referenced by the copies as they are
+        self._external: dict[int, Any] = dict()
+        ancestor = template.parent
+        while ancestor is not None:
+            self._external[id(ancestor)] = ancestor
+            ancestor = ancestor.parent
+
+        structure: set[int] = set(self._external)
+        for comp, _ in components:
+            structure.add(id(comp))
+            structure.update(id(port) for port in comp.in_ports)
+            structure.update(id(port) for port in comp.out_ports)
+        self._recipes: list[tuple] = [self._recipe(comp, parent, structure) for comp, parent in components]
+
+    def __call__(self, name: str) -> Component:
+        """
+        Creates a copy of the template.
+        :param name: name of the copy.
+        :return: copy of the template. It does not have a parent.
+        """
+        new = object.__new__
+        memo: dict[int, Any] = dict(self._external)  # Elements of the template by id -> their copies
+        clones: list[Component] = list()
+        for cls, comp_id, comp_name, parent, ports, couplings, *_ in self._recipes:
+            clone = new(cls)
+            memo[comp_id] = clone
+            clone.name = comp_name
+            clone.input, clone.output, clone.in_ports, clone.out_ports = dict(), dict(), list(), list()
+            for is_input, port_id, port_cls, port_name, p_type, serve, lookahead, trusted, extra in ports:
+                port = new(port_cls)
+                port.name = port_name
+                port.p_type = p_type
+                port.serve = serve
+                port.lookahead = lookahead
+                port.parent = clone
+                port._values = list()
+                port._bag = list()
+                port._view = None
+                port._dirty = None
+                port._trusted = trusted
+                port._dead = False  # Copies are not coupled to the consumers of the template
+                if extra is not None:
+                    _copy_port_extra(extra, port, memo)
+                memo[port_id] = port
+                if is_input:
+                    clone.input[port_name] = port
+                    clone.in_ports.append(port)
+                else:
+                    clone.output[port_name] = port
+                    clone.out_ports.append(port)
+            if couplings is not None:
+                clone.components = list()
+                clone._component_set = set()
+                clone._routes = None
+                clone._index = None
+                clone._listener = None
+                clone._dead_ports = None
+            if parent < 0:
+                clone.parent = None
+            else:
+                clone.parent = parent = clones[parent]
+                parent.components.append(clone)
+                parent._component_set.add(clone)
+            clones.append(clone)
+        clones[0].name = name
+
+        # Couplings and state are copied once all the structure is mapped
+        for clone, (*_, couplings, slots, attrs, mapped, copied) in zip(clones, self._recipes):
+            if couplings is not None:
+                clone.eic, clone.ic, clone.eoc = (_copy_couplings(recipe, memo) for recipe in couplings)
+            for key, val in slots:
+                setattr(clone, key, val)
+            if attrs:
+                clone.__dict__.update(attrs)
+            for key, val_id in mapped:
+                setattr(clone, key, memo[val_id])
+            for key, val in copied:
+                setattr(clone, key, copy.deepcopy(val, memo))
+        return clones[0]
+
+    @staticmethod
+    def _recipe(comp: Component, parent: int, structure: set[int]) -> tuple:
+        """:return: data required for copying a component of the template."""
+        ports = [(True, id(port), type(port), port.name, port.p_type, port.serve, port.lookahead, port._trusted,
+                  None if type(port) is Port else port) for port in comp.in_ports]
+        ports.extend((False, id(port), type(port), port.name, port.p_type, port.serve, port.lookahead, port._trusted,
+                      None if type(port) is Port else port) for port in comp.out_ports)
+        couplings = None
+        if isinstance(comp, Coupled):
+            couplings = tuple([(id(port_from), [(id(port_to), coupling.host) for port_to, coupling in dests.items()])
+                               for port_from, dests in coupling_set.items()]
+                              for coupling_set in (comp.eic, comp.ic, comp.eoc))
+
+        slot_names = _slot_names(type(comp))
+        state = {key: getattr(comp, key) for key in slot_names if hasattr(comp, key)}
+        state.update(getattr(comp, '__dict__', ()))
+        skip = _STRUCTURE_ATTRIBUTES if couplings is None else _COUPLED_ATTRIBUTES
+        slots: list[tuple[str, Any]] = list()  # Immutable slot values, shared by all the copies
+        attrs: dict[str, Any] = dict()  # Immutable values of the instance dictionary, shared by all the copies
+        mapped: list[tuple[str, int]] = list()  # References to components and ports of the template
+        copied: list[tuple[str, Any]] = list()  # Values that are deep copied
+        for key, val in state.items():
+            if key in skip:
+                continue
+            if id(val) in structure:
+                mapped.append((key, id(val)))
+            elif not _is_immutable(val):
+                copied.append((key, val))
+            elif key in slot_names:
+                slots.append((key, val))
+            else:
+                attrs[key] = val
+        return type(comp), id(comp), comp.name, parent, ports, couplings, slots, attrs, mapped, copied
+
+
+def replicate(template: Component, n: int, name_fn: Callable[[int], str] | None = None) -> list[Component]:
+    """
+    Creates copies of a built atomic or coupled model, including all its subcomponents, ports, and couplings.
+    Copies are much cheaper than calling constructors or deepcopy: the attributes of the template are copied
+    following a precomputed recipe (see Prototype). Immutable values are shared, references to components
+    and ports of the template point to their copies, and any other value is deep copied.
+    References to ancestors of the template are shared. Port buffers start empty.
+    :param template: atomic or coupled model to be replicated. It is not modified.
+    :param n: number of copies.
+    :param name_fn: function that returns the name of the i-th copy. By default, copies are named "<template>_<i>".
+    :return: list with the copies. They do not have a parent.
+    :raises ValueError: if n is negative.
+    """
+    if n < 0:
+        raise ValueError(f"Invalid number of copies ({n})")
+    if name_fn is None:
+        name_fn = functools.partial('{}_{}'.format, template.name)
+    prototype = Prototype(template)
+    # Copies do not create garbage, so garbage collection is paused to avoid traversing them over and over
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return [prototype(name_fn(i)) for i in range(n)]
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _is_immutable(val: Any) -> bool:
+    """:return: True if a value can be shared by all the copies of a template."""
+    if type(val) in _IMMUTABLE_TYPES:
+        return True
+    if type(val) in (tuple, frozenset):
+        return all(_is_immutable(x) for x in val)
+    return False
+
+
+def _copy_port_extra(port: Port, clone: Port, memo: dict[int, Any]):
+    """Deep copies the attributes that subclasses of Port add."""
+    for key in _slot_names(type(port)):
+        if key not in _PORT_SLOTS and hasattr(port, key):
+            setattr(clone, key, copy.deepcopy(getattr(port, key), memo))
+    if hasattr(port, '__dict__'):
+        clone.__dict__.update(copy.deepcopy(port.__dict__, memo))
+
+
+def _copy_couplings(recipe: list[tuple[int, list[tuple[int, Any]]]],
+                    memo: dict[int, Any]) -> dict[Port, dict[Port, Coupling]]:
+    """:return: copy of a coupling set. Ports were already checked when the template was coupled."""
+    new = object.__new__
+    couplings: dict[Port, dict[Port, Coupling]] = dict()
+    for from_id, dests in recipe:
+        port_from = memo[from_id]
+        couplings[port_from] = port_couplings = dict()
+        for to_id, host in dests:
+            coupling = new(Coupling)
+            coupling.port_from = port_from
+            coupling.port_to = port_to = memo[to_id]
+            coupling.host = host
+            port_couplings[port_to] = coupling
+    return couplings
@@ -0,0 +1,156 @@
+from __future__ import annotations
+import pickle
+import socket
+import socketserver
+import struct
+import threading
+from typing import Any, Iterable, Optional
+from xdevs.models import Port
+
+_LENGTH = struct.Struct('!I')  # Header of frames: length of the payload in bytes
+_REPLY = struct.Struct('!?')   # Reply to frames: True if the receiver accepted the messages
+
+
+class PickleCodec:
+    def __init__(self, protocol: int = pickle.HIGHEST_PROTOCOL):
+        """
+        Default codec of remote couplings. Any object with the encode and decode methods can be used as a codec.
+        :param protocol: pickle protocol. Defaults to the highest protocol available.
+        """
+        self.protocol: int = protocol
+
+    def encode(self, obj: Any) -> bytes:
+        return pickle.dumps(obj, protocol=self.protocol)
+
+    def decode(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+def remote_name(port: Port) -> str:
+    """:return: name of the served port that receives the messages sent to the given port (see Coordinator.serve)."""
+    return f'{port.parent.name}.{port.name}' if port.parent is not None else port.name
+
+
+def _send_frame(sock: socket.socket, payload: bytes):
+    sock.sendall(_LENGTH.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes | None:
+    """:return: the next size bytes of the socket, or None if the connection was closed before."""
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            return None
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+def _recv_frame(sock: socket.socket) -> bytes | None:
+    """:return: payload of the next frame of the socket, or None if the connection was closed."""
+    header = _recv_exact(sock, _LENGTH.size)
+    return None if header is None else _recv_exact(sock, _LENGTH.unpack(header)[0])
+
+
+class RemoteHost:
+    def __init__(self, address: tuple[str, int], codec: Any = None, timeout: float | None = None):
+        """
+        Remote simulation that receives messages through couplings (see Coupled.add_coupling).
+        Messages sent to the host in a simulation cycle are batched and sent in a single binary frame at the end
+        of the cycle over a persistent TCP connection. The remote coordinator (see Coordinator.serve) injects
+        all the messages of a frame in a single step. Destination ports are identified by the names of their
+        parent and their own name (e.g., "processor.i_in"), so local couplings can point to placeholder models.
+        :param address: address (host, port) of the remote coordinator.
+        :param codec: codec of frames. It must be the same as the codec of the remote coordinator.
+        Defaults to PickleCodec.
+        :param timeout: timeout (in seconds) of socket operations. Defaults to None (blocking sockets).
+        """
+        self.address: tuple[str, int] = address
+        self.codec: Any = codec if codec is not None else PickleCodec()
+        self.timeout: float | None = timeout
+        self.n_frames: int = 0  # Number of frames sent to the host
+        self._batch: dict[str, list] = dict()  # Messages of the current cycle for every remote port
+        self._socket: socket.socket | None = None
+
+    def send(self, port: Port, values: Iterable):
+        """
+        Adds messages to the batch of the current cycle.
+        :param port: destination port.
+        :param values: messages.
+        """
+        self._batch.setdefault(remote_name(port), list()).extend(values)
+
+    def flush(self) -> bool:
+        """
+        Sends the batch of the current cycle to the remote coordinator and waits for its reply.
+        :return: True if the remote coordinator accepted the messages (see Coordinator.inject).
+        :raises ConnectionError: if the connection was closed by the remote coordinator.
+        """
+        if not self._batch:
+            return True
+        frame = list(self._batch.items())
+        self._batch.clear()
+        if self._socket is None:
+            self._socket = socket.create_connection(self.address, self.timeout)
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        _send_frame(self._socket, self.codec.encode(frame))
+        self.n_frames += 1
+        reply = _recv_exact(self._socket, _REPLY.size)
+        if reply is None:
+            raise ConnectionError(f'connection with {self.address} was closed')
+        return _REPLY.unpack(reply)[0]
+
+    def close(self):
+        """Closes the connection with the remote coordinator. It is opened again with the next frame."""
+        self._batch.clear()
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+class _FrameHandler(socketserver.BaseRequestHandler):
+    def setup(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self):
+        server: RemoteServer = self.server
+        while True:
+            payload = _recv_frame(self.request)
+            if payload is None:
+                break
+            frame = server.codec.decode(payload)
+            with server.lock:
+                accepted = server.coordinator.inject_many(frame)
+            self.request.sendall(_REPLY.pack(accepted))
+
+
+class RemoteServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: tuple[str, int], coordinator, codec: Any = None):
+        """
+        TCP server that injects the frames received from remote hosts into a coordinator.
+        Frames are injected one at a time, even if they come from different connections.
+        :param address: address (host, port) of the server.
+        :param coordinator: coordinator that receives the messages.
+        :param codec: codec of frames. Defaults to PickleCodec.
+        """
+        super().__init__(address, _FrameHandler)
+        self.coordinator = coordinator
+        self.codec: Any = codec if codec is not None else PickleCodec()
+        self.lock: threading.Lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Serves requests in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name='xdevs-server', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops serving requests and closes the server."""
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
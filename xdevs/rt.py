@@ -157,12 +157,18 @@ class RealTimeCoordinator(Coordinator):
             t, events = self.manager.wait_until(min(time_interv, self.time_next))
             # INJECT EXTERNAL EVENTS (if any)
             for port_id, msg in events:
+                # Input ports of the model are referred by their name, and inner ports by their path
                 port = self.model.get_in_port(port_id)
+                if port is None:
+                    port = self.model.path_index().port(port_id)
                 if port is not None:
                     try:
                         port.add(msg)
                     except TypeError as e:
                         print(f'invalid message type: {e}', file=sys.stderr)
+                    else:
+                        if port.parent is not self.model:
+                            self._influence_port(port)
                 else:
                     print(f'input port "{port_id}" does not exit', file=sys.stderr)
             # UPDATE SIMULATION CLOCK
@@ -176,6 +182,10 @@ class RealTimeCoordinator(Coordinator):
             # EJECT NEW OUTPUT EVENTS
             for port in self.model.out_ports:
                 self.manager.propagate_output(port)
+            self._send_remote()
             # CLEAR THE PORTS OF THE MODEL
             self.clear()
+            # APPLY STRUCTURAL CHANGES (if any)
+            if self._structure_changes:
+                self._apply_structure_changes()
         self.exit()
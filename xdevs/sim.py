@@ -1,18 +1,20 @@
 from __future__ import annotations
 
-import _thread
+import heapq
 import itertools
-import pickle
 import logging
+import os
+import sys
 
 from abc import ABC, abstractmethod
 from collections import defaultdict
-from typing import Generator, Optional
-from xmlrpc.server import SimpleXMLRPCServer
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Generator, Iterable, Iterator, Optional
 
 from xdevs import INFINITY, T
-from xdevs.models import Atomic, Coupled, Component, Port
+from xdevs.models import Atomic, Coupled, Component, Coupling, Port
 from xdevs.abc import Transducer
+from xdevs.remote import RemoteServer
 
 
 class SimulationClock:
@@ -21,12 +23,16 @@ class SimulationClock:
 
 
 class AbstractSimulator(ABC):
+    # Processors use slots to reduce their memory footprint (see Component). Subclasses can add new attributes
+    __slots__ = ('model', 'clock', 'time_last', 'time_next', 'has_input', 'event_transducers')
+
     def __init__(self, model: Component, clock: SimulationClock,
                  event_transducers_mapping: Optional[dict[Port, list[Transducer]]] = None):
         self.model: Component = model
         self.clock: SimulationClock = clock
         self.time_last: float = 0
         self.time_next: float = 0
+        self.has_input: bool = False  # Set by the parent coordinator when the model receives new messages
 
         self.event_transducers: Optional[dict[Port, list[Transducer]]] = None
         if event_transducers_mapping:
@@ -74,7 +80,141 @@ class AbstractSimulator(ABC):
         pass
 
 
+class Scheduler(ABC):
+    """Keeps track of the next event times of the processors that belong to a coordinator."""
+
+    @abstractmethod
+    def next_time(self) -> float:
+        """:return: the earliest next event time of all the processors."""
+        pass
+
+    @abstractmethod
+    def imminent(self, time: float) -> list[AbstractSimulator]:
+        """
+        Returns the processors whose next event time matches the given time.
+        The result is cached until the processors are rescheduled with the update method.
+        :param time: current simulation time.
+        :return: list of imminent processors.
+        """
+        pass
+
+    @abstractmethod
+    def update(self, processors: Iterable[AbstractSimulator]):
+        """
+        Reschedules a set of processors after they changed their next event time.
+        :param processors: processors to be rescheduled.
+        """
+        pass
+
+    @abstractmethod
+    def remove(self, processors: Iterable[AbstractSimulator]):
+        """
+        Unschedules a set of processors that no longer belong to the coordinator.
+        :param processors: processors to be unscheduled.
+        """
+        pass
+
+
+class LinearScheduler(Scheduler):
+    def __init__(self, coordinator: Coordinator):
+        """
+        Scheduler that scans all the processors of the coordinator. It does not keep any additional data structure.
+        :param coordinator: coordinator that owns the scheduler.
+        """
+        self.coordinator: Coordinator = coordinator
+        self._imminent: list[AbstractSimulator] | None = None
+        self._imminent_time: float = INFINITY
+
+    def next_time(self) -> float:
+        return min((proc.time_next for proc in self.coordinator.processors), default=INFINITY)
+
+    def imminent(self, time: float) -> list[AbstractSimulator]:
+        if self._imminent is None or self._imminent_time != time:
+            self._imminent = [proc for proc in self.coordinator.processors if proc.time_next == time]
+            self._imminent_time = time
+        return self._imminent
+
+    def update(self, processors: Iterable[AbstractSimulator]):
+        self._imminent = None
+
+    def remove(self, processors: Iterable[AbstractSimulator]):
+        self._imminent = None
+
+
+class HeapScheduler(Scheduler):
+    def __init__(self, coordinator: Coordinator):
+        """
+        Scheduler that keeps the processors of the coordinator in a priority queue keyed on their next event time.
+        Only the processors that are rescheduled are updated, and outdated entries are lazily discarded.
+        Passive processors (i.e., next event time is infinity) are not stored in the queue.
+        :param coordinator: coordinator that owns the scheduler.
+        """
+        self.coordinator: Coordinator = coordinator
+        self._heap: list[list] = list()  # entries are [time_next, tiebreaker, processor]
+        self._entries: dict[AbstractSimulator, list] = dict()  # Valid entry of each scheduled processor
+        self._counter: Iterator[int] = itertools.count()
+        self._imminent: list[AbstractSimulator] = list()  # Imminent processors already popped from the queue
+
+    def next_time(self) -> float:
+        heap = self._heap
+        while heap and heap[0][2] is None:
+            heapq.heappop(heap)
+        t_next = heap[0][0] if heap else INFINITY
+        if self._imminent:
+            t_next = min(t_next, self._imminent[0].time_next)
+        return t_next
+
+    def imminent(self, time: float) -> list[AbstractSimulator]:
+        heap = self._heap
+        while heap and heap[0][0] <= time:
+            _, _, proc = heapq.heappop(heap)
+            if proc is not None:
+                del self._entries[proc]
+                self._imminent.append(proc)
+        return self._imminent
+
+    def update(self, processors: Iterable[AbstractSimulator]):
+        for proc in processors:
+            entry = self._entries.pop(proc, None)
+            if entry is not None:
+                entry[2] = None  # Mark outdated entry as removed
+            if proc.time_next < INFINITY:
+                entry = [proc.time_next, next(self._counter), proc]
+                self._entries[proc] = entry
+                heapq.heappush(self._heap, entry)
+        self._imminent.clear()
+        # Outdated entries are only removed when they reach the top of the heap. Rebuild it if they accumulate.
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [entry for entry in self._heap if entry[2] is not None]
+            heapq.heapify(self._heap)
+
+    def remove(self, processors: Iterable[AbstractSimulator]):
+        for proc in processors:
+            entry = self._entries.pop(proc, None)
+            if entry is not None:
+                entry[2] = None
+            elif proc in self._imminent:
+                self._imminent.remove(proc)
+
+
+SCHEDULERS: dict[str, type[Scheduler]] = {
+    'linear': LinearScheduler,
+    'heap': HeapScheduler,
+}
+
+
+def _subtree(comp: Component) -> Generator[Component, None, None]:
+    """:return: generator over a component and all its descendants."""
+    stack: list[Component] = [comp]
+    while stack:
+        comp = stack.pop()
+        yield comp
+        if isinstance(comp, Coupled):
+            stack.extend(comp.components)
+
+
 class Simulator(AbstractSimulator):
+    __slots__ = ('state_transducers',)
     model: Atomic
 
     def __init__(self, model: Atomic, clock: SimulationClock,
@@ -98,7 +238,17 @@ class Simulator(AbstractSimulator):
         self.model.exit()
 
     def deltfcn(self) -> Simulator | None:  # TODO
-        if not self.model.in_empty():
+        if self._execute_transition():
+            self._complete_transition()
+            return self
+
+    def _execute_transition(self) -> bool:
+        """
+        Executes the corresponding transition function of the model.
+        :return: True if the model executed a transition.
+        """
+        if self.has_input:
+            self.has_input = False
             if self.clock.time == self.time_next:
                 self.model.deltcon()
             else:
@@ -107,8 +257,11 @@ class Simulator(AbstractSimulator):
         elif self.clock.time == self.time_next:
             self.model.deltint()
         else:
-            return
+            return False
+        return True
 
+    def _complete_transition(self):
+        """Notifies a transition of the model to the transducers and updates the simulation times."""
         if self.state_transducers is not None:
             for trans in self.state_transducers:
                 trans.add_imminent_model(self.model)
@@ -117,7 +270,6 @@ class Simulator(AbstractSimulator):
 
         self.time_last = self.clock.time
         self.time_next = self.time_last + self.model.ta()
-        return self
 
     def lambdaf(self):
         if self.clock.time == self.time_next:
@@ -129,21 +281,48 @@ class Simulator(AbstractSimulator):
 
 
 class Coordinator(AbstractSimulator):
+    __slots__ = ('scheduler', '_scheduler', 'coordinators', 'simulators', '_processors_map', '_influenced',
+                 '_transducers', '_dirty_ports', '_flattened_ports', 'ports_to_serve', '_remote_hosts',
+                 '_structure_changes', '__event_transducers_mapping', '__state_transducers_mapping')
     model: Coupled
 
     def __init__(self, model: Coupled, clock: Optional[SimulationClock] = None, flatten: bool = False,
                  event_transducers_mapping: Optional[dict[Port, list[Transducer]]] = None,
-                 state_transducers_mapping: Optional[dict[Atomic, list[Transducer]]] = None):
+                 state_transducers_mapping: Optional[dict[Atomic, list[Transducer]]] = None,
+                 scheduler: str = 'linear'):
+        """
+        xDEVS coordinator for coupled models.
+        :param model: coupled model to be simulated.
+        :param clock: simulation clock. If None, the coordinator creates a new one. Defaults to None.
+        :param flatten: if True, the coupled model is flattened before building the simulation tree.
+        Transducers that observe ports of removed coupled models observe the ports that fed them instead.
+        :param event_transducers_mapping: mapping between ports and the transducers that observe them.
+        :param state_transducers_mapping: mapping between atomic models and the transducers that observe them.
+        :param scheduler: scheduler used for finding imminent processors. It can be "linear" (default) or "heap".
+        The heap scheduler keeps the children processors in a priority queue and is faster for wide models.
+        :raises ValueError: if scheduler is unknown.
+        """
         super().__init__(model, clock or SimulationClock(), event_transducers_mapping)
 
+        if scheduler not in SCHEDULERS:
+            raise ValueError(f'unknown scheduler "{scheduler}"')
+        self.scheduler: str = scheduler
+        self._scheduler: Scheduler = SCHEDULERS[scheduler](self)
+
         self.coordinators: list[Coordinator] = list()
         self.simulators: list[Simulator] = list()
+        self._processors_map: dict[Component, AbstractSimulator] = dict()  # Processor of each child component
+        self._influenced: list[AbstractSimulator] = list()  # Children that received messages in the current cycle
         self._transducers: Optional[list[Transducer]] = [] if self.root_coordinator else None
+        # Root coordinators keep track of the ports that received values in the current cycle
+        self._dirty_ports: Optional[list[Port]] = [] if self.root_coordinator else None
+        # Root coordinators queue the structural changes of the model until the end of the current cycle
+        self._structure_changes: Optional[list[tuple[Coupled, str, Any]]] = [] if self.root_coordinator else None
 
-        if flatten:
-            self.model.flatten()
-            # TODO we must fix transducers here!
+        # Ports removed when flattening the model, mapped to the ports that now carry their messages
+        self._flattened_ports: dict[Port, list[Port]] = self.model.flatten_port_map() if flatten else dict()
         self.ports_to_serve = dict()
+        self._remote_hosts: list = list()  # Remote hosts of the couplings of the model (only for the root)
 
         self.__event_transducers_mapping: dict[Port, list[Transducer]] | None = None
         self.__state_transducers_mapping: dict[Atomic, list[Transducer]] | None = None
@@ -188,9 +367,11 @@ class Coordinator(AbstractSimulator):
 
     def initialize(self):
         self._build_hierarchy()
-
-        for proc in self.processors:
-            proc.initialize()
+        if self.root_coordinator:
+            self._remote_hosts = self._collect_remote_hosts()
+        if self._dirty_ports is not None:
+            self._track_ports(self._dirty_ports)
+        self._initialize_processors()
 
         self.time_last = self.clock.time
         self.time_next = self.time_last + self.ta()
@@ -198,13 +379,53 @@ class Coordinator(AbstractSimulator):
         if self._transducers is not None:
             for transducer in self._transducers:
                 transducer.initialize()
+        if self.root_coordinator:
+            self.model._listener = self
+
+    def _initialize_processors(self):
+        for proc in self.processors:
+            proc.initialize()
+        self._scheduler.update(self.processors)
 
     def _build_hierarchy(self):
+        self._map_transducers()
+
+        for comp in self.model.components:
+            self._add_processor(comp)
+
+    def _add_processor(self, comp: Component) -> AbstractSimulator | None:
+        """
+        Creates the processor of a child component.
+        :param comp: child component.
+        :return: new processor. If the component is neither atomic nor coupled, it returns None.
+        """
+        if isinstance(comp, Coupled):
+            coord = Coordinator(comp, self.clock, event_transducers_mapping=self.event_transducers_mapping,
+                                state_transducers_mapping=self.state_transducers_mapping,
+                                scheduler=self.scheduler)
+            self.coordinators.append(coord)
+            self._processors_map[comp] = coord
+            self.ports_to_serve.update(coord.ports_to_serve)
+            return coord
+        elif isinstance(comp, Atomic):
+            sim = Simulator(comp, self.clock, event_transducers_mapping=self.event_transducers_mapping,
+                            state_transducers_mapping=self.state_transducers_mapping)
+            self.simulators.append(sim)
+            self._processors_map[comp] = sim
+            for pts in sim.model.in_ports:
+                if pts.serve:
+                    port_name = "%s.%s" % (pts.parent.name, pts.name)
+                    self.ports_to_serve[port_name] = pts
+            return sim
+
+    def _map_transducers(self):
         if self.root_coordinator and self._transducers:
             # The root coordinator is in charge of
             ports_to_transducers: dict[Port, list[Transducer]] = defaultdict(list)
             models_to_transducers: dict[Atomic, list[Transducer]] = defaultdict(list)
             for transducer in self._transducers:
+                if self._flattened_ports:
+                    self._remap_target_ports(transducer)
                 for model in transducer.target_components:
                     models_to_transducers[model].append(transducer)
                 for port in transducer.target_ports:
@@ -212,59 +433,204 @@ class Coordinator(AbstractSimulator):
             self.event_transducers_mapping = ports_to_transducers
             self.state_transducers_mapping = models_to_transducers
 
-        for comp in self.model.components:
-            if isinstance(comp, Coupled):
-                coord = Coordinator(comp, self.clock, event_transducers_mapping=self.event_transducers_mapping,
-                                    state_transducers_mapping=self.state_transducers_mapping)
-                self.coordinators.append(coord)
-                self.ports_to_serve.update(coord.ports_to_serve)
-            elif isinstance(comp, Atomic):
-                sim = Simulator(comp, self.clock, event_transducers_mapping=self.event_transducers_mapping,
-                                state_transducers_mapping=self.state_transducers_mapping)
-                self.simulators.append(sim)
-                for pts in sim.model.in_ports:
-                    if pts.serve:
-                        port_name = "%s.%s" % (pts.parent.name, pts.name)
-                        self.ports_to_serve[port_name] = pts
+    def _remap_target_ports(self, transducer: Transducer):
+        """
+        Replaces the target ports of a transducer that were removed when flattening the model.
+        Removed ports are replaced by the ports whose messages reached them.
+        :param transducer: transducer to be remapped.
+        """
+        target_ports: set[Port] = set()
+        for port in transducer.target_ports:
+            target_ports.update(self._flattened_ports.get(port, (port,)))
+        transducer.target_ports = target_ports
 
     def add_transducer(self, transducer: Transducer):
         if self._transducers is None:
             raise RuntimeError('Only the root coordinator can contain transducers')
         self._transducers.append(transducer)
 
-    def serve(self, host: str = "localhost", port: int = 8000):
-        server = SimpleXMLRPCServer((host, port))
-        server.register_function(self.inject)
-        _thread.start_new_thread(server.serve_forever, ())
+    def serve(self, host: str = "localhost", port: int = 8000, codec: Any = None) -> RemoteServer:
+        """
+        Serves the input ports marked to be served (see Port) to remote hosts (see xdevs.remote.RemoteHost).
+        Ports are identified by the names of their parent and their own name (e.g., "processor.i_in").
+        All the messages that a remote host sends in a simulation cycle are injected in a single step.
+        :param host: host name of the server. Defaults to "localhost".
+        :param port: port of the server. Defaults to 8000.
+        :param codec: codec of frames. Defaults to xdevs.remote.PickleCodec.
+        :return: running server. Call its stop method to stop serving.
+        """
+        server = RemoteServer((host, port), self, codec)
+        server.start()
+        return server
+
+    def set_validation(self, level: str):
+        """
+        Sets the validation level of the types of all the ports of the simulated model (see Port.set_validation).
+        Use VALIDATION_FULL during development and VALIDATION_TRUSTED for production runs of validated models.
+        Coupled ports are always checked for compatibility when couplings are created.
+        :param level: validation level.
+        :raises ValueError: if the validation level is unknown.
+        """
+        stack: list[Component] = [self.model]
+        while stack:
+            comp = stack.pop()
+            for port in itertools.chain(comp.in_ports, comp.out_ports):
+                port.set_validation(level)
+            if isinstance(comp, Coupled):
+                stack.extend(comp.components)
+
+    def eliminate_dead_code(self, prune: bool = False):
+        """
+        Marks the output ports of atomic models whose messages reach nothing as dead, and optionally removes
+        the components that can never influence the outputs of the model or the targets of its transducers
+        (see xdevs.analysis.eliminate_dead_code). Call it after adding the transducers and before initializing.
+        :param prune: if True, components that can never influence an observed port or component are removed.
+        Defaults to False.
+        :return: report with the dead ports and the removed components.
+        :raises RuntimeError: if the coordinator is not the root coordinator.
+        """
+        from xdevs.analysis import eliminate_dead_code
+        if not self.root_coordinator:
+            raise RuntimeError('Only the root coordinator can eliminate dead code')
+        observed_ports: set[Port] = set()
+        observed_components: set[Component] = set()
+        for transducer in self._transducers:
+            for port in transducer.target_ports:
+                observed_ports.update(self._flattened_ports.get(port, (port,)))
+            observed_components.update(transducer.target_components)
+        return eliminate_dead_code(self.model, observed_ports, observed_components, prune)
+
+    def checkpoint(self, path: str | os.PathLike):
+        """
+        Writes the state of the simulation to a checkpoint file: the simulation clock, the time of the last and next
+        events of all the processors, and the state of all the atomic models (see Atomic.save_state).
+        Checkpoints must be taken between simulation cycles (e.g., when simulate_time returns).
+        Transducers and remote hosts are not part of checkpoints.
+        :param path: path of the checkpoint file.
+        :raises RuntimeError: if the coordinator is not the root coordinator.
+        """
+        from xdevs.checkpoint import save_checkpoint
+        if not self.root_coordinator:
+            raise RuntimeError('Only the root coordinator can take checkpoints')
+        save_checkpoint(self, path)
+
+    def restore(self, path: str | os.PathLike):
+        """
+        Restores the state of the simulation from a checkpoint file (see checkpoint).
+        The coordinator must be initialized, and its model must have the same structure as the checkpointed model.
+        :param path: path of the checkpoint file.
+        :raises RuntimeError: if the coordinator is not the root coordinator.
+        :raises ValueError: if the file is not a valid checkpoint or it does not match the simulated model.
+        """
+        from xdevs.checkpoint import load_checkpoint
+        if not self.root_coordinator:
+            raise RuntimeError('Only the root coordinator can restore checkpoints')
+        load_checkpoint(self, path)
+
+    def _collect_remote_hosts(self, model: Optional[Coupled] = None) -> list:
+        """
+        :param model: coupled model whose couplings are inspected. Defaults to the simulated model.
+        :return: remote hosts of the couplings of the model hierarchy.
+        """
+        hosts: dict[int, Any] = dict()
+        stack: list[Coupled] = [model or self.model]
+        while stack:
+            coupled = stack.pop()
+            stack.extend(comp for comp in coupled.components if isinstance(comp, Coupled))
+            for coupling_set in (coupled.eic, coupled.ic, coupled.eoc):
+                for couplings in coupling_set.values():
+                    for coup in couplings.values():
+                        if coup.host is not None:
+                            hosts[id(coup.host)] = coup.host
+        return list(hosts.values())
+
+    def _send_remote(self):
+        """Sends the messages of the current cycle to the remote hosts. Each host receives one frame per cycle."""
+        for host in self._remote_hosts:
+            host.flush()
 
     def exit(self):
-        for processor in self.processors:
-            processor.exit()
+        if self.root_coordinator:
+            self.model._listener = None
+            self._structure_changes.clear()
+        self._exit_processors()
+        for host in self._remote_hosts:
+            host.close()
+        if self._dirty_ports is not None:
+            self._track_ports(None)
 
         if self._transducers is not None:
             for transducer in self._transducers:
                 transducer.exit()
 
+    def _exit_processors(self):
+        for processor in self.processors:
+            processor.exit()
+
     def ta(self):
-        return min((proc.time_next for proc in self.processors), default=INFINITY) - self.clock.time
+        return self._scheduler.next_time() - self.clock.time
 
     def lambdaf(self):
-        for proc in self.processors:
-            if self.clock.time == proc.time_next:
-                proc.lambdaf()
-                self.propagate_output(proc.model)
+        for proc in self._scheduler.imminent(self.clock.time):
+            proc.lambdaf()
+            self.propagate_output(proc.model)
 
     def propagate_output(self, comp: Component):
         for port in comp.used_out_ports:
-            for coup in itertools.chain(self.model.ic.get(port, dict()).values(),
-                                        self.model.eoc.get(port, dict()).values()):
+            for coup in self.model.ic.get(port, dict()).values():
+                coup.propagate()
+                if coup.host is None:
+                    self._influence(self._child_processor(coup.port_to.parent))
+            for coup in self.model.eoc.get(port, dict()).values():
                 coup.propagate()
 
+    def _child_processor(self, comp: Component) -> AbstractSimulator:
+        """
+        :param comp: child component.
+        :return: processor of the child component. Components added in the current cycle (see _structure_changed)
+        are given a processor before messages are routed to them.
+        """
+        proc = self._processors_map.get(comp)
+        if proc is None:
+            root = self.model
+            while root.parent is not None:
+                root = root.parent
+            root._listener._spawn_component(self, comp)
+            proc = self._processors_map[comp]
+        return proc
+
+    def _influence(self, proc: AbstractSimulator):
+        """Marks a child processor as influenced by new messages in the current cycle."""
+        if not proc.has_input:
+            proc.has_input = True
+            self._influenced.append(proc)
+
+    def _influence_port(self, port: Port):
+        """Marks all the processors between the coordinator and the owner of a port as influenced."""
+        path: list[Component] = list()
+        comp = port.parent
+        while comp is not self.model:
+            if comp is None:
+                raise ValueError(f'Port {port} does not belong to model {self.model.name}')
+            path.append(comp)
+            comp = comp.parent
+        coord = self
+        for comp in reversed(path):
+            proc = coord._child_processor(comp)
+            coord._influence(proc)
+            coord = proc
+
     def deltfcn(self):
+        self.has_input = False
         self.propagate_input()
 
-        for proc in self.imminent_processors:
+        imminent = self._scheduler.imminent(self.clock.time)
+        # Processors with no internal event at this time are only activated if they received new messages
+        influenced = [proc for proc in self._influenced if proc.time_next != self.clock.time]
+        for proc in itertools.chain(imminent, influenced):
             proc.deltfcn()
+        self._scheduler.update(itertools.chain(imminent, influenced))
+        self._influenced.clear()
 
         self.trigger_event_transducers()
 
@@ -275,31 +641,248 @@ class Coordinator(AbstractSimulator):
         for port in self.model.used_in_ports:
             for coup in self.model.eic.get(port, dict()).values():
                 coup.propagate()
+                if coup.host is None:
+                    self._influence(self._child_processor(coup.port_to.parent))
+
+    def _track_ports(self, dirty_ports: Optional[list[Port]], model: Optional[Component] = None):
+        """
+        Sets the list where the ports of the simulated model register themselves when they receive values.
+        :param dirty_ports: list of ports with values. If None, ports stop registering themselves.
+        :param model: component whose ports (and the ports of its descendants) are tracked.
+        Defaults to the simulated model.
+        """
+        for comp in _subtree(model or self.model):
+            for port in itertools.chain(comp.in_ports, comp.out_ports):
+                port._dirty = dirty_ports
+                if dirty_ports is not None and not port.empty():
+                    dirty_ports.append(port)
+
+    def _check_structure_change(self, coupled: Coupled, kind: str):
+        """
+        Checks that a structural change of the simulated model is supported before it is made.
+        Coordinators that do not support structural changes raise an error. Models cannot be flattened
+        while they are simulated, as processors of the removed coupled models would be left behind.
+        :param coupled: coupled model that is going to change.
+        :param kind: kind of change ("add_component", "remove_component", "add_coupling", "remove_coupling",
+        or "flatten").
+        :raises NotImplementedError: if the model is going to be flattened.
+        """
+        if kind == 'flatten':
+            raise NotImplementedError('Models cannot be flattened while they are simulated')
+
+    def _structure_changed(self, coupled: Coupled, kind: str, obj: Component | Coupling):
+        """
+        Queues a structural change of the simulated model (see Coupled.add_component and Coupled.remove_component).
+        Changes are applied at the end of the current simulation cycle, so they do not interfere with transitions.
+        :param coupled: coupled model that changed.
+        :param kind: kind of change ("add_component", "remove_component", "add_coupling", or "remove_coupling").
+        :param obj: added or removed component or coupling.
+        """
+        self._structure_changes.append((coupled, kind, obj))
+
+    def _apply_structure_changes(self):
+        """
+        Applies the queued structural changes of the simulated model. Only the processors of the added and removed
+        components are created or destroyed, and only the schedulers of their ancestors are updated.
+        Added components are initialized at the time of the last event of the coordinator.
+        """
+        changes = self._structure_changes
+        self._structure_changes = list()
+        self.clock.time = self.time_last
+        paths: dict[Coordinator, list[Coordinator]] = dict()
+        for coupled, kind, obj in changes:
+            path = self._coordinator_path(coupled)
+            if path is None:
+                continue  # The coupled model is no longer part of the simulated model
+            coord = path[-1]
+            if kind == 'add_component':
+                if obj.parent is not coupled:
+                    continue  # The component was removed or moved afterward
+                self._spawn_component(coord, obj)
+            elif kind == 'remove_component':
+                if obj.parent is coupled:
+                    continue  # The component was added again afterward
+                self._kill_component(coord, obj)
+            elif kind == 'add_coupling' and obj.host is not None and obj.host not in self._remote_hosts:
+                self._remote_hosts.append(obj.host)
+            paths[coord] = path
+        self._complete_structure_changes(list(paths.values()))
+
+    def _coordinator_path(self, coupled: Coupled) -> list[Coordinator] | None:
+        """
+        :param coupled: coupled model of the simulated hierarchy.
+        :return: coordinators from the root coordinator to the coordinator of the coupled model.
+        If the coupled model is not simulated, it returns None.
+        """
+        comps: list[Component] = list()
+        comp = coupled
+        while comp is not self.model:
+            if comp is None:
+                return None
+            comps.append(comp)
+            comp = comp.parent
+        path: list[Coordinator] = [self]
+        for comp in reversed(comps):
+            proc = path[-1]._processors_map.get(comp)
+            if proc is None:
+                return None
+            path.append(proc)
+        return path
+
+    def _spawn_component(self, coord: Coordinator, comp: Component):
+        """
+        Creates and initializes the processor of a component added to the model of a coordinator.
+        :param coord: coordinator of the parent of the component.
+        :param comp: new component.
+        """
+        if comp in coord._processors_map:
+            return
+        self._map_component_transducers(comp)
+        coord.event_transducers_mapping = self.event_transducers_mapping
+        coord.state_transducers_mapping = self.state_transducers_mapping
+        proc = coord._add_processor(comp)
+        if proc is None:
+            return
+        self._track_ports(self._dirty_ports, comp)
+        self._serve_component_ports(comp)
+        if isinstance(comp, Coupled):
+            self._remote_hosts.extend(host for host in self._collect_remote_hosts(comp)
+                                      if host not in self._remote_hosts)
+        proc.initialize()
+        coord._scheduler.update((proc,))
+
+    def _kill_component(self, coord: Coordinator, comp: Component):
+        """
+        Exits and destroys the processor of a component removed from the model of a coordinator.
+        :param coord: coordinator of the former parent of the component.
+        :param comp: removed component.
+        """
+        proc = coord._processors_map.pop(comp, None)
+        if proc is None:
+            return
+        proc.exit()
+        if isinstance(proc, Coordinator):
+            coord.coordinators.remove(proc)
+        else:
+            coord.simulators.remove(proc)
+        coord._scheduler.remove((proc,))
+        self._track_ports(None, comp)
+        self._serve_component_ports(comp, serve=False)
+        self._unmap_component_transducers(comp)
+
+    def _complete_structure_changes(self, paths: list[list[Coordinator]]):
+        """
+        Reschedules the coordinators affected by structural changes and all their ancestors.
+        :param paths: paths from the root coordinator to every coordinator whose children changed.
+        """
+        for path in paths:
+            for i in reversed(range(1, len(path))):
+                child = path[i]
+                child.time_next = child._scheduler.next_time()
+                path[i - 1]._scheduler.update((child,))
+        self.time_next = self._scheduler.next_time()
+
+    def _serve_component_ports(self, comp: Component, serve: bool = True):
+        """
+        Registers (or unregisters) the served input ports of the atomic models of a component hierarchy.
+        :param comp: component hierarchy.
+        :param serve: if False, the ports are unregistered. Defaults to True.
+        """
+        for atomic in _subtree(comp):
+            if isinstance(atomic, Atomic):
+                for pts in atomic.in_ports:
+                    if pts.serve:
+                        port_name = "%s.%s" % (pts.parent.name, pts.name)
+                        if serve:
+                            self.ports_to_serve[port_name] = pts
+                        elif self.ports_to_serve.get(port_name) is pts:
+                            del self.ports_to_serve[port_name]
+
+    def _map_component_transducers(self, comp: Component):
+        """
+        Adds the ports and atomic models of a new component hierarchy targeted by transducers to the mappings.
+        :param comp: new component hierarchy.
+        """
+        if not self._transducers:
+            return
+        if self.__event_transducers_mapping is None:
+            self.__event_transducers_mapping = defaultdict(list)
+            self.__state_transducers_mapping = defaultdict(list)
+        for child in _subtree(comp):
+            for transducer in self._transducers:
+                if child in transducer.target_components:
+                    self.__state_transducers_mapping[child].append(transducer)
+                for port in itertools.chain(child.in_ports, child.out_ports):
+                    if port in transducer.target_ports:
+                        self.__event_transducers_mapping[port].append(transducer)
+
+    def _unmap_component_transducers(self, comp: Component):
+        """
+        Removes the ports and atomic models of a removed component hierarchy from the transducers and the mappings.
+        :param comp: removed component hierarchy.
+        """
+        if self.__event_transducers_mapping is None:
+            return
+        for child in _subtree(comp):
+            for transducer in self.__state_transducers_mapping.pop(child, ()):
+                transducer.target_components.discard(child)
+            for port in itertools.chain(child.in_ports, child.out_ports):
+                for transducer in self.__event_transducers_mapping.pop(port, ()):
+                    transducer.target_ports.discard(port)
 
     def clear(self):
-        for port in itertools.chain(self.processors, self.model.in_ports, self.model.out_ports):
-            port.clear()
+        if self._dirty_ports is not None:
+            # Only the ports that received values in the current cycle must be cleared
+            for port in self._dirty_ports:
+                port.clear()
+            self._dirty_ports.clear()
+        else:
+            for port in itertools.chain(self.processors, self.model.in_ports, self.model.out_ports):
+                port.clear()
 
     def inject(self, port: str | Port[T], values: T | list[T], e: float = 0) -> bool:
         # TODO enable any iterable as values (careful with str)
-        time = self.time_last + e
-
         if type(values) is not list:
             values = [values]
-
-        if isinstance(port, str):
-            values = list(map(lambda x: pickle.loads(x.encode()), values))
-            if port in self.ports_to_serve:
-                port = self.ports_to_serve[port]
-            else:
-                # logger.error("Port '%s' not found" % port)
-                return True  # TODO is this OK?
+        return self.inject_many([(port, values)], e)
+
+    def inject_many(self, events: Iterable[tuple[str | Port, list]], e: float = 0) -> bool:
+        """
+        Injects messages into several ports and executes a single simulation step.
+        :param events: pairs (port, list of messages). Ports can also be referred by their served name (see serve)
+        or by their path (e.g., "root.coupled.atomic.i_in", see Coupled.path_index).
+        Messages for unknown ports are ignored.
+        :param e: elapsed time since the last transition of the coordinator. Defaults to 0.
+        :return: False if the injection time is after the next internal event of the coordinator.
+        """
+        if self._structure_changes:
+            self._apply_structure_changes()
+        time = self.time_last + e
+        resolved: list[tuple[Port, list]] = list()
+        for port, values in events:
+            if isinstance(port, str):
+                name = port
+                port = self.ports_to_serve.get(name)
+                if port is None:
+                    port = self.model.path_index().port(name)
+                if port is None:
+                    # logger.error("Port '%s' not found" % name)
+                    continue  # TODO is this OK?
+            resolved.append((port, values))
+        if not resolved:
+            return True
 
         if time <= self.time_next or time != time:
-            port.extend(values)
+            for port, values in resolved:
+                port.extend(values)
+                if port.parent is not self.model:
+                    self._influence_port(port)
             self.clock.time = time
             self.deltfcn()
+            self._send_remote()
             self.clear()
+            if self._structure_changes:
+                self._apply_structure_changes()
             self.clock.time = self.time_next
             return True
         else:
@@ -307,26 +890,378 @@ class Coordinator(AbstractSimulator):
             return False
 
     def simulate(self, num_iters: int = 10000):
+        if self._structure_changes:
+            self._apply_structure_changes()
         self.clock.time = self.time_next
         cont = 0
         while cont < num_iters and self.clock.time < INFINITY:
             self.lambdaf()
             self.deltfcn()
             self._execute_transducers()
+            self._send_remote()
             self.clear()
+            if self._structure_changes:
+                self._apply_structure_changes()
             self.clock.time = self.time_next
             cont += 1
 
     def simulate_time(self, time_interv: float = INFINITY):
+        if self._structure_changes:
+            self._apply_structure_changes()
         self.clock.time = self.time_next
         tf = self.clock.time + time_interv
         while self.clock.time < tf:
             self.lambdaf()
             self.deltfcn()
             self._execute_transducers()
+            self._send_remote()
             self.clear()
+            if self._structure_changes:
+                self._apply_structure_changes()
             self.clock.time = self.time_next
 
     def _execute_transducers(self):
         for transducer in self._transducers:
             transducer.trigger(self.clock.time)
+
+
+class FlatCoordinator(Coordinator):
+    def __init__(self, model: Coupled, clock: Optional[SimulationClock] = None, scheduler: str = 'heap'):
+        """
+        xDEVS coordinator that compiles the coupled model hierarchy into a flat list of simulators.
+        Messages are routed from atomic output ports to their final destinations in a single hop,
+        and transitions are executed in a single non-recursive loop. The model hierarchy is left untouched.
+        :param model: coupled model to be simulated.
+        :param clock: simulation clock. If None, the coordinator creates a new one. Defaults to None.
+        :param scheduler: scheduler used for finding imminent simulators. It can be "linear" or "heap" (default).
+        :raises ValueError: if scheduler is unknown.
+        """
+        super().__init__(model, clock, scheduler=scheduler)
+        # Destination ports of each source port, with the receiving simulator (None for coupled ports)
+        self._routes: dict[Port, list[tuple[Port, Simulator | None]]] = dict()
+        # Couplings to remote hosts reached from each source port
+        self._remote_routes: dict[Port, list[Coupling]] = dict()
+        # Local ports reached by each source port, and source ports that reach each port (for incremental updates)
+        self._reached: dict[Port, list[Port]] = dict()
+        self._sources: dict[Port, set[Port]] = dict()
+        self._stale_routes: set[Port] = set()  # Source ports whose routes must be compiled again
+        # Ports of coupled models observed by transducers
+        self._coupled_ports_transducers: dict[Port, list[Transducer]] = dict()
+        self._indices: dict[Atomic, int] = dict()  # Index of the simulator of each atomic model
+
+    def _build_hierarchy(self):
+        self._map_transducers()
+        self._add_simulators(self.model)
+        self._compile_routes()
+
+    def _add_simulators(self, model: Component) -> list[Simulator]:
+        """
+        Creates the simulators of the atomic models of a component hierarchy.
+        :param model: component hierarchy.
+        :return: new simulators.
+        """
+        observed = self.event_transducers_mapping or dict()
+        simulators: list[Simulator] = list()
+        stack: list[Component] = [model]
+        while stack:
+            comp = stack.pop()
+            if isinstance(comp, Coupled):
+                stack.extend(reversed(comp.components))
+                for port in itertools.chain(comp.in_ports, comp.out_ports):
+                    if port in observed:
+                        self._coupled_ports_transducers[port] = observed[port]
+            elif isinstance(comp, Atomic) and comp not in self._processors_map:
+                sim = Simulator(comp, self.clock, event_transducers_mapping=self.event_transducers_mapping,
+                                state_transducers_mapping=self.state_transducers_mapping)
+                self._processors_map[comp] = sim
+                self._indices[comp] = len(self.simulators)
+                self.simulators.append(sim)
+                simulators.append(sim)
+                for pts in comp.in_ports:
+                    if pts.serve:
+                        port_name = "%s.%s" % (pts.parent.name, pts.name)
+                        self.ports_to_serve[port_name] = pts
+        return simulators
+
+    def _compile_routes(self):
+        """Compiles the routes from all the source ports of the model hierarchy (see Coupled.compile_routes)."""
+        self._routes = dict()
+        self._remote_routes = dict()
+        self._reached = dict()
+        self._sources = dict()
+        self._stale_routes.clear()
+        for source in self.model.in_ports:
+            self._compile_source_routes(source)
+        for sim in self.simulators:
+            for source in sim.model.out_ports:
+                self._compile_source_routes(source)
+
+    def _compile_source_routes(self, source: Port):
+        """
+        Compiles the routes of a source port (i.e., an output port of a simulated atomic model or an input port of
+        the simulated model). Previous routes of the port are discarded. If the port is no longer a source port,
+        it is left without routes. Ports of inner coupled models observed by transducers are added as destinations.
+        :param source: source port.
+        """
+        for port in self._reached.pop(source, ()):
+            sources = self._sources[port]
+            sources.discard(source)
+            if not sources:
+                del self._sources[port]
+        self._routes.pop(source, None)
+        self._remote_routes.pop(source, None)
+        comp = source.parent
+        if comp is self.model:
+            if self.model.input.get(source.name) is not source:
+                return
+        elif comp not in self._processors_map or comp.output.get(source.name) is not source:
+            return
+
+        routes, remote_routes, reached = self._resolve_port(source)
+        if routes:
+            self._routes[source] = routes
+        if remote_routes:
+            self._remote_routes[source] = remote_routes
+        if reached:
+            self._reached[source] = reached
+            for port in reached:
+                self._sources.setdefault(port, set()).add(source)
+
+    def _resolve_port(self, source: Port) -> tuple[list[tuple[Port, Simulator | None]], list[Coupling], list[Port]]:
+        """
+        Follows the couplings of the hierarchy from a port until reaching final destinations.
+        :param source: port whose messages are followed.
+        :return: local destinations (with the receiving simulator, if any), couplings to remote hosts,
+        and all the local ports reached by the messages of the port.
+        """
+        routes: list[tuple[Port, Simulator | None]] = list()
+        remote_routes: list[Coupling] = list()
+        reached: list[Port] = list()
+        observed = self._coupled_ports_transducers
+        stack: list[Port] = [source]
+        while stack:
+            port = stack.pop()
+            comp = port.parent
+            if isinstance(comp, Coupled) and comp.input.get(port.name) is port:
+                next_couplings = comp.eic.get(port, dict()).values()  # Input port of coupled model: go down
+            elif comp is not self.model:  # Output port of inner component: go up
+                next_couplings = itertools.chain(comp.parent.ic.get(port, dict()).values(),
+                                                 comp.parent.eoc.get(port, dict()).values())
+            else:
+                continue
+            for coup in next_couplings:
+                port_to = coup.port_to
+                if coup.host is not None:
+                    remote_routes.append(Coupling(source, port_to, coup.host))
+                    continue
+                reached.append(port_to)
+                if isinstance(port_to.parent, Atomic):
+                    routes.append((port_to, self._processors_map.get(port_to.parent)))
+                elif port_to.parent is self.model:
+                    routes.append((port_to, None))
+                else:
+                    stack.append(port_to)
+                    if port_to in observed:
+                        routes.append((port_to, None))
+        return routes, remote_routes, reached
+
+    def _coordinator_path(self, coupled: Coupled) -> list[Coordinator] | None:
+        comp = coupled
+        while comp is not self.model:
+            if comp is None:
+                return None
+            comp = comp.parent
+        return [self]
+
+    def _spawn_component(self, coord: Coordinator, comp: Component):
+        self._map_component_transducers(comp)
+        simulators = self._add_simulators(comp)
+        self._track_ports(self._dirty_ports, comp)
+        if isinstance(comp, Coupled):
+            self._remote_hosts.extend(host for host in self._collect_remote_hosts(comp)
+                                      if host not in self._remote_hosts)
+        for sim in simulators:
+            sim.initialize()
+        self._scheduler.update(simulators)
+
+    def _kill_component(self, coord: Coordinator, comp: Component):
+        simulators: list[Simulator] = list()
+        for child in _subtree(comp):
+            for port in itertools.chain(child.in_ports, child.out_ports):
+                self._coupled_ports_transducers.pop(port, None)
+            sim = self._processors_map.pop(child, None)
+            if sim is not None:
+                sim.exit()
+                simulators.append(sim)
+                # The last simulator takes the place of the removed one
+                i = self._indices.pop(child)
+                last = self.simulators.pop()
+                if last is not sim:
+                    self.simulators[i] = last
+                    self._indices[last.model] = i
+        self._scheduler.remove(simulators)
+        self._track_ports(None, comp)
+        self._serve_component_ports(comp, serve=False)
+        self._unmap_component_transducers(comp)
+
+    def _structure_changed(self, coupled: Coupled, kind: str, obj: Component | Coupling):
+        super()._structure_changed(coupled, kind, obj)
+        # Only the routes of the source ports that reach the changed elements are compiled again
+        stale = self._stale_routes
+        if kind in ('add_coupling', 'remove_coupling'):
+            stale.add(obj.port_from)
+            stale.update(self._sources.get(obj.port_from, ()))
+        else:
+            for comp in _subtree(obj):
+                for port in itertools.chain(comp.in_ports, comp.out_ports):
+                    stale.update(self._sources.get(port, ()))
+                if isinstance(comp, Atomic):
+                    stale.update(comp.out_ports)
+
+    def _complete_structure_changes(self, paths: list[list[Coordinator]]):
+        stale = self._stale_routes
+        self._stale_routes = set()
+        for source in stale:
+            self._compile_source_routes(source)
+        super()._complete_structure_changes(paths)
+
+    def _propagate(self, ports: Iterable[Port]):
+        for port in ports:
+            if port:
+                for port_to, sim in self._routes.get(port, ()):
+                    port_to.add_to_bag(port)
+                    if sim is not None:
+                        self._influence(sim)
+                for coup in self._remote_routes.get(port, ()):
+                    coup.propagate()
+
+    def propagate_output(self, comp: Component):
+        self._propagate(comp.out_ports)
+
+    def propagate_input(self):
+        self._propagate(self.model.in_ports)
+
+    def _influence_port(self, port: Port):
+        sim = self._processors_map.get(port.parent)
+        if sim is not None:
+            self._influence(sim)
+            return
+        comp = port.parent
+        while comp is not self.model:
+            if comp is None:
+                raise ValueError(f'Port {port} does not belong to model {self.model.name}')
+            comp = comp.parent
+        # Ports of inner coupled models are not source ports: their messages are routed as they are injected
+        routes, remote_routes, _ = self._resolve_port(port)
+        for port_to, sim in routes:
+            port_to.add_to_bag(port)
+            if sim is not None:
+                self._influence(sim)
+        for coup in remote_routes:
+            coup.propagate()
+
+    def trigger_event_transducers(self):
+        for port, transducers in self._coupled_ports_transducers.items():
+            if port:
+                for trans in transducers:
+                    trans.add_imminent_port(port)
+
+    def clear(self):
+        super().clear()
+        if self._dirty_ports is None:
+            for port in self._coupled_ports_transducers:
+                port.clear()
+
+
+def free_threading() -> bool:
+    """:return: True if the interpreter is a free-threaded CPython build (3.13+) running without the GIL."""
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def _run_chunk(function: Callable[[Simulator], Any], simulators: list[Simulator]):
+    for sim in simulators:
+        function(sim)
+
+
+class ThreadPoolCoordinator(FlatCoordinator):
+    def __init__(self, model: Coupled, clock: Optional[SimulationClock] = None, scheduler: str = 'heap',
+                 n_threads: int | None = None, parallel: bool | None = None):
+        """
+        Coordinator that executes the output and transition functions of the atomic models on a pool of threads.
+        Threads only provide parallelism on free-threaded CPython builds. Otherwise, the coordinator runs serially.
+        Atomic models are executed in parallel under the following rules:
+
+        - In lambdaf, atomic models only write to their own output ports.
+        - In deltfcn, atomic models only read from their own input ports.
+        - Port bags are only modified by the coordinator thread, when propagating messages and clearing ports.
+          Output ports register themselves in the list of ports to be cleared with atomic list appends.
+        - Transducers are only notified by the coordinator thread after every parallel step,
+          in the same order as in a serial execution.
+        - Atomic models must not share mutable objects unless these objects are thread-safe.
+
+        :param model: coupled model to be simulated.
+        :param clock: simulation clock. If None, the coordinator creates a new one. Defaults to None.
+        :param scheduler: scheduler used for finding imminent simulators. It can be "linear" or "heap" (default).
+        :param n_threads: number of threads. Defaults to the number of CPUs.
+        :param parallel: if True, it always uses the thread pool. If False, it always runs serially.
+        If None (default), it uses the thread pool only if the interpreter runs without the GIL.
+        :raises ValueError: if scheduler is unknown or number of threads is less than 1.
+        """
+        super().__init__(model, clock, scheduler=scheduler)
+        if n_threads is not None and n_threads < 1:
+            raise ValueError('number of threads must be greater than 0')
+        self.n_threads: int = n_threads or os.cpu_count() or 1
+        self.parallel: bool = free_threading() if parallel is None else parallel
+        self._executor: ThreadPoolExecutor | None = None
+
+    def _initialize_processors(self):
+        super()._initialize_processors()
+        if self.parallel and self.n_threads > 1:
+            self._executor = ThreadPoolExecutor(self.n_threads, thread_name_prefix='xdevs')
+
+    def _exit_processors(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        super()._exit_processors()
+
+    def _run(self, function: Callable[[Simulator], Any], simulators: list[Simulator]):
+        """
+        Applies a function to a list of simulators. If possible, simulators are split in chunks executed in parallel.
+        :param function: function to be applied.
+        :param simulators: list of simulators.
+        """
+        if self._executor is None or len(simulators) < 2:
+            for sim in simulators:
+                function(sim)
+            return
+        n_chunks = min(self.n_threads, len(simulators))
+        chunks = [simulators[i::n_chunks] for i in range(n_chunks)]
+        futures = [self._executor.submit(_run_chunk, function, chunk) for chunk in chunks]
+        for future in futures:
+            future.result()  # Propagates exceptions raised by the models
+
+    def lambdaf(self):
+        imminent = self._scheduler.imminent(self.clock.time)
+        self._run(Simulator.lambdaf, imminent)
+        for sim in imminent:
+            self.propagate_output(sim.model)
+
+    def deltfcn(self):
+        self.has_input = False
+        self.propagate_input()
+
+        imminent = self._scheduler.imminent(self.clock.time)
+        influenced = [proc for proc in self._influenced if proc.time_next != self.clock.time]
+        transitioned = imminent + influenced
+        self._run(Simulator._execute_transition, transitioned)
+        for sim in transitioned:
+            sim._complete_transition()
+        self._scheduler.update(transitioned)
+        self._influenced.clear()
+
+        self.trigger_event_transducers()
+
+        self.time_last = self.clock.time
+        self.time_next = self.time_last + self.ta()
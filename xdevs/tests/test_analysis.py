@@ -0,0 +1,152 @@
+import unittest
+from xdevs.analysis import eliminate_dead_code, full_name
+from xdevs.models import Atomic, Coupled, Port
+from xdevs.sim import Coordinator, FlatCoordinator
+from xdevs.tests.test_checkpoint import Counter
+from xdevs.tests.test_sim import ListTransducer
+
+
+class Relay(Atomic):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.i_in: Port[int] = Port(int, "i_in")
+        self.o_out: Port[int] = Port(int, "o_out")
+        self.add_in_port(self.i_in)
+        self.add_out_port(self.o_out)
+        self.buffer: list[int] = list()
+        self.n_outputs: int = 0
+
+    def initialize(self):
+        self.passivate()
+
+    def exit(self):
+        pass
+
+    def deltint(self):
+        self.buffer.clear()
+        self.passivate()
+
+    def deltext(self, e: float):
+        self.buffer.extend(self.i_in.values)
+        self.activate()
+
+    def lambdaf(self):
+        self.n_outputs += 1
+        self.o_out.extend(self.buffer)
+
+
+def dead_model() -> Coupled:
+    root = Coupled("root")
+    root.o_out = Port(int, "o_out")
+    root.add_out_port(root.o_out)
+    gen = Counter("gen", 1)
+    proc = Relay("proc")
+    dead = Relay("dead")
+    group = Coupled("group")
+    group.o_out = Port(int, "o_out")
+    group.add_out_port(group.o_out)
+    idle = Counter("idle", 1)
+    group.add_component(idle)
+    group.add_coupling(idle.o_out, group.o_out)
+    for comp in gen, proc, dead, group:
+        root.add_component(comp)
+    root.add_coupling(gen.o_out, proc.i_in)
+    root.add_coupling(gen.o_out, dead.i_in)
+    root.add_coupling(proc.o_out, root.o_out)
+    return root
+
+
+class TestDeadCode(unittest.TestCase):
+
+    def test_dead_ports(self):
+        root = dead_model()
+        gen, proc, dead, group = root.components
+        idle = group.components[0]
+        report = eliminate_dead_code(root)
+        self.assertEqual([dead.o_out, idle.o_out], report.dead_ports)
+        self.assertEqual([], report.pruned)
+        self.assertEqual("2 dead ports\n  root.dead.o_out\n  root.group.idle.o_out\n0 pruned components", str(report))
+
+        for engine in Coordinator, FlatCoordinator:
+            with self.subTest(engine=engine.__name__):
+                root = dead_model()
+                gen, proc, dead, group = root.components
+                coord = engine(root)
+                coord.eliminate_dead_code()
+                coord.initialize()
+                for _ in range(5):
+                    coord.lambdaf()
+                    coord.deltfcn()
+                    self.assertTrue(dead.n_outputs == 0 or not dead.o_out)
+                    coord.clear()
+                    coord.clock.time = coord.time_next
+                coord.exit()
+                self.assertEqual(2, dead.n_outputs)
+                self.assertEqual(proc.n_outputs, dead.n_outputs)
+
+        # Coupling a dead port to a consumer revives it
+        root.add_coupling(dead.o_out, root.o_out)
+        self.assertFalse(dead.o_out._dead)
+        dead.o_out.add(1)
+        self.assertEqual([1], list(dead.o_out.values))
+
+    def test_revive(self):
+        # Coupling a coupled port fed by dead ports revives them, also while the model is simulated
+        for runtime in False, True:
+            with self.subTest(runtime=runtime):
+                root = dead_model()
+                gen, proc, dead, group = root.components
+                idle = group.components[0]
+                sink = Relay("sink")
+                root.add_component(sink)
+                coord = Coordinator(root)
+                report = coord.eliminate_dead_code()
+                self.assertIn(idle.o_out, report.dead_ports)
+                if not runtime:
+                    root.add_coupling(group.o_out, sink.i_in)
+                coord.initialize()
+                coord.simulate_time(3)
+                n_outputs = sink.n_outputs
+                if runtime:
+                    root.add_coupling(group.o_out, sink.i_in)
+                coord.simulate_time(3)
+                coord.exit()
+                self.assertFalse(idle.o_out._dead)
+                self.assertFalse(dead.o_out._dead)  # All the dead ports are revived
+                self.assertEqual(0 if runtime else 3, n_outputs)
+                self.assertEqual(n_outputs + 3, sink.n_outputs)
+
+    def test_prune(self):
+        root = dead_model()
+        gen, proc, dead, group = root.components
+        report = eliminate_dead_code(root, prune=True)
+        self.assertEqual([('root.dead', dead), ('root.group', group)], sorted(report.pruned, key=lambda x: x[0]))
+        self.assertEqual([], report.dead_ports)
+        self.assertEqual([gen, proc], root.components)
+        self.assertEqual(1, len(root.ic))
+        self.assertIsNone(dead.parent)
+
+    def test_observed(self):
+        root = dead_model()
+        gen, proc, dead, group = root.components
+        idle = group.components[0]
+        transducer = ListTransducer(transducer_id="transducer")
+        transducer.add_target_port(group.o_out)
+        transducer.add_target_component(dead)
+        coord = Coordinator(root)
+        coord.add_transducer(transducer)
+        report = coord.eliminate_dead_code(prune=True)
+        self.assertEqual([dead.o_out], report.dead_ports)
+        self.assertEqual([], report.pruned)
+        self.assertEqual("root.group.idle", full_name(idle))
+
+        coord.initialize()
+        coord.simulate_time(3)
+        coord.exit()
+        self.assertEqual(3, len(transducer.events))
+        self.assertEqual(6, len(transducer.states))  # External and internal transitions
+        self.assertRaises(RuntimeError, coord.coordinators[0].eliminate_dead_code)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,327 @@
+import unittest
+from xdevs import PHASE_ACTIVE, VALIDATION_TRUSTED
+from xdevs.batch import AtomicArray, BatchPort, numpy
+from xdevs.models import Atomic, Coupled, Coupling, Port
+from xdevs.sim import Coordinator, FlatCoordinator
+
+
+class BatchGenerator(Atomic):
+    def __init__(self, name: str, n_outputs: int, n_cycles: int):
+        super().__init__(name)
+        self.o_out: BatchPort = BatchPort(numpy.int64, "o_out")
+        self.add_out_port(self.o_out)
+        self.outputs = numpy.arange(n_outputs)
+        self.n_cycles: int = n_cycles
+
+    def initialize(self):
+        self.activate()
+
+    def exit(self):
+        pass
+
+    def deltint(self):
+        self.n_cycles -= 1
+        if self.n_cycles > 0:
+            self.hold_in(PHASE_ACTIVE, 1)
+        else:
+            self.passivate()
+
+    def deltext(self, e: float):
+        pass
+
+    def lambdaf(self):
+        self.o_out.extend(self.outputs)
+
+
+class BatchReceiver(Atomic):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.i_in: BatchPort = BatchPort(numpy.int64, "i_in")
+        self.add_in_port(self.i_in)
+        self.n_blocks: int = 0
+        self.total: int = 0
+        self.last_array = None
+
+    def initialize(self):
+        self.passivate()
+
+    def exit(self):
+        pass
+
+    def deltint(self):
+        pass
+
+    def deltext(self, e: float):
+        self.n_blocks += len(self.i_in.blocks)
+        self.last_array = self.i_in.array
+        self.total += int(self.last_array.sum())
+
+    def lambdaf(self):
+        pass
+
+
+def batch_model(n_generators: int) -> Coupled:
+    root = Coupled("root")
+    inner = Coupled("inner")
+    inner.i_in = BatchPort(numpy.int64, "i_in")
+    inner.add_in_port(inner.i_in)
+    receiver = BatchReceiver("receiver")
+    inner.add_component(receiver)
+    inner.add_coupling(inner.i_in, receiver.i_in)
+    root.add_component(inner)
+    for i in range(n_generators):
+        generator = BatchGenerator(f"generator_{i}", 10, 3)
+        root.add_component(generator)
+        root.add_coupling(generator.o_out, inner.i_in)
+    return root
+
+
+PERIODS = [1, 2, 3, 1.5, 2]
+DELAY = 0.7
+
+
+class CounterArray(AtomicArray):
+    """Periodic counters. Counters that receive their index wait for a delay before counting again."""
+
+    def __init__(self, name: str):
+        super().__init__(name, len(PERIODS))
+        self.i_in: BatchPort = BatchPort(numpy.int64, "i_in")
+        self.o_out: BatchPort = BatchPort(numpy.int64, "o_out")
+        self.add_in_port(self.i_in)
+        self.add_out_port(self.o_out)
+        self.periods = numpy.array(PERIODS, dtype=float)
+        self.counts = numpy.zeros(self.size, dtype=int)
+
+    def initialize_members(self):
+        self.hold_in_members(slice(None), PHASE_ACTIVE, self.periods)
+
+    def exit(self):
+        pass
+
+    def deltint_members(self, imminent):
+        self.counts[imminent] += 1
+        self.hold_in_members(imminent, PHASE_ACTIVE, self.periods[imminent])
+
+    def deltext_members(self):
+        self.hold_in_members(self.i_in.array, "delayed", DELAY)
+
+    def lambdaf_members(self, imminent):
+        self.o_out.extend(imminent)
+
+
+class CounterAtomic(Atomic):
+    def __init__(self, name: str, index: int):
+        super().__init__(name)
+        self.i_in: Port[int] = Port(int, "i_in")
+        self.o_out: Port[int] = Port(int, "o_out")
+        self.add_in_port(self.i_in)
+        self.add_out_port(self.o_out)
+        self.index: int = index
+        self.count: int = 0
+
+    def initialize(self):
+        self.hold_in(PHASE_ACTIVE, PERIODS[self.index])
+
+    def exit(self):
+        pass
+
+    def deltint(self):
+        self.count += 1
+        self.hold_in(PHASE_ACTIVE, PERIODS[self.index])
+
+    def deltext(self, e: float):
+        self.hold_in("delayed", DELAY)
+
+    def lambdaf(self):
+        self.o_out.add(self.index)
+
+
+class Trigger(Atomic):
+    def __init__(self, name: str, port: Port, members: list[int]):
+        super().__init__(name)
+        self.o_out: Port = port
+        self.add_out_port(self.o_out)
+        self.members: list[int] = members
+
+    def initialize(self):
+        self.hold_in(PHASE_ACTIVE, 2.5)
+
+    def exit(self):
+        pass
+
+    def deltint(self):
+        self.passivate()
+
+    def deltext(self, e: float):
+        pass
+
+    def lambdaf(self):
+        self.o_out.extend(self.members)
+
+
+class Logger(Atomic):
+    def __init__(self, name: str, port: Port):
+        super().__init__(name)
+        self.i_in: Port = port
+        self.add_in_port(self.i_in)
+        self.clock: float = 0
+        self.log: list[tuple[float, int]] = list()
+
+    def initialize(self):
+        self.passivate()
+
+    def exit(self):
+        pass
+
+    def deltint(self):
+        pass
+
+    def deltext(self, e: float):
+        self.clock += e
+        self.log.extend(sorted((self.clock, int(val)) for val in self.i_in.values))
+
+    def lambdaf(self):
+        pass
+
+
+def counters_model(array: bool) -> Coupled:
+    root = Coupled("root")
+    members = [0, 2, 4]
+    if array:
+        counters = CounterArray("counters")
+        trigger = Trigger("trigger", BatchPort(numpy.int64, "o_out"), members)
+        logger = Logger("logger", BatchPort(numpy.int64, "i_in"))
+        for comp in counters, trigger, logger:
+            root.add_component(comp)
+        root.add_coupling(trigger.o_out, counters.i_in)
+        root.add_coupling(counters.o_out, logger.i_in)
+    else:
+        trigger = Trigger("trigger", Port(int, "o_out"), [0])
+        logger = Logger("logger", Port(int, "i_in"))
+        root.add_component(trigger)
+        root.add_component(logger)
+        for i in range(len(PERIODS)):
+            counter = CounterAtomic(f"counter_{i}", i)
+            root.add_component(counter)
+            if i in members:
+                root.add_coupling(trigger.o_out, counter.i_in)
+            root.add_coupling(counter.o_out, logger.i_in)
+    return root
+
+
+@unittest.skipUnless(numpy, 'NumPy is not installed')
+class TestAtomicArray(unittest.TestCase):
+
+    def test_equivalence(self):
+        expected = counters_model(False)
+        coord = Coordinator(expected)
+        coord.initialize()
+        coord.simulate_time(12)
+        coord.exit()
+        for engine in Coordinator, FlatCoordinator:
+            with self.subTest(engine=engine):
+                root = counters_model(True)
+                coord = engine(root)
+                coord.initialize()
+                coord.simulate_time(12)
+                coord.exit()
+                self.assertEqual(expected.components[1].log, root.components[2].log)
+                counts = [comp.count for comp in expected.components[2:]]
+                self.assertEqual(counts, root.components[0].counts.tolist())
+                self.assertTrue(all(phase == PHASE_ACTIVE for phase in root.components[0].phases))
+
+    def test_state(self):
+        root = counters_model(True)
+        coord = Coordinator(root)
+        coord.initialize()
+        coord.simulate_time(3)
+        counters = root.components[0]
+        state = counters.save_state()
+        self.assertEqual(PHASE_ACTIVE, counters.phase)
+        self.assertEqual(counters.sigmas().min(), counters.sigma)
+        counts = counters.counts.copy()
+        coord.simulate_time(3)
+        counters.restore_state(state)
+        self.assertEqual(counts.tolist(), counters.counts.tolist())
+
+
+@unittest.skipUnless(numpy, 'NumPy is not installed')
+class TestBatchPort(unittest.TestCase):
+
+    def test_port(self):
+        port = BatchPort(numpy.int64, "test")
+        self.assertFalse(port)
+        port.add(1)
+        port.extend([2, 3])
+        port.extend(iter(range(4, 6)))
+        port.extend([])
+        self.assertEqual(3, len(port.blocks))
+        self.assertEqual(5, len(port))
+        self.assertEqual([1, 2, 3, 4, 5], [int(val) for val in port.values])
+        self.assertEqual([1, 2, 3, 4, 5], port.array.tolist())
+        self.assertRaises(TypeError, port.extend, [1.5, 2.5])  # floats cannot be safely cast to integers
+        port.clear()
+        self.assertFalse(port)
+        self.assertEqual(0, len(port.array))
+
+        block = numpy.arange(4)
+        port.extend(block)
+        self.assertIs(block, port.array)  # blocks are not copied
+        trusted = BatchPort(numpy.int64, "trusted")
+        trusted.set_validation(VALIDATION_TRUSTED)
+        self.assertRaises(TypeError, trusted.extend, [1.5])
+        trusted.extend([1])
+        self.assertRaises(TypeError, trusted.extend, [1.5])  # blocks are never cast unsafely
+        self.assertEqual([1], trusted.array.tolist())
+
+    def test_overflow(self):
+        # Values out of the range of the data type are rejected instead of wrapped around or turned into infinity
+        small = BatchPort(numpy.int8, "small")
+        self.assertRaises(TypeError, small.extend, [1000, 3])
+        self.assertRaises(TypeError, small.add, -129)
+        self.assertRaises(TypeError, small.extend, iter([2 ** 70]))
+        small.extend([127, -128])
+        self.assertEqual([127, -128], small.array.tolist())
+        self.assertRaises(TypeError, BatchPort(numpy.uint8, "unsigned").add, -1)
+        single = BatchPort(numpy.float32, "single")
+        self.assertRaises(TypeError, single.add, 1e300)
+        self.assertRaises(TypeError, single.extend, numpy.array([1.0]))  # float64 arrays are not safely cast
+        single.extend([1.5, float('inf')])
+        self.assertEqual([1.5, float('inf')], single.array.tolist())
+        self.assertEqual(numpy.float32, single.array.dtype)
+
+    def test_structured_port(self):
+        dtype = numpy.dtype([('id', numpy.int64), ('value', numpy.float64)])
+        port = BatchPort(dtype, "records")
+        port.add((1, 2.0))
+        port.extend([(3, 4.0), (5, 6.0)])
+        port.extend(numpy.array([(7, 8.0)], dtype=dtype))
+        self.assertEqual(dtype, port.array.dtype)
+        self.assertEqual([1, 3, 5, 7], port.array['id'].tolist())
+        self.assertEqual([2.0, 4.0, 6.0, 8.0], port.array['value'].tolist())
+        self.assertRaises(TypeError, port.add, (1, 2.0, 3.0))  # wrong number of fields
+        self.assertRaises(TypeError, port.extend, numpy.array([1.5]))
+
+    def test_couplings(self):
+        self.assertRaises(ValueError, Coupling, BatchPort(numpy.int64, "o_out"), BatchPort(numpy.float64, "i_in"))
+        self.assertRaises(ValueError, Coupling, BatchPort(numpy.int64, "o_out"), Port(int, "i_in"))
+        Coupling(BatchPort(numpy.int64, "o_out"), Port(None, "i_in"))
+
+    def test_simulation(self):
+        for engine in Coordinator, FlatCoordinator:
+            for n_generators in 1, 3:
+                with self.subTest(engine=engine, n_generators=n_generators):
+                    root = batch_model(n_generators)
+                    coord = engine(root)
+                    coord.initialize()
+                    coord.simulate()
+                    coord.exit()
+                    receiver = root.components[0].components[0]
+                    self.assertEqual(3 * n_generators, receiver.n_blocks)
+                    self.assertEqual(3 * n_generators * 45, receiver.total)
+                    if n_generators == 1:  # blocks of single sources reach receivers without copies
+                        self.assertIs(root.components[1].outputs, receiver.last_array)
+
+
+if __name__ == '__main__':
+    unittest.main()
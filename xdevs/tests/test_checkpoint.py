@@ -0,0 +1,195 @@
+import os
+import tempfile
+import unittest
+from xdevs import PHASE_ACTIVE
+from xdevs.celldevs.inout import CellMessage
+from xdevs.models import Atomic, Coupled, Port
+from xdevs.plugins.celldevs_outputs.hybrid import HybridDelayedOutput
+from xdevs.plugins.celldevs_outputs.transport import TransportDelayedOutput
+from xdevs.sim import Coordinator, FlatCoordinator
+from xdevs.tests.test_sim import MODEL_TYPES
+from xdevs.examples.devstone.devstone import DEVStone
+
+
+class Counter(Atomic):
+    def __init__(self, name: str, period: float):
+        super().__init__(name)
+        self.o_out: Port[int] = Port(int, "o_out")
+        self.add_out_port(self.o_out)
+        self.period: float = period
+        self.count: int = 0
+
+    def initialize(self):
+        self.hold_in(PHASE_ACTIVE, self.period)
+
+    def exit(self):
+        pass
+
+    def deltint(self):
+        self.count += 1
+        self.hold_in(PHASE_ACTIVE, self.period)
+
+    def deltext(self, e: float):
+        pass
+
+    def lambdaf(self):
+        self.o_out.add(self.count)
+
+
+class DelayLine(Atomic):
+    """Atomic model that sends received values after a delay with transport and hybrid delayed outputs."""
+
+    def __init__(self, name: str, delay: float):
+        super().__init__(name)
+        self.i_in: Port[int] = Port(int, "i_in")
+        self.add_in_port(self.i_in)
+        self.transport: TransportDelayedOutput = TransportDelayedOutput("transport")
+        self.hybrid: HybridDelayedOutput = HybridDelayedOutput("hybrid")
+        self.hybrid.port.name = "out_hybrid"
+        self.add_out_port(self.transport.port)
+        self.add_out_port(self.hybrid.port)
+        self.delay: float = delay
+        self.clock: float = 0
+
+    def initialize(self):
+        self.passivate()
+
+    def exit(self):
+        pass
+
+    def _next_time(self) -> float:
+        return min(self.transport.next_time(), self.hybrid.next_time())
+
+    def deltint(self):
+        self.clock += self.sigma
+        self.transport.clean(self.clock)
+        self.hybrid.clean(self.clock)
+        self.sigma = self._next_time() - self.clock
+
+    def deltext(self, e: float):
+        self.clock += e
+        for value in self.i_in.values:
+            self.transport.add_to_buffer(self.clock + self.delay, value)
+            self.hybrid.add_to_buffer(self.clock + self.delay * (1 + value % 2), value)
+        self.sigma = self._next_time() - self.clock
+
+    def lambdaf(self):
+        self.transport.send_events(self.clock + self.sigma)
+        self.hybrid.send_events(self.clock + self.sigma)
+
+
+class Recorder(Atomic):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.i_in: Port[CellMessage] = Port(CellMessage, "i_in")
+        self.add_in_port(self.i_in)
+        self.clock: float = 0
+        self.log: list[tuple[float, str, int]] = list()
+
+    def initialize(self):
+        self.passivate()
+
+    def exit(self):
+        pass
+
+    def deltint(self):
+        pass
+
+    def deltext(self, e: float):
+        self.clock += e
+        self.continuef(e)
+        self.log.extend((self.clock, msg.cell_id, msg.cell_state) for msg in self.i_in.values)
+
+    def lambdaf(self):
+        pass
+
+
+def delay_model() -> Coupled:
+    root = Coupled("root")
+    counter = Counter("counter", 1)
+    line = DelayLine("line", 2.5)
+    recorder = Recorder("recorder")
+    for comp in counter, line, recorder:
+        root.add_component(comp)
+    root.add_coupling(counter.o_out, line.i_in)
+    root.add_coupling(line.transport.port, recorder.i_in)
+    root.add_coupling(line.hybrid.port, recorder.i_in)
+    return root
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'checkpoint.bin')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_devstone(self):
+        for model_type in MODEL_TYPES:
+            for engine, kwargs in (Coordinator, {}), (Coordinator, {'scheduler': 'heap'}), (FlatCoordinator, {}):
+                with self.subTest(model_type=model_type, engine=engine, **kwargs):
+                    expected = DEVStone("root", model_type, 4, 4, 0, 0)
+                    coord = engine(expected, **kwargs)
+                    coord.initialize()
+                    coord.simulate(2)
+                    coord.checkpoint(self.path)
+                    coord.simulate()
+                    coord.exit()
+
+                    root = DEVStone("root", model_type, 4, 4, 0, 0)
+                    restored = engine(root, **kwargs)
+                    restored.initialize()
+                    restored.restore(self.path)
+                    restored.simulate()
+                    restored.exit()
+                    self.assertEqual(expected.n_internals, root.n_internals)
+                    self.assertEqual(expected.n_externals, root.n_externals)
+                    self.assertEqual(expected.n_events, root.n_events)
+
+    def test_delayed_outputs(self):
+        expected = delay_model()
+        coord = Coordinator(expected)
+        coord.initialize()
+        coord.simulate_time(20)
+        coord.exit()
+
+        root = delay_model()
+        coord = Coordinator(root)
+        coord.initialize()
+        coord.simulate_time(7.2)
+        self.assertTrue(root.components[1].transport.schedule)
+        self.assertTrue(root.components[1].hybrid.next_states)
+        coord.checkpoint(self.path)
+        time_next = coord.time_next
+
+        restored = delay_model()
+        coord = Coordinator(restored)
+        coord.initialize()
+        coord.restore(self.path)
+        self.assertEqual(time_next, coord.time_next)
+        line = restored.components[1]
+        self.assertEqual(root.components[1].transport.schedule, line.transport.schedule)
+        self.assertEqual(list(root.components[1].hybrid.next_states), list(line.hybrid.next_states))
+        self.assertIs(line.transport.port, line.out_ports[0])  # Ports are restored as references
+        coord.simulate_time(20 - coord.clock.time + 1)
+        coord.exit()
+        self.assertLess(time_next, restored.components[2].log[-1][0])
+        self.assertEqual(expected.components[2].log, restored.components[2].log)
+
+    def test_invalid(self):
+        coord = Coordinator(delay_model())
+        coord.initialize()
+        coord.checkpoint(self.path)
+        other = Coordinator(DEVStone("root", "LI", 2, 2, 0, 0))
+        other.initialize()
+        self.assertRaises(ValueError, other.restore, self.path)
+        with open(self.path, 'wb') as file:
+            file.write(b'not a checkpoint')
+        self.assertRaises(ValueError, coord.restore, self.path)
+        self.assertRaises(RuntimeError, other.coordinators[0].checkpoint, self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
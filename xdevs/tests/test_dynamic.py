@@ -0,0 +1,241 @@
+import unittest
+from typing import Optional
+from xdevs import INFINITY, PHASE_ACTIVE
+from xdevs.models import Atomic, Coupled, Port
+from xdevs.sim import Coordinator, FlatCoordinator, ThreadPoolCoordinator
+from xdevs.tests.test_sim import ListTransducer
+
+ENGINES = (
+    (Coordinator, {}),
+    (Coordinator, {'scheduler': 'heap'}),
+    (FlatCoordinator, {}),
+    (FlatCoordinator, {'scheduler': 'linear'}),
+    (ThreadPoolCoordinator, {}),
+)
+
+
+class Agent(Atomic):
+    """Atomic model that counts the ticks it receives, reports them, and removes itself when its lifetime expires."""
+
+    def __init__(self, name: str, lifetime: float, log: list):
+        super().__init__(name)
+        self.i_tick: Port[int] = Port(int, "i_tick")
+        self.o_out: Port[int] = Port(int, "o_out")
+        self.add_in_port(self.i_tick)
+        self.add_out_port(self.o_out)
+        self.lifetime: float = lifetime
+        self.log: list = log
+        self.ticks: int = 0
+
+    def initialize(self):
+        self.hold_in(PHASE_ACTIVE, self.lifetime)
+
+    def exit(self):
+        self.log.append((self.name, self.ticks))
+
+    def deltint(self):
+        self.passivate()
+        self.parent.remove_component(self)
+
+    def deltext(self, e: float):
+        self.ticks += len(self.i_tick)
+        self.continuef(e)
+
+    def lambdaf(self):
+        self.o_out.add(self.ticks)
+
+
+class Spawner(Atomic):
+    """Atomic model that sends a tick and spawns a new agent in its parent model periodically."""
+
+    def __init__(self, name: str, period: float, lifetime: float):
+        super().__init__(name)
+        self.o_tick: Port[int] = Port(int, "o_tick")
+        self.add_out_port(self.o_tick)
+        self.period: float = period
+        self.lifetime: float = lifetime
+        self.n_agents: int = 0
+        self.log: list = list()
+
+    def initialize(self):
+        self.hold_in(PHASE_ACTIVE, self.period)
+
+    def exit(self):
+        pass
+
+    def deltint(self):
+        self.n_agents += 1
+        agent = Agent(f"agent_{self.n_agents}", self.lifetime, self.log)
+        colony = self.parent
+        colony.add_component(agent)
+        colony.add_coupling(self.o_tick, agent.i_tick)
+        colony.add_coupling(agent.o_out, colony.o_out)
+        self.hold_in(PHASE_ACTIVE, self.period)
+
+    def deltext(self, e: float):
+        pass
+
+    def lambdaf(self):
+        self.o_tick.add(self.n_agents)
+
+
+class Sink(Atomic):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.i_in: Port[int] = Port(int, "i_in")
+        self.add_in_port(self.i_in)
+        self.clock: float = 0
+        self.received: list[tuple[float, int]] = list()
+
+    def initialize(self):
+        self.passivate()
+
+    def exit(self):
+        pass
+
+    def deltint(self):
+        pass
+
+    def deltext(self, e: float):
+        self.clock += e
+        self.continuef(e)
+        self.received.extend((self.clock, value) for value in self.i_in.values)
+
+    def lambdaf(self):
+        pass
+
+
+class Builder(Atomic):
+    """Atomic model that sends ticks periodically, and adds a sink coupled to a group model after its first tick."""
+
+    def __init__(self, name: str, group: Coupled):
+        super().__init__(name)
+        self.o_tick: Port[int] = Port(int, "o_tick")
+        self.add_out_port(self.o_tick)
+        self.group: Coupled = group
+        self.n_ticks: int = 0
+        self.sink: Optional[Sink] = None
+
+    def initialize(self):
+        self.hold_in(PHASE_ACTIVE, 1)
+
+    def exit(self):
+        pass
+
+    def deltint(self):
+        if self.sink is None:
+            self.sink = Sink("sink")
+            self.group.add_component(self.sink)
+            self.group.add_coupling(self.group.get_in_port("i_in"), self.sink.i_in)
+        self.hold_in(PHASE_ACTIVE, 1)
+
+    def deltext(self, e: float):
+        pass
+
+    def lambdaf(self):
+        self.n_ticks += 1
+        self.o_tick.add(self.n_ticks)
+
+
+def colony_model() -> Coupled:
+    root = Coupled("root")
+    colony = Coupled("colony")
+    colony.o_out = Port(int, "o_out")
+    colony.add_out_port(colony.o_out)
+    colony.add_component(Spawner("spawner", 1, 3.5))
+    sink = Sink("sink")
+    root.add_component(colony)
+    root.add_component(sink)
+    root.add_coupling(colony.o_out, sink.i_in)
+    return root
+
+
+class TestDynamicStructure(unittest.TestCase):
+
+    def test_spawn_and_kill(self):
+        for engine, kwargs in ENGINES:
+            with self.subTest(engine=engine.__name__, **kwargs):
+                root = colony_model()
+                colony, sink = root.components
+                spawner = colony.components[0]
+                coord = engine(root, **kwargs)
+                coord.initialize()
+                coord.simulate_time(10)
+                # Agent k is spawned at time k, receives ticks at times k + 1, k + 2, and k + 3, and dies at k + 3.5
+                self.assertEqual([(f"agent_{k}", 3) for k in range(1, 8)], spawner.log)
+                self.assertEqual([(k + 3.5, 3) for k in range(1, 8)], sink.received)
+                self.assertEqual(["spawner", "agent_8", "agent_9", "agent_10"], [c.name for c in colony.components])
+                self.assertEqual(3, len(colony.eoc))
+                self.assertEqual(11, coord.time_next)
+                coord.exit()
+                self.assertEqual(10, len(spawner.log))
+                self.assertIsNone(root._listener)
+
+    def test_external_changes(self):
+        for engine, kwargs in ENGINES:
+            with self.subTest(engine=engine.__name__, **kwargs):
+                root = colony_model()
+                colony, sink = root.components
+                spawner = colony.components[0]
+                transducer = ListTransducer(transducer_id="transducer", exhaustive=False)
+                coord = engine(root, **kwargs)
+                coord.add_transducer(transducer)
+                coord.initialize()
+                coord.simulate_time(0.5)  # agent_1 is alive
+
+                # The colony stops spawning agents
+                colony.remove_component(spawner)
+                self.assertFalse(colony.ic)
+                # A new group with its own agent is attached to the sink, and its ports are observed
+                group = Coupled("group")
+                group.o_out = Port(int, "o_out")
+                group.add_out_port(group.o_out)
+                agent = Agent("agent_x", 2, spawner.log)
+                group.add_component(agent)
+                group.add_coupling(agent.o_out, group.o_out)
+                transducer.add_target_port(group.o_out)
+                root.add_component(group)
+                root.add_coupling(group.o_out, sink.i_in)
+
+                coord.simulate_time()
+                self.assertEqual(INFINITY, coord.time_next)
+                # The spawner exits when removed. Its agent dies at 4.5 and the new agent, initialized at 1, dies at 3
+                self.assertEqual([("agent_x", 0), ("agent_1", 0)], spawner.log)
+                self.assertEqual([(3, 0), (4.5, 0)], sink.received)
+                self.assertEqual([], colony.components)
+                self.assertEqual([(3, 'group', 'o_out', '0')], [(e['sim_time'], e['model_name'], e['port_name'],
+                                                                 e['value']) for e in transducer.events])
+                coord.exit()
+
+    def test_spawn_and_couple(self):
+        # The sink is added and coupled in the same transition in which the group receives a tick
+        for engine, kwargs in ENGINES:
+            with self.subTest(engine=engine.__name__, **kwargs):
+                root = Coupled("root")
+                group = Coupled("group")
+                group.add_in_port(Port(int, "i_in"))
+                builder = Builder("builder", group)
+                root.add_component(builder)
+                root.add_component(group)
+                root.add_coupling(builder.o_tick, group.get_in_port("i_in"))
+                coord = engine(root, **kwargs)
+                coord.initialize()
+                coord.simulate_time(3)
+                coord.exit()
+                self.assertIs(group, builder.sink.parent)
+                self.assertEqual([2, 3], [value for _, value in builder.sink.received][-2:])
+
+    def test_remove_component(self):
+        root = colony_model()
+        colony, sink = root.components
+        self.assertRaises(ValueError, root.remove_component, colony.components[0])
+        root.remove_component(sink)
+        self.assertIsNone(sink.parent)
+        self.assertEqual([colony], root.components)
+        self.assertFalse(root.ic)
+        root.remove_component(colony)
+        self.assertEqual(dict(), root.compile_routes())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+import csv
+import os
+import random
+import tempfile
+import unittest
+from functools import partial
+from xdevs import PHASE_ACTIVE
+from xdevs.examples.devstone.devstone import DEVStone
+from xdevs.experiments import ParameterSweep, ReplicationRunner, grid, latin_hypercube, replication_seed, t_quantile
+from xdevs.experiments.writers import pyarrow
+from xdevs.models import Atomic, Coupled
+
+JSON_PATH = os.path.join(os.path.dirname(__file__), '..', 'examples', 'json', 'efp.json')
+
+
+class Walker(Atomic):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.position: float = 0
+
+    def initialize(self):
+        self.hold_in(PHASE_ACTIVE, 1)
+
+    def exit(self):
+        pass
+
+    def deltint(self):
+        self.position += random.gauss(0, 1)
+        self.hold_in(PHASE_ACTIVE, random.expovariate(1))
+
+    def deltext(self, e: float):
+        pass
+
+    def lambdaf(self):
+        pass
+
+
+def walker_model() -> Coupled:
+    root = Coupled("root")
+    root.add_component(Walker("walker"))
+    return root
+
+
+def walker_position(model: Coupled) -> float:
+    return model.components[0].position
+
+
+def walker_summary(model: Coupled) -> dict:
+    return {'position': model.components[0].position}
+
+
+def run_summary(model: Coupled) -> dict:
+    return {'run': 0, 'wall_time': model.components[0].position}
+
+
+def n_components(model: Coupled) -> int:
+    return len(model.components)
+
+
+def devstone_counts(model: DEVStone) -> dict:
+    return {'n_internals': model.n_internals, 'n_externals': model.n_externals, 'n_events': model.n_events}
+
+
+def devstone_width(model: DEVStone) -> dict:
+    return {'width': model.n_atomics}
+
+
+def transducer_time(model: Coupled) -> float:
+    return model.components[0].components[1].obs_t
+
+
+class TestReplications(unittest.TestCase):
+
+    def test_determinism(self):
+        expected = ReplicationRunner(walker_model, walker_position, 20, seed=1, n_workers=1).run(8)
+        self.assertEqual(8, len(expected))
+        self.assertEqual(8, len(set(expected.seeds)))
+        self.assertEqual(8, len(set(expected.outputs)))
+        for n_workers, chunk_size in (2, 1), (3, 2):
+            with self.subTest(n_workers=n_workers, chunk_size=chunk_size):
+                runner = ReplicationRunner(walker_model, walker_position, 20, seed=1,
+                                           n_workers=n_workers, chunk_size=chunk_size)
+                results = runner.run(8)
+                self.assertEqual(expected.seeds, results.seeds)
+                self.assertEqual(expected.outputs, results.outputs)
+        other = ReplicationRunner(walker_model, walker_position, 20, seed=2, n_workers=2).run(8)
+        self.assertNotEqual(expected.outputs, other.outputs)
+        self.assertEqual([replication_seed(1, i) for i in range(8)], expected.seeds)
+
+    def test_half_width(self):
+        runner = ReplicationRunner(walker_model, walker_summary, 10, n_workers=2)
+        full = runner.run(40, reducer=lambda output: output['position'])
+        self.assertEqual(40, len(full))
+        target = full.half_width * 2
+        results = runner.run(40, reducer=lambda output: output['position'], half_width=target)
+        self.assertLess(len(results), 40)
+        self.assertLessEqual(results.half_width, target)
+        self.assertEqual(full.outputs[:len(results)], results.outputs)
+        self.assertAlmostEqual(sum(results.observations) / len(results), results.mean)
+        low, high = results.interval
+        self.assertAlmostEqual(results.mean, (low + high) / 2)
+        self.assertRaises(ValueError, runner.run, 10, half_width=target)  # dictionaries are not observations
+
+    def test_json(self):
+        runner = ReplicationRunner(JSON_PATH, n_components, 10, n_workers=2)
+        results = runner.run(2)
+        self.assertEqual([2, 2], results.outputs)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, ReplicationRunner, walker_model, walker_position, n_workers=0)
+        self.assertRaises(ValueError, ReplicationRunner, walker_model, walker_position, chunk_size=0)
+        runner = ReplicationRunner(walker_model, walker_position, 10, n_workers=1)
+        self.assertRaises(ValueError, runner.run, 0)
+        self.assertRaises(ValueError, runner.run, 10, confidence=1)
+        self.assertRaises(ValueError, runner.run, 10, min_replications=1)
+
+    def test_t_quantile(self):
+        # Reference values from statistical tables
+        for df, expected in (1, 12.706), (2, 4.303), (5, 2.571), (10, 2.228), (30, 2.042):
+            with self.subTest(df=df):
+                self.assertAlmostEqual(expected, t_quantile(0.975, df), delta=0.01)
+
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_designs(self):
+        configs = grid(width=[2, 3], depth=[1, 2, 4])
+        self.assertEqual(6, len(configs))
+        self.assertIn({'width': 3, 'depth': 4}, configs)
+        samples = latin_hypercube(10, seed=3, width=(1, 10), delay=(0.0, 1.0))
+        self.assertEqual(list(range(1, 11)), sorted(sample['width'] for sample in samples))
+        strata = sorted(int(sample['delay'] * 10) for sample in samples)
+        self.assertEqual(list(range(10)), strata)  # every stratum is sampled once
+        self.assertEqual(samples, latin_hypercube(10, seed=3, width=(1, 10), delay=(0.0, 1.0)))
+        self.assertRaises(ValueError, latin_hypercube, 0, width=(1, 10))
+
+    def test_devstone(self):
+        path = os.path.join(self.tmp_dir.name, 'results.csv')
+        factory = partial(DEVStone, name='root', model_type='LI', int_delay=0, ext_delay=0)
+        configs = grid(width=[2, 4], depth=[2, 3, 5])
+        rows = ParameterSweep(factory, devstone_counts, n_workers=3).run(configs, path)
+        self.assertEqual(list(range(6)), [row['run'] for row in rows])
+        for row, config in zip(rows, configs):
+            expected = DEVStone('root', 'LI', config['width'], config['depth'], 0, 0)
+            self.assertEqual(expected.n_events, row['n_events'])
+            self.assertGreaterEqual(row['wall_time'], 0)
+        with open(path, newline='') as file:
+            written = list(csv.DictReader(file))
+        self.assertEqual(6, len(written))
+        self.assertEqual(['run', 'width', 'depth', 'n_internals', 'n_externals', 'n_events', 'wall_time'],
+                         list(written[0]))
+        self.assertEqual({str(row['n_events']) for row in rows}, {row['n_events'] for row in written})
+
+    def test_json(self):
+        configs = [{'efp.ef.obs_t': 10.0}, {'efp.ef.obs_t': 20.0}]
+        rows = ParameterSweep(JSON_PATH, transducer_time, 5, n_workers=2).run(configs)
+        self.assertEqual([10.0, 20.0], [row['output'] for row in rows])
+        self.assertRaises(ValueError, ParameterSweep(JSON_PATH, transducer_time).run, [{'efp.unknown.x': 1}])
+
+    def test_column_collisions(self):
+        factory = partial(DEVStone, name='root', model_type='LI', int_delay=0, ext_delay=0)
+        # Output columns cannot overwrite parameters, nor the index and wall time of runs
+        sweep = ParameterSweep(factory, devstone_width, n_workers=1)
+        self.assertRaises(ValueError, sweep.run, [{'width': 2, 'depth': 2}])
+        self.assertRaises(ValueError, ParameterSweep(walker_model, run_summary, n_workers=1).run, [{}])
+        self.assertRaises(ValueError, sweep.run, [{'width': 2, 'depth': 2, 'run': 0}])
+
+    @unittest.skipUnless(pyarrow, 'pyarrow is not installed')
+    def test_parquet(self):
+        import pyarrow.parquet
+        path = os.path.join(self.tmp_dir.name, 'results.parquet')
+        factory = partial(DEVStone, name='root', model_type='HO', int_delay=0, ext_delay=0)
+        configs = latin_hypercube(5, width=(2, 5), depth=(2, 5))
+        rows = ParameterSweep(factory, devstone_counts, n_workers=2).run(configs, path)
+        table = pyarrow.parquet.read_table(path)
+        self.assertEqual(5, table.num_rows)
+        self.assertEqual(sorted(row['n_events'] for row in rows), sorted(table.column('n_events').to_pylist()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import unittest
+from typing import Optional
+from xdevs import PHASE_ACTIVE
+from xdevs.memo import MemoizedAtomic, TransitionCache, memoize
+from xdevs.models import Atomic, Coupled, Port
+from xdevs.sim import Coordinator
+from xdevs.tests.test_checkpoint import Counter
+
+
+class Controller(Atomic):
+    """Cyclic controller. Commands received from the input port are added to its level modulo 4."""
+
+    n_computations: int = 0
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.i_cmd: Port[int] = Port(int, "i_cmd")
+        self.o_out: Port[int] = Port(int, "o_out")
+        self.add_in_port(self.i_cmd)
+        self.add_out_port(self.o_out)
+        self.level: int = 0
+
+    def initialize(self):
+        self.hold_in(PHASE_ACTIVE, 1)
+
+    def exit(self):
+        pass
+
+    def deltint(self):
+        type(self).n_computations += 1
+        self.level = (self.level + 1) % 4
+        self.hold_in(PHASE_ACTIVE, 1 + self.level % 2)
+
+    def deltext(self, e: float):
+        type(self).n_computations += 1
+        self.level = (self.level + sum(self.i_cmd.values)) % 4
+        self.continuef(e)
+
+    def lambdaf(self):
+        type(self).n_computations += 1
+        self.o_out.add(self.level * 10)
+
+
+class MemoizedController(MemoizedAtomic, Controller):
+    n_computations: int = 0
+
+    def state_key(self):
+        return self.level
+
+    def load_state_key(self, key):
+        self.level = key
+
+
+class Recorder(Atomic):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.i_in: Port[int] = Port(int, "i_in")
+        self.add_in_port(self.i_in)
+        self.clock: float = 0
+        self.log: list[tuple[float, list[int]]] = list()
+
+    def initialize(self):
+        self.passivate()
+
+    def exit(self):
+        pass
+
+    def deltint(self):
+        pass
+
+    def deltext(self, e: float):
+        self.clock += e
+        self.log.append((self.clock, sorted(self.i_in.values)))
+
+    def lambdaf(self):
+        pass
+
+
+def controllers_model(controller_type: type, cache: Optional[TransitionCache] = None) -> Coupled:
+    root = Coupled("root")
+    commands = Counter("commands", 2.5)
+    recorder = Recorder("recorder")
+    root.add_component(commands)
+    root.add_component(recorder)
+    for i in range(3):
+        controller = controller_type(f"controller_{i}") if cache is None else controller_type(f"controller_{i}", cache)
+        root.add_component(controller)
+        root.add_coupling(commands.o_out, controller.i_cmd)
+        root.add_coupling(controller.o_out, recorder.i_in)
+    return root
+
+
+class Rules:
+    def __init__(self, factor: int):
+        self.factor: int = factor
+        self.n_computations: int = 0
+
+    @memoize(lambda self, x: (self.factor, x), maxsize=2)
+    def compute(self, x: int) -> int:
+        self.n_computations += 1
+        return self.factor * x
+
+    @memoize(lambda self, x, offset=0: (self.factor, x, offset))
+    def shift(self, x: int, offset: int = 0) -> int:
+        self.n_computations += 1
+        return self.factor * x + offset
+
+
+class TestMemo(unittest.TestCase):
+
+    def test_cache(self):
+        cache = TransitionCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(1, cache.get('a'))
+        cache.put('c', 3)  # 'b' is the least recently used result
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(3, cache.get('c'))
+        self.assertEqual((2, 1, 2), (cache.hits, cache.misses, len(cache)))
+        self.assertAlmostEqual(2 / 3, cache.hit_rate)
+        cache.clear()
+        self.assertEqual((0, 0, 0), (cache.hits, cache.misses, len(cache)))
+        self.assertRaises(ValueError, TransitionCache, 0)
+
+    def test_memoized_atomic(self):
+        expected = controllers_model(Controller)
+        coord = Coordinator(expected)
+        coord.initialize()
+        coord.simulate_time(40)
+        coord.exit()
+
+        cache = TransitionCache()
+        root = controllers_model(MemoizedController, cache)
+        coord = Coordinator(root)
+        coord.initialize()
+        coord.simulate_time(40)
+        coord.exit()
+        self.assertEqual(expected.components[1].log, root.components[1].log)
+        self.assertEqual([c.level for c in expected.components[2:]], [c.level for c in root.components[2:]])
+        self.assertGreater(cache.hits, cache.misses)
+        self.assertEqual(cache.misses, MemoizedController.n_computations)
+        self.assertLess(MemoizedController.n_computations, Controller.n_computations)
+        self.assertNotIn('cache', root.components[2].save_state())
+
+    def test_memoize(self):
+        double, triple = Rules(2), Rules(3)
+        self.assertEqual([2, 4, 2], [double.compute(x) for x in (1, 2, 1)])
+        self.assertEqual(3, triple.compute(1))
+        self.assertEqual(2, double.n_computations)
+        self.assertEqual(1, Rules.compute.cache.hits)
+        self.assertEqual(2, len(Rules.compute.cache))  # the cache is bounded
+
+    def test_memoize_kwargs(self):
+        rules = Rules(2)
+        self.assertEqual([2, 3, 3, 2], [rules.shift(1), rules.shift(1, offset=1), rules.shift(1, 1), rules.shift(1)])
+        self.assertEqual(2, rules.n_computations)  # keyword arguments are part of the key
+        self.assertEqual(1, rules.shift(0, offset=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -27,6 +27,192 @@ class TestModels(unittest.TestCase):
 
             self.assertRaises(TypeError, p.add, "test")
 
+        def test_port_bag(self):
+            # Long chains of single-source ports alias the values of the source port
+            source = Port(int, "source")
+            source.add(0)
+            chain = [source]
+            for i in range(5000):
+                port = Port(int, f"port_{i}")
+                port.add_to_bag(chain[-1])
+                chain.append(port)
+            self.assertEqual(1, len(chain[-1]))
+            self.assertEqual([0], list(chain[-1].values))
+            self.assertIs(source._values, chain[-1]._resolve())
+            # Values are sorted by source when several ports write to the same port
+            other = Port(int, "other")
+            other.extend([1, 2])
+            dest = Port(int, "dest")
+            dest.add(-1)
+            dest.add_to_bag(chain[-1])
+            dest.add_to_bag(other)
+            self.assertEqual([-1, 0, 1, 2], list(dest.values))
+            self.assertEqual(4, len(dest))
+            # Cached views are invalidated when new values are added
+            dest.add(3)
+            self.assertEqual([-1, 3, 0, 1, 2], list(dest.values))
+            dest.clear()
+            self.assertEqual(0, len(dest))
+            self.assertEqual([], list(dest.values))
+
+        def test_compile_routes(self):
+            from xdevs.examples.devstone.devstone import DEVStone
+            root = DEVStone("root", "LI", 3, 4, 0, 0)
+            routes = root.compile_routes()
+            # The seeder reaches every atomic model of the LI model in one hop
+            self.assertEqual(1, len(routes))
+            destinations = [coup.port_to for coup in routes[root.seeder.o_out]]
+            self.assertEqual(root.n_atomics, len(destinations))
+            self.assertTrue(all(isinstance(port.parent, Atomic) for port in destinations))
+            self.assertTrue(all(coup.port_from is root.seeder.o_out for coup in routes[root.seeder.o_out]))
+            self.assertIs(routes, root.compile_routes())  # Routes are cached
+            # Atomic models of the LI model are connected to the output port of the top-most LI model
+            li_routes = root.devstone.compile_routes()
+            self.assertEqual(root.n_atomics, len(li_routes[root.devstone.i_in]))
+            deepest = root.devstone
+            while deepest.coupled is not None:
+                deepest = deepest.coupled
+            self.assertEqual(root.devstone.o_out, li_routes[deepest.components[0].o_out][0].port_to)
+
+            inner = root.devstone.coupled
+            atomic = inner.components[-1]
+            inner.add_coupling(atomic.o_out, inner.o_out)
+            self.assertIsNone(root._routes)
+            self.assertIsNone(root.devstone._routes)
+            self.assertNotIn(atomic.o_out, root.compile_routes())  # DEVStone output is not coupled to the root
+            self.assertEqual(root.devstone.o_out, root.devstone.compile_routes()[atomic.o_out][0].port_to)
+
+        def test_flatten(self):
+            from xdevs.examples.devstone.devstone import DEVStone
+            root = DEVStone("root", "HI", 3, 3, 0, 0)
+            n_atomics = root.n_atomics
+            inner = root.devstone.coupled
+            port_map = root.flatten_port_map()
+            self.assertEqual(n_atomics + 1, len(root.components))  # DEVStone atomics and seeder
+            self.assertTrue(all(isinstance(comp, Atomic) and comp.parent is root for comp in root.components))
+            self.assertEqual(n_atomics, len(root.ic[root.seeder.o_out]))
+            self.assertEqual([root.seeder.o_out], port_map[inner.i_in])
+            # Output ports of removed models are mapped to all the atomic output ports that reach them
+            self.assertLessEqual(set(port_map[inner.o_out]), set(port_map[root.devstone.o_out]))
+            self.assertTrue(all(isinstance(port.parent, Atomic) for port in port_map[root.devstone.o_out]))
+            self.assertEqual(len(root.compile_routes()[root.seeder.o_out]), n_atomics)
+            # Nothing is transferred to the parent of the flattened model
+            root = DEVStone("root", "HI", 3, 3, 0, 0)
+            self.assertEqual(([], []), root.devstone.flatten())
+            self.assertEqual(n_atomics, len(root.devstone.components))
+            self.assertIs(root.devstone, root.components[1])
+            # Models cannot be flattened while they are simulated
+            from xdevs.sim import Coordinator
+            coord = Coordinator(root)
+            coord.initialize()
+            self.assertRaises(NotImplementedError, root.devstone.flatten)
+            self.assertEqual(n_atomics, len(root.devstone.components))
+            coord.exit()
+            self.assertEqual(([], []), root.flatten())
+
+        def test_lookahead(self):
+            from xdevs import INFINITY
+            from xdevs.examples.devstone.devstone import DelayedAtomic
+            atomic = DelayedAtomic("atomic", 0, 0)
+            self.assertEqual(0, atomic.lookahead())
+            atomic.i_in.lookahead = 2
+            atomic.add_in_port(Port(int, "i_other", lookahead=1.5))
+            self.assertEqual(1.5, atomic.lookahead())
+            atomic.in_ports.clear()
+            self.assertEqual(INFINITY, atomic.lookahead())  # models without inputs cannot be influenced
+
+        def test_validation(self):
+            from xdevs import VALIDATION_FULL, VALIDATION_TRUSTED
+            from xdevs.sim import Coordinator
+            from xdevs.examples.devstone.devstone import DEVStone
+            port = Port(int, "test")
+            self.assertRaises(TypeError, port.extend, [1, "2", 3])
+            self.assertFalse(port)  # invalid values are not added
+            port.extend(iter(range(3)))
+            self.assertEqual([0, 1, 2], list(port.values))
+            self.assertRaises(TypeError, port.add, "3")
+
+            port.clear()
+            port.set_validation(VALIDATION_TRUSTED)
+            self.assertRaises(TypeError, port.add, "0")  # the first value of every cycle is checked
+            self.assertRaises(TypeError, port.extend, ["0", 1])
+            port.extend([0, "1"])
+            port.add("2")
+            self.assertEqual([0, "1", "2"], list(port.values))
+            self.assertRaises(ValueError, port.set_validation, "unknown")
+
+            root = DEVStone("root", "HO", 3, 3, 0, 0)
+            coord = Coordinator(root)
+            coord.set_validation(VALIDATION_TRUSTED)
+            self.assertTrue(all(port._trusted for port in root.components[-1].in_ports))
+            coord.set_validation(VALIDATION_FULL)
+            self.assertFalse(any(port._trusted for port in root.components[-1].in_ports))
+
+            # Couplings check that port types are compatible
+            self.assertRaises(ValueError, Coupling, Port(int, "o_out"), Port(str, "i_in"))
+            Coupling(Port(bool, "o_out"), Port(int, "i_in"))
+            Coupling(Port(int, "o_out"), Port(None, "i_in"))
+
+        def test_slots(self):
+            from xdevs.examples.devstone.devstone import DelayedAtomic
+
+            class SlottedAtomic(DelayedAtomic):
+                __slots__ = ('count',)
+
+                def __init__(self, name: str):
+                    super().__init__(name, 0, 0)
+                    self.count: int = 0
+
+            port = Port(int, "i_in")
+            self.assertFalse(hasattr(port, '__dict__'))
+            self.assertFalse(hasattr(Coupling(port, Port(int, "o_out")), '__dict__'))
+            atomic = DelayedAtomic("atomic", 0, 0)
+            atomic.extra = 1  # subclasses without slots can add new attributes
+            self.assertEqual(1, atomic.extra)
+
+            slotted = SlottedAtomic("slotted")
+            self.assertLessEqual({'count', 'phase', 'sigma'}, set(slotted.save_state()))  # slots are part of the state
+            slotted.count = 3
+            slotted.hold_in("busy", 5)
+            state = slotted.save_state()
+            slotted.count = 7
+            slotted.passivate()
+            slotted.restore_state(state)
+            self.assertEqual((3, "busy", 5), (slotted.count, slotted.phase, slotted.sigma))
+            self.assertNotIn('name', state)
+            self.assertNotIn('i_in', state)
+
+        def test_bulk_builders(self):
+            from xdevs.examples.devstone.devstone import DelayedAtomic
+            root = Coupled("root")
+            root.i_in = Port(int, "i_in")
+            root.add_in_port(root.i_in)
+            atomics = [DelayedAtomic(f"atomic_{i}", 0, 0) for i in range(4)]
+            root.add_components(iter(atomics))
+            self.assertEqual(atomics, root.components)
+            self.assertTrue(all(atomic.parent is root for atomic in atomics))
+
+            couplings = [(root.i_in, atomics[0].i_in)]
+            couplings.extend((a.o_out, b.i_in) for a, b in zip(atomics, atomics[1:]))
+            routes = root.compile_routes()
+            root.add_couplings(couplings)
+            self.assertIsNone(root._routes)
+            self.assertEqual(1, len(root.eic))
+            self.assertEqual(3, len(root.ic))
+            self.assertIsNot(routes, root.compile_routes())
+
+            # Couplings are validated before adding any of them
+            other = DelayedAtomic("other", 0, 0)
+            self.assertRaises(ValueError, root.add_couplings, [(atomics[3].o_out, atomics[0].i_in),
+                                                               (atomics[3].o_out, other.i_in)])
+            self.assertNotIn(atomics[3].o_out, root.ic)
+            self.assertRaises(ValueError, root.add_coupling, other.o_out, atomics[0].i_in)
+
+            root.remove_component(atomics[1])
+            self.assertRaises(ValueError, root.add_coupling, atomics[1].o_out, atomics[2].i_in)
+            self.assertRaises(ValueError, root.remove_component, atomics[1])
+            self.assertEqual([atomics[2].o_out], list(root.ic))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+from xdevs import INFINITY
+from xdevs.models import Atomic, Coupled
+from xdevs.parallel import ParallelCoordinator
+from xdevs.sim import Coordinator
+from xdevs.examples.devstone.devstone import DEVStone, DelayedAtomic
+from xdevs.tests.test_sim import ListTransducer, MODEL_TYPES, run_devstone
+
+
+class FailingAtomic(Atomic):
+    def initialize(self):
+        self.activate()
+
+    def exit(self):
+        pass
+
+    def deltint(self):
+        self.sigma = 1 / 0
+
+    def deltext(self, e: float):
+        pass
+
+    def lambdaf(self):
+        pass
+
+
+class TestParallelCoordinator(unittest.TestCase):
+
+    def test_equivalence(self):
+        for model_type in MODEL_TYPES:
+            for n_workers in (1, 3):
+                with self.subTest(model_type=model_type, n_workers=n_workers):
+                    expected, _ = run_devstone(model_type, 4, 4)
+                    root, coord = run_devstone(model_type, 4, 4, ParallelCoordinator, n_workers=n_workers)
+                    self.assertEqual(expected.n_internals, root.n_internals)
+                    self.assertEqual(expected.n_externals, root.n_externals)
+                    self.assertEqual(expected.n_events, root.n_events)
+                    self.assertEqual(INFINITY, coord.time_next)
+
+    def test_transducers(self):
+        for model_type in MODEL_TYPES:
+            with self.subTest(model_type=model_type):
+                expected = ListTransducer(transducer_id='expected')
+                run_devstone(model_type, 3, 3, transducer=expected)
+                transducer = ListTransducer(transducer_id='parallel')
+                run_devstone(model_type, 3, 3, ParallelCoordinator, transducer=transducer, n_workers=2)
+                self.assertTrue(expected.states)
+                key = lambda x: tuple(sorted(x.items()))
+                self.assertEqual(sorted(expected.states, key=key), sorted(transducer.states, key=key))
+                self.assertEqual(sorted(expected.events, key=key), sorted(transducer.events, key=key))
+
+    def test_inject(self):
+        results = list()
+        for engine, kwargs in ((Coordinator, dict()), (ParallelCoordinator, dict(n_workers=2))):
+            root = DEVStone("root", "HO", 3, 3, 0, 0, test=True)
+            coord = engine(root, **kwargs)
+            coord.initialize()
+            coord.simulate_time(INFINITY)
+            atomic = root.devstone.coupled.components[-1]
+            self.assertTrue(coord.inject(atomic.i_in, [0, 1]))
+            coord.simulate_time(INFINITY)
+            coord.exit()
+            results.append((root.n_internals, root.n_externals, root.n_events))
+        self.assertEqual(results[0], results[1])
+
+    def test_structure_changes(self):
+        root = DEVStone("root", "HO", 3, 3, 0, 0, test=True)
+        inner = root.devstone.coupled
+        components, ic = list(inner.components), dict(inner.ic)
+        coord = ParallelCoordinator(root, n_workers=2)
+        coord.initialize()
+        # Changes are rejected before modifying the model
+        atomic = DelayedAtomic("new", 0, 0)
+        self.assertRaises(NotImplementedError, inner.add_component, atomic)
+        self.assertRaises(NotImplementedError, inner.remove_component, components[-1])
+        self.assertRaises(NotImplementedError, inner.add_coupling, inner.i_in, components[-1].i_in)
+        self.assertIsNone(atomic.parent)
+        self.assertEqual(components, inner.components)
+        self.assertEqual(ic, inner.ic)
+        coord.simulate_time(INFINITY)
+        coord.exit()
+        inner.add_component(atomic)  # The model can change once the simulation exits
+        self.assertIs(inner, atomic.parent)
+
+    def test_worker_error(self):
+        root = Coupled("root")
+        root.add_component(FailingAtomic())
+        coord = ParallelCoordinator(root, n_workers=1)
+        coord.initialize()
+        with self.assertRaises(RuntimeError) as context:
+            coord.simulate()
+        self.assertIn('ZeroDivisionError', str(context.exception))
+        self.assertRaises(ValueError, ParallelCoordinator, root, n_workers=0)
+
+    def test_exit_without_workers(self):
+        root = DEVStone("root", "LI", 3, 3, 0, 0)
+        ParallelCoordinator(root, n_workers=2).exit()
+        coord = ParallelCoordinator(root, n_workers=2)
+        coord.initialize()
+        coord.exit()
+        coord.exit()  # Workers are gone, but simulators are still there
+
+
+if __name__ == '__main__':
+    unittest.main()
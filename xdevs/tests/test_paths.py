@@ -0,0 +1,83 @@
+import unittest
+from xdevs.models import Atomic, Port
+from xdevs.sim import Coordinator
+from xdevs.examples.devstone.devstone import DEVStone, DelayedAtomic
+from xdevs.tests.test_sim import ListTransducer
+
+
+class TestPathIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.root = DEVStone("root", "HI", 3, 3, 0, 0)
+        self.index = self.root.path_index()
+
+    def test_lookup(self):
+        inner = self.root.devstone.coupled
+        atomic = inner.components[-1]
+        self.assertIs(self.index, self.root.path_index())  # The index is cached
+        self.assertIs(self.root, self.index.get("root"))
+        self.assertIs(inner, self.index.component("root.root_HI.Coupled_2"))
+        self.assertIs(atomic.i_in, self.index.port("root.root_HI.Coupled_2.Atomic_1_1.i_in"))
+        self.assertIsNone(self.index.port("root.root_HI.Coupled_2"))
+        self.assertIsNone(self.index.component("root.root_HI.Coupled_2.i_in"))
+        self.assertIsNone(self.index.get("root.unknown"))
+        self.assertEqual("root.root_HI.Coupled_2.Atomic_1_1.i_in", self.index.path(atomic.i_in))
+        self.assertEqual("root.root_HI.Coupled_2", self.index.path(inner))
+        self.assertIsNone(self.index.path(Port(int, "i_in")))
+
+    def test_queries(self):
+        inner = self.root.devstone.coupled
+        paths = [path for path, _ in self.index.prefix("root.root_HI.Coupled_2")]
+        self.assertEqual(15, len(paths))
+        self.assertEqual("root.root_HI.Coupled_2", paths[0])
+        self.assertTrue(all(path.startswith("root.root_HI.Coupled_2") for path in paths))
+        self.assertEqual([], list(self.index.prefix("root.root_HI.Coupled")))
+
+        matches = dict(self.index.glob("root.root_HI.Coupled_2.Atomic_*.o_out"))
+        self.assertEqual({"root.root_HI.Coupled_2.Atomic_0_1.o_out", "root.root_HI.Coupled_2.Atomic_1_1.o_out"},
+                         set(matches))
+        self.assertTrue(all(port.parent.parent is inner for port in matches.values()))
+        atomic_ports = dict(self.index.glob("root.**.Atomic_?_?.i_in"))
+        self.assertEqual(self.root.n_atomics, len(atomic_ports))
+        self.assertTrue(all(isinstance(port.parent, Atomic) for port in atomic_ports.values()))
+        self.assertEqual(["root"], [path for path, _ in self.index.glob("**.root")])
+        self.assertEqual(["root.root_HI"], [path for path, _ in self.index.glob("root.*_HI")])
+
+    def test_structure_changes(self):
+        inner = self.root.devstone.coupled
+        atomic = DelayedAtomic("new", 0, 0)
+        inner.add_component(atomic)
+        self.assertIs(atomic.i_in, self.index.port("root.root_HI.Coupled_2.new.i_in"))
+        self.assertIs(atomic.i_in, inner.path_index().port("Coupled_2.new.i_in"))
+        inner.add_coupling(inner.i_in, atomic.i_in)
+        self.assertIs(self.index, self.root.path_index())  # Couplings do not change the index
+        self.root.devstone.remove_component(inner)
+        self.assertIsNone(self.index.get("root.root_HI.Coupled_2"))
+        self.assertIsNone(self.index.get("root.root_HI.Coupled_2.new.i_in"))
+        self.assertEqual(12, len(self.index))
+
+        self.root.flatten()
+        self.assertIsNot(self.index, self.root.path_index())
+        self.assertIsNotNone(self.root.path_index().get("root.Atomic_0_2"))
+
+    def test_targets_and_injection(self):
+        transducer = ListTransducer(transducer_id="transducer")
+        transducer.add_target_components_by_path(self.root, "root.root_HI.Coupled_2")
+        transducer.add_target_ports_by_path(self.root, "root.**.Atomic_0_?.o_out")
+        self.assertEqual(3, len(transducer.target_components))
+        self.assertEqual(3, len(transducer.target_ports))
+
+        root = DEVStone("root", "HI", 3, 3, 0, 0, test=True)
+        coord = Coordinator(root)
+        coord.initialize()
+        coord.simulate()
+        n_externals = root.n_externals
+        self.assertTrue(coord.inject("root.root_HI.Coupled_2.Coupled_1.Atomic_0_0.i_in", 1))
+        self.assertEqual(n_externals + 1, root.n_externals)
+        self.assertTrue(coord.inject("root.root_HI.unknown.i_in", 1))  # Messages for unknown ports are ignored
+        self.assertEqual(n_externals + 1, root.n_externals)
+        coord.exit()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,253 @@
+import copy
+import queue
+import unittest
+from xdevs import INFINITY, PHASE_ACTIVE
+from xdevs.models import Atomic, Coupled, Port
+from xdevs.pdes import ConservativeCoordinator, ConservativeProcess, LogicalProcess, TimeWarpCoordinator, \
+    TimeWarpProcess, partition_model
+from xdevs.sim import FlatCoordinator
+from xdevs.tests.test_sim import MODEL_TYPES, run_devstone
+
+
+class Node(Atomic):
+    def __init__(self, name: str, period: float):
+        super().__init__(name)
+        self.i_in: Port[int] = Port(int, "i_in")
+        self.o_out: Port[int] = Port(int, "o_out")
+        self.add_in_port(self.i_in)
+        self.add_out_port(self.o_out)
+        self.period: float = period
+        self.clock: float = 0
+        self.count: int = 0
+        self.log: list[tuple[float, int]] = list()
+
+    def initialize(self):
+        self.hold_in(PHASE_ACTIVE, self.period)
+
+    def exit(self):
+        pass
+
+    def deltint(self):
+        self.clock += self.sigma
+        self.count += 1
+        self.hold_in(PHASE_ACTIVE, self.period)
+
+    def deltext(self, e: float):
+        self.clock += e
+        self.continuef(e)
+        self.log.append((self.clock, sum(self.i_in.values)))
+
+    def lambdaf(self):
+        self.o_out.add(self.count)
+
+
+class ResetNode(Node):
+    """Node that restarts its period when it receives messages. Thus, its lookahead is its period."""
+
+    def deltext(self, e: float):
+        super().deltext(e)
+        self.hold_in(PHASE_ACTIVE, self.period)
+
+    def lookahead(self) -> float:
+        return self.period
+
+
+def ring_model(n_groups: int, group_size: int, node_type: type[Node] = Node) -> Coupled:
+    """Ring of nodes with different periods. Each group of nodes is a coupled model."""
+    root = Coupled("root")
+    nodes = list()
+    for g in range(n_groups):
+        group = Coupled(f"group_{g}")
+        for n in range(group_size):
+            node = node_type(f"node_{g}_{n}", 1 + 0.25 * ((g * group_size + n) % 5))
+            group.add_component(node)
+            nodes.append(node)
+        root.add_component(group)
+    for i, node in enumerate(nodes):
+        dest = nodes[(i + 1) % len(nodes)]
+        if node.parent is dest.parent:
+            node.parent.add_coupling(node.o_out, dest.i_in)
+        else:
+            group_out = Port(int, f"o_{node.name}")
+            node.parent.add_out_port(group_out)
+            node.parent.add_coupling(node.o_out, group_out)
+            group_in = Port(int, f"i_{dest.name}")
+            dest.parent.add_in_port(group_in)
+            dest.parent.add_coupling(group_in, dest.i_in)
+            root.add_coupling(group_out, group_in)
+    return root
+
+
+def simulate_ring(engine, time: float, node_type: type[Node] = Node, **kwargs) -> list[list[tuple[float, int]]]:
+    root = ring_model(3, 4, node_type)
+    coord = engine(root, **kwargs)
+    coord.initialize()
+    coord.simulate_time(time)
+    coord.exit()
+    return [comp.log for group in root.components for comp in group.components]
+
+
+class TestPartitions(unittest.TestCase):
+
+    def test_partition_model(self):
+        root = ring_model(3, 4)
+        self.assertEqual([0, 0, 0, 0, 1, 1, 1, 1, 2, 2, 2, 2], partition_model(root, 3))
+        # Coupled models are split when there are not enough subtrees
+        self.assertEqual(6, len(set(partition_model(root, 6))))
+        partitions = partition_model(root, 2, {root: 0, root.components[1]: 1})
+        self.assertEqual([0, 0, 0, 0, 1, 1, 1, 1, 0, 0, 0, 0], partitions)
+        self.assertRaises(ValueError, partition_model, root, 2, {root.components[0]: 0})
+        self.assertRaises(ValueError, partition_model, root, 0)
+
+    def test_abstract_process(self):
+        root = ring_model(2, 2)
+        queues = [queue.SimpleQueue() for _ in range(2)]
+        self.assertRaises(TypeError, LogicalProcess, 0, root, partition_model(root, 2), queues, queue.SimpleQueue())
+
+
+class TestTimeWarp(unittest.TestCase):
+
+    def test_devstone(self):
+        for model_type in MODEL_TYPES:
+            with self.subTest(model_type=model_type):
+                expected, _ = run_devstone(model_type, 4, 4)
+                root, coord = run_devstone(model_type, 4, 4, TimeWarpCoordinator, n_partitions=3, gvt_interval=0)
+                self.assertEqual(expected.n_internals, root.n_internals)
+                self.assertEqual(expected.n_externals, root.n_externals)
+                self.assertEqual(expected.n_events, root.n_events)
+                self.assertEqual(INFINITY, coord.time_next)
+
+    def test_ring(self):
+        expected = simulate_ring(FlatCoordinator, 30)
+        self.assertTrue(all(expected))
+        self.assertEqual(expected, simulate_ring(TimeWarpCoordinator, 30, n_partitions=3, gvt_interval=0.001))
+
+    def test_rollback(self):
+        expected = simulate_ring(FlatCoordinator, 19)  # simulation starts at t=1 (first event) and ends at t=20
+        root = ring_model(3, 4)
+        partitions = partition_model(root, 3)
+        inboxes = [queue.SimpleQueue() for _ in range(3)]
+        outbox = queue.SimpleQueue()
+        lps = [TimeWarpProcess(i, copy.deepcopy(root), partitions, inboxes, outbox) for i in range(3)]
+        for lp in lps:
+            lp.initialize(0)
+            lp.handle(('run', (20, 0)))
+        # Logical processes run one after the other, so they receive straggler messages
+        active = True
+        while active:
+            active = False
+            for lp in reversed(lps):
+                while not lp.inbox.empty():
+                    lp.handle(lp.inbox.get())
+                    active = True
+                while lp.local_time() < lp.end:
+                    lp.execute_cycle()
+                    active = True
+        self.assertTrue(all(lp.n_rollbacks for lp in lps[:-1]))
+        self.assertEqual(sum(lp.n_sent for lp in lps), sum(lp.n_received for lp in lps))
+        logs = [lps[p].simulators[i].model.log for i, p in enumerate(partitions)]
+        self.assertEqual(expected, logs)
+        # After fossil collection, logical processes only keep what they need to roll back to the GVT
+        gvt = min(lp.local_time() for lp in lps)
+        for lp in lps:
+            lp.fossil_collect(gvt)
+            self.assertFalse(lp.history)
+            self.assertFalse(lp.sent)
+
+    def test_unsupported(self):
+        root = ring_model(2, 2)
+        self.assertRaises(ValueError, TimeWarpCoordinator, root, n_partitions=0)
+        self.assertRaises(ValueError, TimeWarpCoordinator, root, gvt_interval=-1)
+        coord = TimeWarpCoordinator(root, n_partitions=2)
+        self.assertRaises(NotImplementedError, coord.simulate, 10)
+        port = root.components[0].components[0].i_in
+        self.assertRaises(NotImplementedError, coord.inject, port, 1)
+        self.assertRaises(NotImplementedError, coord.inject_many, [(port, [1])])
+        self.assertRaises(NotImplementedError, coord.serve)
+
+
+class TestConservative(unittest.TestCase):
+
+    def test_devstone(self):
+        for model_type in MODEL_TYPES:
+            with self.subTest(model_type=model_type):
+                expected, _ = run_devstone(model_type, 4, 4)
+                root, coord = run_devstone(model_type, 4, 4, ConservativeCoordinator, n_partitions=3,
+                                           detection_interval=0)
+                self.assertEqual(expected.n_internals, root.n_internals)
+                self.assertEqual(expected.n_externals, root.n_externals)
+                self.assertEqual(expected.n_events, root.n_events)
+                self.assertEqual(INFINITY, coord.time_next)
+
+    def test_ring(self):
+        for node_type in Node, ResetNode:
+            with self.subTest(node_type=node_type):
+                expected = simulate_ring(FlatCoordinator, 30, node_type)
+                self.assertTrue(any(expected))
+                result = simulate_ring(ConservativeCoordinator, 30, node_type, n_partitions=3, detection_interval=0.001)
+                self.assertEqual(expected, result)
+
+    def test_null_messages(self):
+        expected = simulate_ring(FlatCoordinator, 19, ResetNode)
+        root = ring_model(3, 4, ResetNode)
+        partitions = partition_model(root, 3)
+        inboxes = [queue.SimpleQueue() for _ in range(3)]
+        outbox = queue.SimpleQueue()
+        lps = [ConservativeProcess(i, copy.deepcopy(root), partitions, inboxes, outbox) for i in range(3)]
+        for lp in lps:
+            self.assertEqual(1, lp.lookahead)
+            lp.initialize(0)
+            lp.handle(('run', (20, 0)))
+        # With positive lookahead, logical processes reach the end time only with null messages (i.e., no deadlocks)
+        active = True
+        while active:
+            active = False
+            for lp in lps:
+                while not lp.inbox.empty():
+                    lp.handle(lp.inbox.get())
+                    active = True
+                while lp.runnable():
+                    lp.step()
+                    active = True
+        for lp in lps:
+            self.assertLessEqual((20, 0), lp.next_cycle())
+            self.assertLessEqual((20, 0), lp.input_time())
+            self.assertLess(0, lp.n_nulls)
+        self.assertEqual(sum(lp.n_sent for lp in lps), sum(lp.n_received for lp in lps))
+        logs = [lps[p].simulators[i].model.log for i, p in enumerate(partitions)]
+        self.assertEqual(expected, logs)
+
+    def test_deadlock(self):
+        # Nodes have zero lookahead, so logical processes need the coordinator to break deadlocks
+        root = ring_model(3, 4)
+        partitions = partition_model(root, 3)
+        inboxes = [queue.SimpleQueue() for _ in range(3)]
+        outbox = queue.SimpleQueue()
+        lps = [ConservativeProcess(i, copy.deepcopy(root), partitions, inboxes, outbox) for i in range(3)]
+        for lp in lps:
+            self.assertEqual(0, lp.lookahead)
+            lp.initialize(0)
+            lp.handle(('run', (20, 0)))
+        for lp in lps:
+            while not lp.inbox.empty():
+                lp.handle(lp.inbox.get())
+        self.assertFalse(any(lp.runnable() for lp in lps))
+        input_time = min(lp.output_bound() for lp in lps)
+        self.assertEqual((1, 0), input_time)
+        for lp in lps:
+            lp.resume(input_time)
+        self.assertTrue(any(lp.runnable() for lp in lps))
+
+    def test_unsupported(self):
+        root = ring_model(2, 2)
+        self.assertRaises(ValueError, ConservativeCoordinator, root, detection_interval=-1)
+        coord = ConservativeCoordinator(root, n_partitions=2)
+        self.assertRaises(NotImplementedError, coord.simulate, 10)
+        port = root.components[0].components[0].i_in
+        self.assertRaises(NotImplementedError, coord.inject, port, 1)
+        self.assertRaises(NotImplementedError, coord.inject_many, [(port, [1])])
+        self.assertRaises(NotImplementedError, coord.serve)
+
+
+if __name__ == '__main__':
+    unittest.main()
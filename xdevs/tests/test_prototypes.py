@@ -0,0 +1,126 @@
+import itertools
+import unittest
+from xdevs.models import Coupled, Port
+from xdevs.prototypes import Prototype, replicate
+from xdevs.sim import Coordinator
+from xdevs.examples.devstone.devstone import HO, DelayedAtomic, Seeder
+from xdevs.tests.test_analysis import Relay
+
+
+def all_ports(comp):
+    ports = list(itertools.chain(comp.in_ports, comp.out_ports))
+    for child in getattr(comp, 'components', ()):
+        ports.extend(all_ports(child))
+    return ports
+
+
+def all_couplings(comp):
+    couplings = [c for coupling_set in (comp.eic, comp.ic, comp.eoc) for dests in coupling_set.values()
+                 for c in dests.values()]
+    for child in comp.components:
+        if isinstance(child, Coupled):
+            couplings.extend(all_couplings(child))
+    return couplings
+
+
+class TestReplicate(unittest.TestCase):
+
+    def test_atomic(self):
+        template = Relay("relay")
+        template.buffer.append(1)
+        copies = replicate(template, 3)
+        self.assertEqual(["relay_0", "relay_1", "relay_2"], [copy.name for copy in copies])
+        for copy in copies:
+            self.assertIsInstance(copy, Relay)
+            self.assertIsNone(copy.parent)
+            self.assertEqual(template.phase, copy.phase)
+            self.assertEqual(template.sigma, copy.sigma)
+            # References to ports point to the ports of the copy
+            self.assertIs(copy.i_in, copy.input["i_in"])
+            self.assertIs(copy.o_out, copy.out_ports[0])
+            self.assertIs(copy, copy.i_in.parent)
+            self.assertIsNot(template.i_in, copy.i_in)
+            # Mutable state is copied
+            self.assertEqual([1], copy.buffer)
+            self.assertIsNot(template.buffer, copy.buffer)
+        copies[0].o_out.add(1)
+        self.assertFalse(copies[1].o_out)
+        self.assertFalse(template.o_out)
+        self.assertEqual("relay", template.name)
+        self.assertEqual([], replicate(template, 0))
+        self.assertRaises(ValueError, replicate, template, -1)
+
+    def test_coupled(self):
+        template = HO("ho", 4, 3, 0, 0, test=True)
+        copy = Prototype(template)("copy")
+        self.assertEqual("copy", copy.name)
+        self.assertEqual(template.n_atomics, copy.n_atomics)
+        self.assertEqual((template.n_eics, template.n_ics, template.n_eocs), (copy.n_eics, copy.n_ics, copy.n_eocs))
+        self.assertEqual([c.name for c in template.components], [c.name for c in copy.components])
+        self.assertIs(copy.coupled, copy.components[0])
+        self.assertIs(copy.coupled.i_in2, copy.coupled.get_in_port("i_in2"))
+        self.assertTrue(all(child.parent is copy for child in copy.components))
+        self.assertTrue(all(child in copy._component_set for child in copy.components))
+
+        template_ports = {id(port) for port in all_ports(template)}
+        copy_ports = all_ports(copy)
+        self.assertTrue(all(id(port) not in template_ports for port in copy_ports))
+        copy_ports = set(copy_ports)
+        for coupling in all_couplings(copy):
+            self.assertIn(coupling.port_from, copy_ports)
+            self.assertIn(coupling.port_to, copy_ports)
+
+    def test_shared_references(self):
+        root = Coupled("root")
+        template = Relay("relay")
+        root.add_component(template)
+        template.owner = root
+        template.log = list()
+        copies = root.replicate(template, 2, lambda i: f"copy_{i}")
+        self.assertEqual([template] + copies, root.components)
+        self.assertTrue(all(copy.parent is root and copy.owner is root for copy in copies))
+        self.assertIsNot(copies[0].log, copies[1].log)
+
+    def test_simulation(self):
+        def build(replicated: bool) -> Coupled:
+            root = Coupled("root")
+            seeder = Seeder("seeder")
+            root.add_component(seeder)
+            if replicated:
+                models = root.replicate(HO("ho", 5, 4, 0, 0, test=True), 3)
+            else:
+                models = [HO(f"ho_{i}", 5, 4, 0, 0, test=True) for i in range(3)]
+                root.add_components(models)
+            for model in models:
+                root.add_coupling(seeder.o_out, model.i_in)
+                root.add_coupling(seeder.o_out, model.i_in2)
+            return root
+
+        results = list()
+        for replicated in False, True:
+            root = build(replicated)
+            coord = Coordinator(root)
+            coord.initialize()
+            coord.simulate()
+            coord.exit()
+            results.append([(model.n_internals, model.n_externals, model.n_events) for model in root.components[1:]])
+        self.assertEqual(results[0], results[1])
+        self.assertTrue(all(n_internals > 0 for n_internals, _, _ in results[1]))
+
+    def test_port_subclass(self):
+        class NamedPort(Port):
+            __slots__ = ('tags',)
+
+        template = DelayedAtomic("atomic", 0, 0)
+        port = NamedPort(int, "i_tagged")
+        port.tags = ["a"]
+        template.add_in_port(port)
+        copy, = replicate(template, 1)
+        clone = copy.get_in_port("i_tagged")
+        self.assertIsInstance(clone, NamedPort)
+        self.assertEqual(["a"], clone.tags)
+        self.assertIsNot(port.tags, clone.tags)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import json
+import unittest
+from xdevs import INFINITY, PHASE_ACTIVE
+from xdevs.models import Atomic, Coupled, Port
+from xdevs.remote import RemoteHost
+from xdevs.sim import Coordinator, FlatCoordinator
+
+
+class Emitter(Atomic):
+    def __init__(self, name: str, n_cycles: int):
+        super().__init__(name)
+        self.o_a: Port[int] = Port(int, "o_a")
+        self.o_b: Port[int] = Port(int, "o_b")
+        self.add_out_port(self.o_a)
+        self.add_out_port(self.o_b)
+        self.n_cycles: int = n_cycles
+        self.count: int = 0
+
+    def initialize(self):
+        self.hold_in(PHASE_ACTIVE, 1)
+
+    def exit(self):
+        pass
+
+    def deltint(self):
+        self.count += 1
+        if self.count < self.n_cycles:
+            self.hold_in(PHASE_ACTIVE, 1)
+        else:
+            self.passivate()
+
+    def deltext(self, e: float):
+        pass
+
+    def lambdaf(self):
+        self.o_a.extend([self.count, self.count + 1])
+        self.o_b.add(-self.count)
+
+
+class Collector(Atomic):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.i_a: Port[int] = Port(int, "i_a", serve=True)
+        self.i_b: Port[int] = Port(int, "i_b", serve=True)
+        self.add_in_port(self.i_a)
+        self.add_in_port(self.i_b)
+        self.received: list[tuple[list[int], list[int]]] = list()
+
+    def initialize(self):
+        self.passivate()
+
+    def exit(self):
+        pass
+
+    def deltint(self):
+        pass
+
+    def deltext(self, e: float):
+        self.received.append((list(self.i_a.values), list(self.i_b.values)))
+
+    def lambdaf(self):
+        pass
+
+
+class JsonCodec:
+    def __init__(self):
+        self.n_encoded: int = 0
+        self.n_decoded: int = 0
+
+    def encode(self, obj) -> bytes:
+        self.n_encoded += 1
+        return json.dumps(obj).encode()
+
+    def decode(self, data: bytes):
+        self.n_decoded += 1
+        return json.loads(data)
+
+
+def remote_model(n_cycles: int, host: RemoteHost) -> Coupled:
+    root = Coupled("client")
+    emitter = Emitter("emitter", n_cycles)
+    placeholder = Collector("collector")  # Local placeholder of the remote collector
+    root.add_component(emitter)
+    root.add_component(placeholder)
+    root.add_coupling(emitter.o_a, placeholder.i_a, host)
+    root.add_coupling(emitter.o_b, placeholder.i_b, host)
+    return root
+
+
+class TestRemoteCouplings(unittest.TestCase):
+
+    def run_remote(self, engine: type[Coordinator], n_cycles: int, codec=None) -> tuple[Collector, Collector, RemoteHost]:
+        server_root = Coupled("server")
+        collector = Collector("collector")
+        server_root.add_component(collector)
+        server_coord = Coordinator(server_root)
+        server_coord.initialize()
+        server = server_coord.serve(port=0, codec=codec)
+        try:
+            host = RemoteHost(server.server_address, codec)
+            client_root = remote_model(n_cycles, host)
+            client_coord = engine(client_root)
+            client_coord.initialize()
+            client_coord.simulate()
+            client_coord.exit()
+        finally:
+            server.stop()
+        server_coord.exit()
+        return collector, client_root.components[1], host
+
+    def test_batches(self):
+        for engine in Coordinator, FlatCoordinator:
+            with self.subTest(engine=engine):
+                collector, placeholder, host = self.run_remote(engine, 10)
+                # All the messages of a cycle arrive in a single frame and are injected in a single step
+                expected = [([i, i + 1], [-i]) for i in range(10)]
+                self.assertEqual(expected, collector.received)
+                self.assertEqual(10, host.n_frames)
+                self.assertFalse(placeholder.received)  # Remote messages are not delivered locally
+
+    def test_codec(self):
+        codec = JsonCodec()
+        collector, _, host = self.run_remote(Coordinator, 5, codec)
+        self.assertEqual([([i, i + 1], [-i]) for i in range(5)], collector.received)
+        self.assertEqual(5, codec.n_encoded)
+        self.assertEqual(5, codec.n_decoded)
+
+    def test_inject_many(self):
+        root = Coupled("server")
+        collector = Collector("collector")
+        root.add_component(collector)
+        coord = Coordinator(root)
+        coord.initialize()
+        self.assertTrue(coord.inject_many([("collector.i_a", [1, 2]), (collector.i_b, [3]), ("unknown", [4])]))
+        self.assertEqual([([1, 2], [3])], collector.received)
+        self.assertTrue(coord.inject_many([("unknown", [4])]))
+        self.assertEqual(1, len(collector.received))
+        self.assertEqual(INFINITY, coord.time_next)
+        coord.exit()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,257 @@
+import unittest
+from typing import Optional
+from xdevs import INFINITY
+from xdevs.abc import Transducer
+from xdevs.models import Coupled, Port
+from xdevs.sim import Coordinator, FlatCoordinator, ThreadPoolCoordinator, free_threading
+from xdevs.examples.devstone.devstone import DEVStone, DelayedAtomic
+
+
+MODEL_TYPES = ("LI", "HI", "HO", "HOmod")
+
+
+class ListTransducer(Transducer):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.states: list[dict] = list()
+        self.events: list[dict] = list()
+
+    def create_known_data_types_map(self):
+        return {str, int, float}
+
+    def initialize(self):
+        pass
+
+    def exit(self):
+        pass
+
+    def bulk_data(self, sim_time: float):
+        self.states.extend(self._iterate_state_inserts(sim_time))
+        self.events.extend(self._iterate_event_inserts(sim_time))
+
+
+def deep_model(depth: int) -> Coupled:
+    """Builds a chain of nested coupled models without recursion. Each level contains one atomic model."""
+    model = None
+    for level in range(depth):
+        coupled = Coupled(f"Coupled_{level}")
+        coupled.i_in = Port(int, "i_in")
+        coupled.add_in_port(coupled.i_in)
+        atomic = DelayedAtomic(f"Atomic_{level}", 0, 0, test=True)
+        coupled.add_component(atomic)
+        coupled.add_coupling(coupled.i_in, atomic.i_in)
+        if model is not None:
+            coupled.add_component(model)
+            coupled.add_coupling(coupled.i_in, model.i_in)
+        model = coupled
+    return model
+
+
+def run_devstone(model_type: str, width: int, depth: int, engine: type[Coordinator] = Coordinator,
+                 transducer: Optional[Transducer] = None, **kwargs) -> tuple[DEVStone, Coordinator]:
+    root = DEVStone("root", model_type, width, depth, 0, 0, test=True)
+    if transducer is not None:
+        transducer.add_target_component(root)
+        transducer.add_target_ports_by_component(root, component_filters="Coupled_.*")
+    coord = engine(root, **kwargs)
+    if transducer is not None:
+        coord.add_transducer(transducer)
+    coord.initialize()
+    coord.simulate_time(INFINITY)
+    coord.exit()
+    return root, coord
+
+
+class TestSchedulers(unittest.TestCase):
+
+    def _check_equivalent(self, **kwargs):
+        for model_type in MODEL_TYPES:
+            for width, depth in ((1, 1), (3, 4), (6, 5)):
+                with self.subTest(model_type=model_type, width=width, depth=depth, **kwargs):
+                    expected, _ = run_devstone(model_type, width, depth)
+                    root, coord = run_devstone(model_type, width, depth, **kwargs)
+                    self.assertEqual(expected.n_internals, root.n_internals)
+                    self.assertEqual(expected.n_externals, root.n_externals)
+                    self.assertEqual(expected.n_events, root.n_events)
+                    self.assertEqual(INFINITY, coord.time_next)
+
+    def test_heap_scheduler(self):
+        self._check_equivalent(scheduler='heap')
+
+    def test_inject_nested_port(self):
+        for scheduler in ('linear', 'heap'):
+            with self.subTest(scheduler=scheduler):
+                root = DEVStone("root", "LI", 3, 3, 0, 0, test=True)
+                coord = Coordinator(root, scheduler=scheduler)
+                coord.initialize()
+                atomic = root.devstone.coupled.components[-1]
+                self.assertTrue(coord.inject(atomic.i_in, [0, 1]))
+                self.assertEqual(1, atomic.n_externals)
+                self.assertEqual(2, atomic.n_events)
+                self.assertEqual(0, coord.time_next)
+
+    def test_invalid_scheduler(self):
+        root = DEVStone("root", "LI", 2, 2, 0, 0)
+        self.assertRaises(ValueError, Coordinator, root, scheduler='unknown')
+
+
+class TestDirtyPorts(unittest.TestCase):
+
+    @staticmethod
+    def _iterate_ports(model: Coupled):
+        stack = [model]
+        while stack:
+            comp = stack.pop()
+            yield from comp.in_ports
+            yield from comp.out_ports
+            if isinstance(comp, Coupled):
+                stack.extend(comp.components)
+
+    def test_clear(self):
+        for engine in (Coordinator, FlatCoordinator):
+            for model_type in MODEL_TYPES:
+                with self.subTest(engine=engine.__name__, model_type=model_type):
+                    root = DEVStone("root", model_type, 4, 4, 0, 0, test=True)
+                    coord = engine(root)
+                    coord.initialize()
+                    ports = list(self._iterate_ports(root))
+                    coord.clock.time = coord.time_next
+                    while coord.clock.time < INFINITY:
+                        coord.lambdaf()
+                        coord.deltfcn()
+                        dirty = [port for port in ports if port]
+                        self.assertTrue(dirty)
+                        self.assertEqual(set(dirty), set(coord._dirty_ports))
+                        coord.clear()
+                        self.assertFalse(coord._dirty_ports)
+                        self.assertFalse(any(ports))
+                        coord.clock.time = coord.time_next
+                    coord.exit()
+                    self.assertTrue(all(port._dirty is None for port in ports))
+
+
+class TestFlatten(unittest.TestCase):
+
+    def test_equivalence(self):
+        for model_type in MODEL_TYPES:
+            for width, depth in ((1, 1), (3, 4), (6, 5)):
+                with self.subTest(model_type=model_type, width=width, depth=depth):
+                    expected, _ = run_devstone(model_type, width, depth)
+                    root, coord = run_devstone(model_type, width, depth, flatten=True)
+                    self.assertEqual(expected.n_internals, root.n_internals)
+                    self.assertEqual(expected.n_externals, root.n_externals)
+                    self.assertEqual(expected.n_events, root.n_events)
+                    self.assertEqual(root.n_atomics + 1, len(coord.simulators))  # DEVStone atomics and seeder
+                    self.assertFalse(coord.coordinators)
+
+    def test_transducers(self):
+        for model_type in MODEL_TYPES:
+            with self.subTest(model_type=model_type):
+                expected = ListTransducer(transducer_id='expected', include_names=False)
+                run_devstone(model_type, 4, 4, transducer=expected)
+                transducer = ListTransducer(transducer_id='flatten', include_names=False)
+                run_devstone(model_type, 4, 4, transducer=transducer, flatten=True)
+                self.assertTrue(expected.events)
+                self.assertTrue(all(port.parent.parent is not None for port in transducer.target_ports))
+                key = lambda x: tuple(sorted(x.items()))
+                self.assertEqual(sorted(expected.states, key=key), sorted(transducer.states, key=key))
+                # Messages that went through several removed ports are only observed once, at their source port
+                self.assertEqual(set(map(key, expected.events)), set(map(key, transducer.events)))
+
+
+class TestFlatCoordinator(unittest.TestCase):
+
+    def test_equivalence(self):
+        for model_type in MODEL_TYPES:
+            for width, depth in ((1, 1), (3, 4), (6, 5)):
+                for scheduler in ('linear', 'heap'):
+                    with self.subTest(model_type=model_type, width=width, depth=depth, scheduler=scheduler):
+                        expected, _ = run_devstone(model_type, width, depth)
+                        root, coord = run_devstone(model_type, width, depth, FlatCoordinator, scheduler=scheduler)
+                        self.assertEqual(expected.n_internals, root.n_internals)
+                        self.assertEqual(expected.n_externals, root.n_externals)
+                        self.assertEqual(expected.n_events, root.n_events)
+                        self.assertEqual(INFINITY, coord.time_next)
+
+    def test_transducers(self):
+        for model_type in MODEL_TYPES:
+            with self.subTest(model_type=model_type):
+                expected = ListTransducer(transducer_id='expected')
+                run_devstone(model_type, 4, 4, transducer=expected)
+                transducer = ListTransducer(transducer_id='flat')
+                run_devstone(model_type, 4, 4, FlatCoordinator, transducer=transducer)
+                self.assertTrue(expected.events)
+                key = lambda x: tuple(sorted(x.items()))
+                self.assertEqual(sorted(expected.states, key=key), sorted(transducer.states, key=key))
+                self.assertEqual(sorted(expected.events, key=key), sorted(transducer.events, key=key))
+
+    def test_deep_model(self):
+        root = deep_model(2000)
+        coord = FlatCoordinator(root)
+        coord.initialize()
+        coord.inject(root.i_in, [0, 1])
+        coord.simulate_time(INFINITY)
+        self.assertEqual(2000, len(coord.simulators))
+        for sim in coord.simulators:
+            self.assertEqual(1, sim.model.n_externals)
+            self.assertEqual(2, sim.model.n_events)
+
+
+    def test_inject_coupled_port(self):
+        # Messages injected into ports of inner coupled models reach the same atomic models as in Coordinator
+        results = list()
+        for engine in Coordinator, FlatCoordinator:
+            root = deep_model(5)
+            coupled = root.components[1].components[1]
+            coord = engine(root)
+            coord.initialize()
+            self.assertTrue(coord.inject(coupled.i_in, [0, 1]))
+            coord.simulate_time(INFINITY)
+            coord.exit()
+            atomics = list()
+            model = root
+            while model is not None:
+                atomic = model.components[0]
+                atomics.append((atomic.name, atomic.n_externals, atomic.n_events))
+                model = model.components[1] if len(model.components) > 1 else None
+            results.append(atomics)
+        expected = [(f"Atomic_{level}", 0 if level > 2 else 1, 0 if level > 2 else 2) for level in range(5)]
+        self.assertEqual(expected, sorted(results[0]))
+        self.assertEqual(expected, sorted(results[1]))
+
+
+class TestThreadPoolCoordinator(unittest.TestCase):
+
+    def test_equivalence(self):
+        for model_type in MODEL_TYPES:
+            for parallel in (False, True):
+                with self.subTest(model_type=model_type, parallel=parallel):
+                    expected, _ = run_devstone(model_type, 6, 5)
+                    root, coord = run_devstone(model_type, 6, 5, ThreadPoolCoordinator,
+                                               n_threads=3, parallel=parallel)
+                    self.assertEqual(expected.n_internals, root.n_internals)
+                    self.assertEqual(expected.n_externals, root.n_externals)
+                    self.assertEqual(expected.n_events, root.n_events)
+                    self.assertEqual(INFINITY, coord.time_next)
+                    self.assertIsNone(coord._executor)
+
+    def test_transducers(self):
+        for model_type in MODEL_TYPES:
+            with self.subTest(model_type=model_type):
+                expected = ListTransducer(transducer_id='expected')
+                run_devstone(model_type, 4, 4, FlatCoordinator, transducer=expected)
+                transducer = ListTransducer(transducer_id='threads')
+                run_devstone(model_type, 4, 4, ThreadPoolCoordinator, transducer=transducer, n_threads=4, parallel=True)
+                self.assertTrue(expected.events)
+                # Transducers are notified in the same order as in serial executions
+                self.assertEqual(expected.states, transducer.states)
+                self.assertEqual(expected.events, transducer.events)
+
+    def test_free_threading(self):
+        root = DEVStone("root", "LI", 2, 2, 0, 0)
+        self.assertEqual(free_threading(), ThreadPoolCoordinator(root).parallel)
+        self.assertRaises(ValueError, ThreadPoolCoordinator, root, n_threads=0)
+
+
+if __name__ == '__main__':
+    unittest.main()